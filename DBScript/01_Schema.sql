@@ -23,11 +23,19 @@ BEGIN
         ApplicationId NVARCHAR(50) NOT NULL,
         Status NVARCHAR(50) NOT NULL, -- 'CREATED', 'IN_PROGRESS', 'COMPLETED'
         CreatedAt DATETIME2 NOT NULL DEFAULT GETDATE(),
+        UpdatedAt DATETIME2 NULL, -- Bumped on any change to the session, its messages or feedback (ETag source)
         CONSTRAINT FK_InterviewSessions_Applications FOREIGN KEY (ApplicationId) REFERENCES Applications(Id) ON DELETE CASCADE
     );
 END
 GO
 
+-- Column added for conditional GETs
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'UpdatedAt' AND object_id = OBJECT_ID('InterviewSessions'))
+BEGIN
+    ALTER TABLE InterviewSessions ADD UpdatedAt DATETIME2 NULL;
+END
+GO
+
 -- Table: ChatMessages
 IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'ChatMessages' AND type = 'U')
 BEGIN
@@ -36,13 +44,21 @@ BEGIN
         SessionId NVARCHAR(50) NOT NULL,
         Sender NVARCHAR(10) NOT NULL, -- 'USER', 'AI'
         Text NVARCHAR(MAX) NOT NULL,
-        AudioData NVARCHAR(MAX) NULL, -- Base64 encoded audio
+        AudioData NVARCHAR(MAX) NULL, -- Legacy base64 audio (new clips live in the audio store)
+        AudioRef NVARCHAR(64) NULL, -- Audio store id, served from /api/audio/<id>
         Timestamp BIGINT NOT NULL,
         CONSTRAINT FK_ChatMessages_InterviewSessions FOREIGN KEY (SessionId) REFERENCES InterviewSessions(Id) ON DELETE CASCADE
     );
 END
 GO
 
+-- Column added for the audio blob store
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'AudioRef' AND object_id = OBJECT_ID('ChatMessages'))
+BEGIN
+    ALTER TABLE ChatMessages ADD AudioRef NVARCHAR(64) NULL;
+END
+GO
+
 -- Table: FeedbackReports
 IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'FeedbackReports' AND type = 'U')
 BEGIN
@@ -69,3 +85,25 @@ BEGIN
     CREATE INDEX IX_ChatMessages_SessionId ON ChatMessages(SessionId);
 END
 GO
+
+-- Composite indexes matching the hot queries (kept in sync with __table_args__ in backend/models.py)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Applications_CreatedAt_Id' AND object_id = OBJECT_ID('Applications'))
+BEGIN
+    CREATE INDEX IX_Applications_CreatedAt_Id ON Applications(CreatedAt, Id);
+END
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_InterviewSessions_ApplicationId_CreatedAt' AND object_id = OBJECT_ID('InterviewSessions'))
+BEGIN
+    CREATE INDEX IX_InterviewSessions_ApplicationId_CreatedAt ON InterviewSessions(ApplicationId, CreatedAt, Id);
+END
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_InterviewSessions_CreatedAt_Id' AND object_id = OBJECT_ID('InterviewSessions'))
+BEGIN
+    CREATE INDEX IX_InterviewSessions_CreatedAt_Id ON InterviewSessions(CreatedAt, Id);
+END
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_ChatMessages_SessionId_Timestamp' AND object_id = OBJECT_ID('ChatMessages'))
+BEGIN
+    CREATE INDEX IX_ChatMessages_SessionId_Timestamp ON ChatMessages(SessionId, Timestamp, Id);
+END
+GO
@@ -1,5 +1,5 @@
 -- Career & Education schema (idempotent) for Azure SQL / SQL Server
--- Tables: Profiles, CareerRecords, EducationRecords, Achievements, Certificates, Projects
+-- Tables: Profiles, CareerRecords, EducationRecords, Achievements, Certificates, Projects, ImportJobs
 USE [PrepMaster];
 GO
 
@@ -11,10 +11,16 @@ BEGIN
         Headline NVARCHAR(500) NULL,
         Location NVARCHAR(200) NULL,
         Summary NVARCHAR(MAX) NULL,
-        LastUpdated DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME()
+        LastUpdated DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME() -- Bumped on any change to a profile record (ETag source)
     );
 END;
 
+-- Databases created before LastUpdated versioned ETags stored whole seconds only
+IF EXISTS (SELECT 1 FROM sys.columns WHERE name = 'LastUpdated' AND object_id = OBJECT_ID('dbo.Profiles') AND scale = 0)
+BEGIN
+    ALTER TABLE dbo.Profiles ALTER COLUMN LastUpdated DATETIME2 NOT NULL;
+END;
+
 IF NOT EXISTS (SELECT 1 FROM sys.tables WHERE name = 'CareerRecords')
 BEGIN
     CREATE TABLE dbo.CareerRecords (
@@ -118,5 +124,47 @@ BEGIN
     CREATE INDEX IX_Projects_ProfileId ON dbo.Projects (ProfileId);
 END;
 
+-- Composite indexes for the per-profile listings ordered by date (kept in sync with backend/models.py)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_CareerRecords_ProfileId_StartDate' AND object_id = OBJECT_ID('dbo.CareerRecords'))
+BEGIN
+    CREATE INDEX IX_CareerRecords_ProfileId_StartDate ON dbo.CareerRecords (ProfileId, StartDate);
+END;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_EducationRecords_ProfileId_StartDate' AND object_id = OBJECT_ID('dbo.EducationRecords'))
+BEGIN
+    CREATE INDEX IX_EducationRecords_ProfileId_StartDate ON dbo.EducationRecords (ProfileId, StartDate);
+END;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Achievements_ProfileId_IssueDate' AND object_id = OBJECT_ID('dbo.Achievements'))
+BEGIN
+    CREATE INDEX IX_Achievements_ProfileId_IssueDate ON dbo.Achievements (ProfileId, IssueDate);
+END;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Certificates_ProfileId_IssueDate' AND object_id = OBJECT_ID('dbo.Certificates'))
+BEGIN
+    CREATE INDEX IX_Certificates_ProfileId_IssueDate ON dbo.Certificates (ProfileId, IssueDate);
+END;
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Projects_ProfileId_StartDate' AND object_id = OBJECT_ID('dbo.Projects'))
+BEGIN
+    CREATE INDEX IX_Projects_ProfileId_StartDate ON dbo.Projects (ProfileId, StartDate);
+END;
+
+IF NOT EXISTS (SELECT 1 FROM sys.tables WHERE name = 'ImportJobs')
+BEGIN
+    CREATE TABLE dbo.ImportJobs (
+        Id NVARCHAR(36) PRIMARY KEY,
+        Source NVARCHAR(50) NOT NULL,
+        Apply BIT NOT NULL DEFAULT 0,
+        Status NVARCHAR(20) NOT NULL DEFAULT 'QUEUED',
+        Stage NVARCHAR(50) NULL,
+        Progress INT NOT NULL DEFAULT 0,
+        Result NVARCHAR(MAX) NULL,
+        Error NVARCHAR(MAX) NULL,
+        CreatedAt DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME(),
+        UpdatedAt DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+END;
+
 -- End of schema additions
 
@@ -12,25 +12,41 @@ if os.path.exists(env_path):
     load_dotenv(env_path, override=False)
 
 app = Flask(__name__, static_folder='../dist', static_url_path='/')
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor'])
 
 # Database Configuration
 db_url = os.getenv('DATABASE_URL', 'sqlite:///local.db')
 app.config['SQLALCHEMY_DATABASE_URI'] = db_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Audio clips are stored as files, not base64 in the DB ('cas' = content-addressed, 'filesystem' = flat)
+app.config['AUDIO_STORE'] = os.getenv('AUDIO_STORE', 'cas')
+app.config['AUDIO_STORE_DIR'] = os.getenv('AUDIO_STORE_DIR', os.path.join(app.instance_path, 'audio'))
+
+# Refuse oversized bodies from the Content-Length header, before Werkzeug buffers the upload;
+# the slack covers multipart framing and the other form fields of a resume import
+from .services.document_extract import IMPORT_MAX_BYTES
+app.config['MAX_CONTENT_LENGTH'] = IMPORT_MAX_BYTES + 64 * 1024
+
 print(f" * Database: {db_url.split('@')[-1] if '@' in db_url else db_url}") # Log DB (masked)
 
-from .models import db
+from .models import db, ensure_columns, missing_indexes
 db.init_app(app)
 
 from .routes import api
 app.register_blueprint(api, url_prefix='/api')
 
+from . import compression
+compression.init_app(app)
+
 with app.app_context():
     try:
         db.create_all()
+        for column in ensure_columns(db.engine):
+            print(f" * Added missing column {column}")
         print(" * Database tables created/verified successfully")
+        for index in missing_indexes(db.engine):
+            print(f" * WARNING: Missing index {index} (see DBScript/ to create it)")
     except Exception as e:
         print(f" * ERROR: Failed to connect to database!")
         print(f" * Error details: {str(e)}")
@@ -38,6 +54,24 @@ with app.app_context():
         print(f" * Current DATABASE_URL: {db_url}")
         raise
 
+@app.cli.command('migrate-audio')
+def migrate_audio():
+    """Move legacy base64 ChatMessage.AudioData into the audio store."""
+    from .models import ChatMessage
+    from .services.audio_store import get_audio_store
+    store = get_audio_store()
+    moved = 0
+    while True:
+        batch = ChatMessage.query.filter(ChatMessage.AudioData.isnot(None)).limit(100).all()
+        if not batch:
+            break
+        for message in batch:
+            message.AudioRef = store.put_base64(message.AudioData)
+            message.AudioData = None
+        db.session.commit()
+        moved += len(batch)
+    print(f" * Moved {moved} audio clips to {app.config['AUDIO_STORE_DIR']}")
+
 @app.route('/')
 def serve():
     return send_from_directory(app.static_folder, 'index.html')
@@ -0,0 +1,200 @@
+"""
+ASGI entry point.
+
+The interview endpoints run as native async handlers, so a worker keeps
+serving while it waits on the model and TTS APIs and one process can hold
+hundreds of turns in flight. Database work goes to a small thread pool
+inside a Flask app context. Every other route is the Flask app mounted as
+WSGI, unchanged.
+
+    gunicorn -k uvicorn.workers.UvicornWorker backend.asgi:app
+"""
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.exceptions import HTTPException
+from .app import app as flask_app
+from .compression import COMPRESS_MIN_BYTES, COMPRESS_GZIP_LEVEL
+from .models import db, Application, InterviewSession
+from .routes import _conversation, _persist_turns, _sse
+from .services.ai_service import get_ai_provider
+from .services.message_writer import persist_turn, now_ms
+from .services import metrics
+from .services.tts_pipeline import join_clips
+
+# Keep this at or below the SQLAlchemy pool size (5 + 10 overflow by default)
+ASGI_DB_THREADS = int(os.getenv('ASGI_DB_THREADS', '10'))
+# Threads for the mounted Flask app
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '10'))
+
+_db_executor = ThreadPoolExecutor(max_workers=ASGI_DB_THREADS, thread_name_prefix='db')
+
+async def run_db(fn, *args):
+    """Run blocking SQLAlchemy work off the event loop, inside an app context."""
+    def call():
+        with flask_app.app_context():
+            return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(_db_executor, call)
+
+# ORM objects must not leave the app context they were loaded in, so the
+# helpers below hand back plain dicts.
+
+def _load_application(app_id):
+    return Application.query.get_or_404(app_id).to_dict()
+
+def _load_conversation(data):
+    application, history = _conversation(data)
+    return application.to_dict(), history
+
+def _mark_in_progress(session_id):
+    session = InterviewSession.query.get(session_id)
+    if session:
+        session.Status = 'IN_PROGRESS'
+        db.session.commit()
+
+def _persist_opening(session_id, text, audio_data):
+    # The Flask path only persists for a session that exists; same here
+    if not InterviewSession.query.get(session_id):
+        return None
+    return persist_turn(session_id, None, text, audio_data)
+
+def _application_args(application):
+    return (
+        application['jobTitle'],
+        application['companyName'],
+        application['positionDescription'],
+        application['cvContent'],
+    )
+
+def _endpoint(view):
+    async def endpoint(request):
+        started = time.perf_counter()
+        response = await _respond(view, request)
+        # Same series as the Flask routes; the async routes have no path parameters
+        metrics.http_request_seconds.observe(
+            time.perf_counter() - started, request.method, request.url.path, str(response.status_code))
+        return response
+    return endpoint
+
+async def _respond(view, request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return JSONResponse({'error': 'Request body must be JSON'}, status_code=400)
+    try:
+        return await view(data)
+    except HTTPException as e:
+        return JSONResponse({'error': e.description}, status_code=e.code)
+
+@_endpoint
+async def start_interview(data):
+    session_id = data.get('sessionId')
+    application = await run_db(_load_application, data.get('applicationId'))
+
+    async def mark_in_progress(text):
+        # Runs while the opening audio is still being synthesized
+        if session_id:
+            await run_db(_mark_in_progress, session_id)
+
+    provider = get_ai_provider(data.get('provider', 'gemini'))
+    try:
+        response = await provider.astart_interview(
+            *_application_args(application),
+            on_text=mark_in_progress,
+            application_id=application['id']
+        )
+        if _persist_turns(data):
+            persisted = await run_db(_persist_opening, session_id, response['text'], response.get('audioData'))
+            response = persisted or response
+        return JSONResponse(response)
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+@_endpoint
+async def interview_turn(data):
+    started_at = now_ms()
+    application, history = await run_db(_load_conversation, data)
+
+    provider = get_ai_provider(data.get('provider', 'gemini'))
+    try:
+        response = await provider.agenerate_turn(
+            *_application_args(application),
+            history,
+            data.get('message'),
+            application_id=application['id']
+        )
+        if _persist_turns(data):
+            response = await run_db(persist_turn, data['sessionId'], data.get('message'), response['text'], response.get('audioData'), started_at)
+        return JSONResponse(response)
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+@_endpoint
+async def interview_turn_stream(data):
+    started_at = now_ms()
+    persist = _persist_turns(data)
+    application, history = await run_db(_load_conversation, data)
+
+    provider = get_ai_provider(data.get('provider', 'gemini'))
+    events = provider.astream_turn(
+        *_application_args(application),
+        history,
+        data.get('message'),
+        application_id=application['id']
+    )
+
+    async def generate():
+        clips = []
+        try:
+            async for event, payload in events:
+                if event == 'audio':
+                    clips.append(payload['audioData'])
+                elif event == 'done' and persist:
+                    payload = await run_db(persist_turn, data['sessionId'], data.get('message'), payload['text'], join_clips(clips), started_at)
+                yield _sse(event, payload)
+        except Exception as e:
+            yield _sse('error', {'error': str(e)})
+
+    return StreamingResponse(
+        generate(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@_endpoint
+async def interview_feedback(data):
+    application, history = await run_db(_load_conversation, data)
+
+    provider = get_ai_provider(data.get('provider', 'gemini'))
+    try:
+        feedback = await provider.agenerate_feedback(
+            application['positionDescription'],
+            application['cvContent'],
+            history
+        )
+        return JSONResponse(feedback)
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+app = Starlette(
+    routes=[
+        Route('/api/interview/start', start_interview, methods=['POST']),
+        Route('/api/interview/turn', interview_turn, methods=['POST']),
+        Route('/api/interview/turn/stream', interview_turn_stream, methods=['POST']),
+        Route('/api/interview/feedback', interview_feedback, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=ASGI_WSGI_THREADS)),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'], expose_headers=['X-Next-Cursor']),
+        # For the async routes; responses the Flask app already encoded pass through untouched
+        Middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=COMPRESS_GZIP_LEVEL),
+    ],
+)
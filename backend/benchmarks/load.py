@@ -0,0 +1,188 @@
+"""
+Load benchmark: full interview sessions against the mock provider.
+
+Each virtual user creates an application and a session, opens the
+interview, takes N turns (persisted server-side), requests feedback,
+saves it and reads the transcript back. Sessions run at a fixed
+concurrency, then throughput and p50/p95/p99 are reported per endpoint.
+No network or API keys are needed:
+
+    python -m backend.benchmarks.load --sessions 40 --concurrency 8 --turns 4 --stream
+
+By default the Flask app runs in-process on a throwaway SQLite database.
+Pass --url to load a running server instead (start it with
+MOCK_PROVIDER=true; the mock latencies then come from its MOCK_* env).
+"""
+import os
+import argparse
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+CV_CONTENT = "Senior engineer with ten years of Python, Flask and SQL experience. " * 40
+JOB_DESCRIPTION = "We are hiring a backend engineer to own our Python services. " * 40
+ANSWER = "I led the migration of our billing service to a queue-based design and cut p99 latency by half."
+
+def _percentile(ordered, q):
+    # Nearest-rank, so p99 of a small run is a real observation
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+class Recorder:
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, label, seconds, ok=True):
+        with self.lock:
+            self.timings[label].append(seconds)
+            if not ok:
+                self.errors[label] += 1
+
+    def report(self, wall):
+        print(f"{'endpoint':<36} {'count':>6} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for label in sorted(self.timings):
+            ordered = sorted(self.timings[label])
+            print(f"{label:<36} {len(ordered):>6} {self.errors[label]:>6} {len(ordered) / wall:>7.1f} "
+                  + ' '.join(f"{_percentile(ordered, q) * 1000:>8.1f}" for q in (50, 95, 99)))
+
+class LocalClient:
+    """The Flask app in this process, through its test client."""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def call(self, method, path, body=None):
+        response = self._client.open('/api' + path, method=method, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+    def stream(self, path, body):
+        response = self._client.post('/api' + path, json=body, buffered=False)
+        for chunk in response.response:
+            yield chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk
+
+class RemoteClient:
+    """A running server over HTTP."""
+
+    def __init__(self, url):
+        import requests
+        self._base = url.rstrip('/') + '/api'
+        self._session = requests.Session()
+
+    def call(self, method, path, body=None):
+        response = self._session.request(method, self._base + path, json=body, timeout=120)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+    def stream(self, path, body):
+        with self._session.post(self._base + path, json=body, stream=True, timeout=120) as response:
+            yield from response.iter_content(chunk_size=None, decode_unicode=True)
+
+def _timed(recorder, label, client, method, path, body=None):
+    started = time.perf_counter()
+    status, data = client.call(method, path, body)
+    recorder.record(label, time.perf_counter() - started, 200 <= status < 300)
+    return data
+
+def _stream_turn(recorder, client, body):
+    started = time.perf_counter()
+    first_audio = None
+    text = ''
+    for chunk in client.stream('/interview/turn/stream', body):
+        text += chunk
+        if first_audio is None and 'event: audio' in text:
+            first_audio = time.perf_counter() - started
+    ok = 'event: done' in text and 'event: error' not in text
+    recorder.record('POST /interview/turn/stream', time.perf_counter() - started, ok)
+    if first_audio is not None:
+        recorder.record('  first audio event', first_audio)
+
+def run_session(client, recorder, args):
+    app_id, session_id = str(uuid.uuid4()), str(uuid.uuid4())
+    _timed(recorder, 'POST /applications', client, 'POST', '/applications', {
+        'id': app_id, 'jobTitle': 'Backend Engineer', 'companyName': 'Acme',
+        'positionDescription': JOB_DESCRIPTION, 'cvContent': CV_CONTENT,
+    })
+    _timed(recorder, 'POST /sessions', client, 'POST', '/sessions', {
+        'id': session_id, 'applicationId': app_id, 'status': 'CREATED',
+    })
+    conversation = {'applicationId': app_id, 'sessionId': session_id, 'provider': 'mock'}
+    _timed(recorder, 'POST /interview/start', client, 'POST', '/interview/start', conversation)
+    for _ in range(args.turns):
+        if args.stream:
+            _stream_turn(recorder, client, dict(conversation, message=ANSWER))
+        else:
+            _timed(recorder, 'POST /interview/turn', client, 'POST', '/interview/turn', dict(conversation, message=ANSWER))
+    feedback = _timed(recorder, 'POST /interview/feedback', client, 'POST', '/interview/feedback', conversation)
+    _timed(recorder, 'PUT /sessions/<id>', client, 'PUT', f'/sessions/{session_id}', {
+        'status': 'COMPLETED', 'feedback': feedback,
+    })
+    _timed(recorder, 'GET /sessions/<id>/messages', client, 'GET', f'/sessions/{session_id}/messages')
+
+def _configure_local(args):
+    # Must run before the app is imported: it reads these at import time
+    workdir = tempfile.mkdtemp(prefix='prepmaster-load-')
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(workdir, 'load.db'))
+    os.environ.setdefault('AUDIO_STORE_DIR', os.path.join(workdir, 'audio'))
+    os.environ['MOCK_PROVIDER'] = 'true'
+    os.environ['MOCK_TTFT'] = str(args.ttft)
+    os.environ['MOCK_TTS_LATENCY'] = str(args.tts_latency)
+    os.environ['MOCK_FEEDBACK_LATENCY'] = str(args.feedback_latency)
+    os.environ['MOCK_LATENCY_SIGMA'] = str(args.sigma)
+    os.environ['MOCK_TOKENS_PER_SEC'] = str(args.tokens_per_sec)
+    os.environ['MOCK_TTS_CHARS_PER_SEC'] = str(args.tts_chars_per_sec)
+    os.environ['MOCK_AUDIO_BYTES_PER_CHAR'] = str(args.audio_bytes_per_char)
+    from ..app import app
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--turns', type=int, default=3)
+    parser.add_argument('--stream', action='store_true', help='use the SSE turn endpoint')
+    parser.add_argument('--url', help='load a running server instead of the in-process app')
+    parser.add_argument('--ttft', type=float, default=0.4, help='median time to first token (s)')
+    parser.add_argument('--tts-latency', type=float, default=0.3, help='median TTS latency per sentence (s)')
+    parser.add_argument('--feedback-latency', type=float, default=2.0, help='median feedback latency (s)')
+    parser.add_argument('--sigma', type=float, default=0.5, help='log-normal sigma; 0 for fixed latencies')
+    parser.add_argument('--tokens-per-sec', type=float, default=150.0)
+    parser.add_argument('--tts-chars-per-sec', type=float, default=800.0)
+    parser.add_argument('--audio-bytes-per-char', type=int, default=3200)
+    args = parser.parse_args()
+
+    if args.url:
+        make_client = lambda: RemoteClient(args.url)
+    else:
+        app = _configure_local(args)
+        make_client = lambda: LocalClient(app)
+
+    recorder = Recorder()
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'client'):
+            local.client = make_client()
+        try:
+            run_session(local.client, recorder, args)
+        except Exception as e:
+            print(f"Session failed: {e}")
+            recorder.record('session', 0.0, ok=False)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for future in [pool.submit(session) for _ in range(args.sessions)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    print(f"{args.sessions} sessions x {args.turns} turns at concurrency {args.concurrency}: "
+          f"{wall:.1f}s, {args.sessions / wall:.2f} sessions/s")
+    recorder.report(wall)
+
+if __name__ == '__main__':
+    main()
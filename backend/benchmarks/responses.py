@@ -0,0 +1,109 @@
+"""
+Response encoding benchmark over representative session payloads.
+
+Builds seeded interview sessions (transcript text, legacy base64 audio on
+some messages, feedback) and a list of applications with long job
+descriptions and CVs, then compares the default Flask JSON provider with
+orjson, and bytes on the wire for identity, gzip and brotli:
+
+    python -m backend.benchmarks.responses --rounds 20
+"""
+import argparse
+import base64
+import gzip
+import random
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from ..compression import OrjsonProvider, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY, brotli, orjson
+
+WORDS = ('the candidate described how they designed a caching layer for the payments service '
+         'and measured latency before and after rollout while coordinating with the platform team').split()
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def session_payload(rng, messages, audio_every, audio_bytes):
+    transcript = []
+    for i in range(messages):
+        transcript.append({
+            'id': f'm{i:04d}',
+            'sender': 'AI' if i % 2 == 0 else 'USER',
+            'text': _text(rng, rng.randint(20, 120)),
+            # Legacy rows still carry inline base64 audio; MP3 frames are close to random bytes
+            'audioData': base64.b64encode(rng.randbytes(audio_bytes)).decode('ascii') if audio_every and i % audio_every == 0 else None,
+            'audioUrl': None,
+            'timestamp': 1700000000000 + i * 15000,
+        })
+    return {
+        'id': 'session-1',
+        'applicationId': 'app-1',
+        'status': 'COMPLETED',
+        'createdAt': '2024-05-01T10:00:00',
+        'messages': transcript,
+        'feedback': {
+            'overallScore': 78,
+            'summary': _text(rng, 80),
+            'strengths': [_text(rng, 15) for _ in range(4)],
+            'weaknesses': [_text(rng, 15) for _ in range(3)],
+            'improvements': [_text(rng, 15) for _ in range(3)],
+        },
+    }
+
+def applications_payload(rng, count):
+    return [{
+        'id': f'app-{i}',
+        'jobTitle': 'Senior Backend Engineer',
+        'companyName': 'Acme Corp',
+        'positionDescription': _text(rng, 600),
+        'cvContent': _text(rng, 900),
+        'createdAt': '2024-05-01T10:00:00',
+    } for i in range(count)]
+
+def _best(fn, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def report(name, payload, providers, rounds):
+    print(f"\n{name}")
+    body = None
+    for label, provider in providers:
+        # response() is what jsonify() calls: compact separators, as sent on the wire
+        seconds, body = _best(lambda: provider.response(payload).get_data(), rounds)
+        print(f"  serialize {label:<8} {seconds * 1e3:8.2f} ms  {len(body) / 1024:9.1f} KiB")
+    encoders = [('gzip', lambda: gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0))]
+    if brotli is not None:
+        encoders.append(('br', lambda: brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)))
+    for label, encode in encoders:
+        seconds, encoded = _best(encode, rounds)
+        print(f"  {label:<18} {seconds * 1e3:8.2f} ms  {len(encoded) / 1024:9.1f} KiB  ({len(encoded) / len(body):.0%} of identity)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = [('default', DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrjsonProvider(app)))
+    else:
+        print("orjson is not installed; timing the default provider only")
+    if brotli is None:
+        print("brotli is not installed; skipping br")
+
+    rng = random.Random(args.seed)
+    app.app_context().push()
+    report('session, 40 messages, text only', session_payload(rng, 40, 0, 0), providers, args.rounds)
+    report('session, 40 messages, legacy audio on every AI turn', session_payload(rng, 40, 2, 48 * 1024), providers, args.rounds)
+    report('applications list, 50 rows', applications_payload(rng, 50), providers, args.rounds)
+
+if __name__ == '__main__':
+    main()
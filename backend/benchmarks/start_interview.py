@@ -0,0 +1,135 @@
+"""
+Opening-turn benchmark: legacy double call vs text-then-TTS.
+
+Runs against a simulated Gemini client (no network, no API key) whose
+latency and token counts scale with prompt and reply size, so the two
+paths can be compared offline:
+
+    python -m backend.benchmarks.start_interview --runs 5
+"""
+import os
+import argparse
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+
+from google.genai import types
+
+# Compare call patterns only; context caching would need a real cache backend
+os.environ.setdefault('GEMINI_CONTEXT_CACHE', 'false')
+
+from ..services.ai_service import GeminiProvider, OPENING_PROMPT
+
+OPENING_REPLY = (
+    "Hello, I'm your AI interviewer for today. "
+    "I've read through your CV and the job description. "
+    "To start, could you walk me through the project you're most proud of?"
+)
+
+JOB_DESCRIPTION = "We are hiring a backend engineer to own our Python services. " * 40
+CV_CONTENT = "Senior engineer with ten years of Python, Flask and SQL experience. " * 40
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+class SimulatedModels:
+    """Latency model: fixed time-to-first-token plus per-token generation time."""
+
+    def __init__(self, ttft, tokens_per_sec, tts_chars_per_sec):
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.tts_chars_per_sec = tts_chars_per_sec
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def _bill(self, contents, config, output):
+        prompt = str(contents) + ((config.system_instruction or '') if config else '')
+        with self.lock:
+            self.calls += 1
+            self.input_tokens += _tokens(prompt)
+            self.output_tokens += _tokens(output)
+
+    def _audio_response(self, text):
+        part = SimpleNamespace(inline_data=SimpleNamespace(data=b'\0' * len(text) * 40))
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+    def generate_content(self, model, contents, config=None):
+        if 'tts' in model:
+            # With a system instruction the TTS model writes its own reply before speaking it
+            spoken = OPENING_REPLY if config and config.system_instruction else str(contents)
+            if config and config.system_instruction:
+                time.sleep(self.ttft + _tokens(spoken) / self.tokens_per_sec)
+            time.sleep(len(spoken) / self.tts_chars_per_sec)
+            self._bill(contents, config, spoken)
+            return self._audio_response(spoken)
+        time.sleep(self.ttft + _tokens(OPENING_REPLY) / self.tokens_per_sec)
+        self._bill(contents, config, OPENING_REPLY)
+        return SimpleNamespace(text=OPENING_REPLY)
+
+    def generate_content_stream(self, model, contents, config=None):
+        time.sleep(self.ttft)
+        for word in OPENING_REPLY.split(' '):
+            time.sleep(_tokens(word + ' ') / self.tokens_per_sec)
+            yield SimpleNamespace(text=word + ' ')
+        self._bill(contents, config, OPENING_REPLY)
+
+def legacy_start_interview(provider, system_instruction):
+    """The pre-refactor path: an independent TTS call, then a separate text call."""
+    client = provider.client
+    response = client.models.generate_content(
+        model='gemini-2.5-flash-preview-tts',
+        contents=OPENING_PROMPT,
+        config=types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            response_modalities=["AUDIO"],
+        )
+    )
+    text_response = client.models.generate_content(
+        model='gemini-2.5-flash',
+        contents=OPENING_PROMPT,
+        config=types.GenerateContentConfig(system_instruction=system_instruction)
+    )
+    return {'text': text_response.text, 'audioData': response.candidates[0].content.parts[0].inline_data.data}
+
+def _provider(args):
+    models = SimulatedModels(args.ttft, args.tokens_per_sec, args.tts_chars_per_sec)
+    return GeminiProvider(client=SimpleNamespace(models=models))
+
+def _measure(label, run, args):
+    timings = []
+    models = None
+    for _ in range(args.runs):
+        provider = _provider(args)
+        models = provider.client.models
+        started = time.perf_counter()
+        run(provider)
+        timings.append(time.perf_counter() - started)
+    print(f"{label:<22} wall p50={statistics.median(timings) * 1000:7.1f}ms  "
+          f"calls={models.calls}  input_tokens={models.input_tokens}  output_tokens={models.output_tokens}")
+    return statistics.median(timings), models.input_tokens + models.output_tokens
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--ttft', type=float, default=0.4, help='simulated time to first token (s)')
+    parser.add_argument('--tokens-per-sec', type=float, default=200.0)
+    parser.add_argument('--tts-chars-per-sec', type=float, default=600.0)
+    args = parser.parse_args()
+
+    def legacy(provider):
+        system_instruction = provider._get_system_instruction('Backend Engineer', 'Acme', JOB_DESCRIPTION, CV_CONTENT)
+        legacy_start_interview(provider, system_instruction.text)
+
+    def current(provider):
+        provider.start_interview('Backend Engineer', 'Acme', JOB_DESCRIPTION, CV_CONTENT)
+
+    legacy_time, legacy_tokens = _measure('legacy (tts + text)', legacy, args)
+    current_time, current_tokens = _measure('text then tts', current, args)
+    print(f"wall-clock saved: {(1 - current_time / legacy_time) * 100:.0f}%  "
+          f"tokens saved: {(1 - current_tokens / legacy_tokens) * 100:.0f}%")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import os
+import gzip
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from .services import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Below this the headers outweigh the saving
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+# Brotli's dynamic-content sweet spot; 11 is for static assets
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '4'))
+# 'orjson' serializes API responses with orjson when it is installed
+JSON_ENCODER = os.getenv('JSON_ENCODER', 'default').lower()
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript', 'text/javascript', 'image/svg+xml')
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; falls back to the default for options orjson lacks."""
+
+    def _options(self):
+        return orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._options()) + b'\n',
+            mimetype=self.mimetype
+        )
+
+def _encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def compress_response(response):
+    """
+    Compress buffered text responses above COMPRESS_MIN_BYTES: brotli if
+    the client accepts it and it is installed, else gzip. Files (send_file
+    passes them through) and streams such as SSE are left alone.
+    """
+    if response.status_code == 304:
+        response.vary.add('Accept-Encoding')
+        return response
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _encoding()
+    if encoding is None or response.content_length is None or response.content_length < COMPRESS_MIN_BYTES:
+        return response
+
+    data = response.get_data()
+    with metrics.response_compress_seconds.time(encoding):
+        if encoding == 'br':
+            response.set_data(brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY))
+        else:
+            response.set_data(gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = encoding
+    # The encoded bytes differ from the identity ones, so the validator becomes weak
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(app):
+    if JSON_ENCODER == 'orjson':
+        if orjson is None:
+            print(" * WARNING: JSON_ENCODER=orjson but orjson is not installed; using the default encoder")
+        else:
+            app.json = OrjsonProvider(app)
+    _time_serialization(app.json)
+    app.after_request(compress_response)
+
+def _time_serialization(provider):
+    # jsonify() goes through provider.response, whichever encoder is active
+    response = provider.response
+
+    def timed_response(*args, **kwargs):
+        with metrics.json_serialize_seconds.time():
+            return response(*args, **kwargs)
+    provider.response = timed_response
@@ -0,0 +1,33 @@
+import hashlib
+from functools import wraps
+from flask import request, make_response
+
+def conditional(version):
+    """
+    ETag/If-None-Match for a GET view. version(**view_args) is a cheap
+    query for the state the response is built from (a row timestamp, or a
+    count and max timestamp for a collection). The ETag hashes it with the
+    full path, so each page and ?include= variant validates separately.
+    A match answers 304 without running the view. If version returns
+    None (e.g. the row is missing), the view runs without a validator.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            token = version(**kwargs)
+            if token is None:
+                return view(*args, **kwargs)
+            etag = hashlib.sha1(repr((request.full_path, tuple(token))).encode('utf-8')).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Weak: it versions the data, not the bytes (which vary with Content-Encoding)
+            response.set_etag(etag, weak=True)
+            # Let clients keep the body but revalidate it on every use
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapped
+    return decorator
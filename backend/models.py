@@ -1,7 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import JSON
+from sqlalchemy import JSON, event, inspect, text
+from sqlalchemy.orm import Session
 from datetime import datetime
+from itertools import chain
 import json
+import time
+from .services import metrics
 
 # Constants
 MAX_FEEDBACK_SCORE = 100  # Maximum score for interview feedback
@@ -10,6 +14,9 @@ db = SQLAlchemy()
 
 class Application(db.Model):
     __tablename__ = 'Applications'
+    __table_args__ = (
+        db.Index('IX_Applications_CreatedAt_Id', 'CreatedAt', 'Id'),
+    )
     Id = db.Column(db.String(50), primary_key=True)
     JobTitle = db.Column(db.String(255), nullable=False)
     CompanyName = db.Column(db.String(255), nullable=False)
@@ -29,31 +36,47 @@ class Application(db.Model):
 
 class InterviewSession(db.Model):
     __tablename__ = 'InterviewSessions'
+    __table_args__ = (
+        db.Index('IX_InterviewSessions_ApplicationId_CreatedAt', 'ApplicationId', 'CreatedAt', 'Id'),
+        db.Index('IX_InterviewSessions_CreatedAt_Id', 'CreatedAt', 'Id'),
+    )
     Id = db.Column(db.String(50), primary_key=True)
     ApplicationId = db.Column(db.String(50), db.ForeignKey('Applications.Id'), nullable=False)
     Status = db.Column(db.String(50), nullable=False)
     CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
+    UpdatedAt = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow) # Also bumped when its messages or feedback change
     
-    messages = db.relationship('ChatMessage', backref='session', lazy=True, cascade="all, delete-orphan")
+    messages = db.relationship('ChatMessage', backref='session', lazy=True, cascade="all, delete-orphan",
+                               order_by='[ChatMessage.Timestamp, ChatMessage.Id]')
     feedback = db.relationship('FeedbackReport', backref='session', uselist=False, cascade="all, delete-orphan")
 
-    def to_dict(self):
-        return {
+    # Related collections to_dict can embed; list endpoints default to none of them
+    INCLUDES = ('messages', 'feedback')
+
+    def to_dict(self, include=INCLUDES):
+        data = {
             'id': self.Id,
             'applicationId': self.ApplicationId,
             'status': self.Status,
             'createdAt': self.CreatedAt.isoformat(),
-            'messages': [m.to_dict() for m in self.messages],
-            'feedback': self.feedback.to_dict() if self.feedback else None
         }
+        if 'messages' in include:
+            data['messages'] = [m.to_dict() for m in self.messages]
+        if 'feedback' in include:
+            data['feedback'] = self.feedback.to_dict() if self.feedback else None
+        return data
 
 class ChatMessage(db.Model):
     __tablename__ = 'ChatMessages'
+    __table_args__ = (
+        db.Index('IX_ChatMessages_SessionId_Timestamp', 'SessionId', 'Timestamp', 'Id'),
+    )
     Id = db.Column(db.String(50), primary_key=True)
     SessionId = db.Column(db.String(50), db.ForeignKey('InterviewSessions.Id'), nullable=False)
     Sender = db.Column(db.String(10), nullable=False)
     Text = db.Column(db.Text, nullable=False)
-    AudioData = db.Column(db.Text, nullable=True)
+    AudioData = db.Column(db.Text, nullable=True) # Legacy base64 audio; new clips live in the audio store
+    AudioRef = db.Column(db.String(64), nullable=True) # Audio store id, served from /api/audio/<id>
     Timestamp = db.Column(db.BigInteger, nullable=False)
 
     def to_dict(self):
@@ -62,6 +85,7 @@ class ChatMessage(db.Model):
             'sender': self.Sender,
             'text': self.Text,
             'audioData': self.AudioData,
+            'audioUrl': f'/api/audio/{self.AudioRef}' if self.AudioRef else None,
             'timestamp': self.Timestamp
         }
 
@@ -112,6 +136,9 @@ class UserProfile(db.Model):
 
 class CareerRecord(db.Model):
     __tablename__ = 'CareerRecords'
+    __table_args__ = (
+        db.Index('IX_CareerRecords_ProfileId_StartDate', 'ProfileId', 'StartDate'),
+    )
     Id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     ProfileId = db.Column(db.Integer, db.ForeignKey('Profiles.Id'), nullable=False)
     Title = db.Column(db.String(200))
@@ -143,6 +170,9 @@ class CareerRecord(db.Model):
 
 class EducationRecord(db.Model):
     __tablename__ = 'EducationRecords'
+    __table_args__ = (
+        db.Index('IX_EducationRecords_ProfileId_StartDate', 'ProfileId', 'StartDate'),
+    )
     Id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     ProfileId = db.Column(db.Integer, db.ForeignKey('Profiles.Id'), nullable=False)
     School = db.Column(db.String(200))
@@ -172,6 +202,9 @@ class EducationRecord(db.Model):
 
 class Achievement(db.Model):
     __tablename__ = 'Achievements'
+    __table_args__ = (
+        db.Index('IX_Achievements_ProfileId_IssueDate', 'ProfileId', 'IssueDate'),
+    )
     Id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     ProfileId = db.Column(db.Integer, db.ForeignKey('Profiles.Id'), nullable=False)
     Title = db.Column(db.String(200), nullable=False)
@@ -195,6 +228,9 @@ class Achievement(db.Model):
 
 class Certificate(db.Model):
     __tablename__ = 'Certificates'
+    __table_args__ = (
+        db.Index('IX_Certificates_ProfileId_IssueDate', 'ProfileId', 'IssueDate'),
+    )
     Id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     ProfileId = db.Column(db.Integer, db.ForeignKey('Profiles.Id'), nullable=False)
     Name = db.Column(db.String(200), nullable=False)
@@ -222,6 +258,9 @@ class Certificate(db.Model):
 
 class Project(db.Model):
     __tablename__ = 'Projects'
+    __table_args__ = (
+        db.Index('IX_Projects_ProfileId_StartDate', 'ProfileId', 'StartDate'),
+    )
     Id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     ProfileId = db.Column(db.Integer, db.ForeignKey('Profiles.Id'), nullable=False)
     Name = db.Column(db.String(200), nullable=False)
@@ -246,3 +285,116 @@ class Project(db.Model):
             'description': self.Description,
             'createdAt': self.CreatedAt.isoformat() if self.CreatedAt else None
         }
+
+class ImportJob(db.Model):
+    __tablename__ = 'ImportJobs'
+    Id = db.Column(db.String(36), primary_key=True)
+    Source = db.Column(db.String(50), nullable=False)
+    Apply = db.Column(db.Boolean, nullable=False, default=False)
+    Status = db.Column(db.String(20), nullable=False, default='QUEUED') # QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED
+    Stage = db.Column(db.String(50))
+    Progress = db.Column(db.Integer, nullable=False, default=0) # 0-100
+    Result = db.Column(db.Text) # Stored as JSON string: {'preview': ...} or {'applied': True, 'summary': ...}
+    Error = db.Column(db.Text)
+    CreatedAt = db.Column(db.DateTime, default=datetime.utcnow)
+    UpdatedAt = db.Column(db.DateTime, default=datetime.utcnow)
+
+    FINISHED = ('SUCCEEDED', 'FAILED', 'CANCELLED')
+
+    def to_dict(self):
+        return {
+            'id': self.Id,
+            'source': self.Source,
+            'apply': self.Apply,
+            'status': self.Status,
+            'stage': self.Stage,
+            'progress': self.Progress,
+            'result': json.loads(self.Result) if self.Result else None,
+            'error': self.Error,
+            'createdAt': self.CreatedAt.isoformat() if self.CreatedAt else None,
+            'updatedAt': self.UpdatedAt.isoformat() if self.UpdatedAt else None
+        }
+
+# --- Change tracking ---
+
+_PROFILE_RECORDS = (CareerRecord, EducationRecord, Achievement, Certificate, Project)
+
+@event.listens_for(Session, 'before_flush')
+def _touch_parents(session, flush_context, instances):
+    """
+    Bump the parent's timestamp whenever a child row changes, so a single
+    row versions a whole collection for conditional GETs (see
+    conditional.py). Core bulk inserts bypass this and must touch the
+    parent themselves.
+    """
+    profile_ids, session_ids = set(), set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _PROFILE_RECORDS):
+            profile_ids.add(obj.ProfileId)
+        elif isinstance(obj, (ChatMessage, FeedbackReport)):
+            session_ids.add(obj.SessionId)
+    now = datetime.utcnow()
+    for profile_id in profile_ids - {None}:
+        profile = session.get(UserProfile, profile_id)
+        if profile is not None:
+            profile.LastUpdated = now
+    for session_id in session_ids - {None}:
+        parent = session.get(InterviewSession, session_id)
+        if parent is not None:
+            parent.UpdatedAt = now
+
+@event.listens_for(Session, 'before_commit')
+def _commit_started(session):
+    session.info['commit_started'] = time.perf_counter()
+
+@event.listens_for(Session, 'after_commit')
+def _commit_finished(session):
+    started = session.info.pop('commit_started', None)
+    if started is not None:
+        metrics.db_commit_seconds.observe(time.perf_counter() - started)
+
+@event.listens_for(Session, 'after_rollback')
+def _commit_failed(session):
+    session.info.pop('commit_started', None)
+
+# --- Schema upgrades ---
+
+def ensure_columns(engine):
+    """
+    Add nullable columns that were introduced after a table was first created.
+    db.create_all() only creates missing tables and never alters existing ones.
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    added = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c['name'] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD {quote(column.name)} {column_type} NULL"))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+def missing_indexes(engine):
+    """
+    Declared indexes the live database does not have. An existing index
+    counts if its leading columns match, whatever it is called (the MSSQL
+    scripts predate some of these names).
+    """
+    inspector = inspect(engine)
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        live = [tuple(ix['column_names']) for ix in inspector.get_indexes(table.name)]
+        live += [tuple(inspector.get_pk_constraint(table.name)['constrained_columns'])]
+        for index in table.indexes:
+            wanted = tuple(c.name for c in index.columns)
+            if not any(cols[:len(wanted)] == wanted for cols in live):
+                missing.append(f"{index.name} on {table.name}({', '.join(wanted)})")
+    return missing
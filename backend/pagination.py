@@ -0,0 +1,70 @@
+import json
+import base64
+from datetime import datetime
+from flask import request, abort, jsonify, make_response
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def _bad_request(message):
+    abort(make_response(jsonify({'error': message}), 400))
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if len(values) != len(columns):
+            raise ValueError('cursor does not match ordering')
+        return [
+            datetime.fromisoformat(v) if v is not None and getattr(c.type, 'python_type', None) is datetime else v
+            for c, v in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        _bad_request('invalid cursor')
+
+def page_limit(arg='limit'):
+    value = request.args.get(arg)
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        _bad_request(f'{arg} must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def _after(columns, values, descending):
+    # (a, b) > (va, vb) spelled out, since MSSQL has no row-value comparison
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+def paginate(query, columns, descending=True, limit_arg='limit', cursor_arg='cursor'):
+    """
+    Keyset pagination over `columns` (the last one must be unique).
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    limit = page_limit(limit_arg)
+    cursor = request.args.get(cursor_arg)
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns), descending))
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
+
+def with_next_cursor(response, next_cursor):
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, abort, g, request, jsonify, send_file, stream_with_context, url_for
 from .models import (
     db,
     Application,
@@ -11,12 +11,41 @@ from .models import (
     Achievement,
     Certificate,
     Project,
+    ImportJob,
 )
+from .pagination import paginate, with_next_cursor
+from .conditional import conditional
+from .services.audio_store import get_audio_store
+from .services.message_writer import MESSAGE_BATCH_MAX, build_message, invalid_message, save_messages, persist_turn, now_ms
+from .services import metrics
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+from werkzeug.exceptions import RequestEntityTooLarge
 import json
-from datetime import datetime
+import time
+from datetime import date, datetime
 
 api = Blueprint('api', __name__)
 
+# --- Metrics ---
+
+@api.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+@api.after_request
+def _record_timing(response):
+    # Labelled by route template, not path, so ids don't explode the series count
+    started = g.pop('request_started', None)
+    if started is not None and request.url_rule is not None:
+        metrics.http_request_seconds.observe(
+            time.perf_counter() - started, request.method, request.url_rule.rule, str(response.status_code))
+    return response
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
 # --- Applications ---
 
 @api.route('/applications', methods=['POST'])
@@ -34,12 +63,60 @@ def create_application():
     db.session.commit()
     return jsonify(new_app.to_dict()), 201
 
+# Versions for conditional GETs: a cheap query for the state each response is built from.
+# Applications are never edited; sessions and the profile carry a timestamp that
+# models._touch_parents bumps whenever a child row changes.
+
+def _applications_version():
+    return db.session.query(func.count(Application.Id), func.max(Application.CreatedAt)).one()
+
+def _application_version(id):
+    row = db.session.query(Application.CreatedAt).filter_by(Id=id).first()
+    return tuple(row) if row else None
+
+def _sessions_version(app_id=None):
+    # The summaries carry messageCount and overallScore, so version those too (see _session_version)
+    scope = (InterviewSession.ApplicationId == app_id,) if app_id is not None else ()
+    session_ids = select(InterviewSession.Id).where(*scope)
+    children = [
+        db.session.query(column).filter(model.SessionId.in_(session_ids)).scalar_subquery()
+        for model, column in (
+            (ChatMessage, func.count(ChatMessage.Id)),
+            (FeedbackReport, func.count(FeedbackReport.SessionId)),
+            (FeedbackReport, func.sum(FeedbackReport.OverallScore)),
+        )
+    ]
+    return db.session.query(
+        func.count(InterviewSession.Id),
+        func.max(func.coalesce(InterviewSession.UpdatedAt, InterviewSession.CreatedAt)),
+        *children
+    ).filter(*scope).one()
+
+def _session_version(id=None, session_id=None):
+    # Message count too: two appends can land within one DATETIME tick on MSSQL
+    message_count = db.session.query(func.count(ChatMessage.Id)) \
+        .filter(ChatMessage.SessionId == InterviewSession.Id).scalar_subquery()
+    row = db.session.query(InterviewSession.UpdatedAt, message_count) \
+        .filter(InterviewSession.Id == (id or session_id)).first()
+    return tuple(row) if row else None
+
+def _profile_version():
+    # Per-collection count and max Id too: LastUpdated can repeat within a clock tick
+    collections = []
+    for model in (CareerRecord, EducationRecord, Achievement, Certificate, Project):
+        for column in (func.count(model.Id), func.max(model.Id)):
+            collections.append(db.session.query(column).filter(model.ProfileId == UserProfile.Id).scalar_subquery())
+    row = db.session.query(UserProfile.Id, UserProfile.LastUpdated, *collections).order_by(UserProfile.Id.asc()).first()
+    return tuple(row) if row else None
+
 @api.route('/applications', methods=['GET'])
+@conditional(_applications_version)
 def get_applications():
-    apps = Application.query.all()
-    return jsonify([app.to_dict() for app in apps])
+    apps, next_cursor = paginate(Application.query, [Application.CreatedAt, Application.Id])
+    return with_next_cursor(jsonify([app.to_dict() for app in apps]), next_cursor)
 
 @api.route('/applications/<id>', methods=['GET'])
+@conditional(_application_version)
 def get_application(id):
     app = Application.query.get_or_404(id)
     return jsonify(app.to_dict())
@@ -59,20 +136,76 @@ def create_session():
     db.session.commit()
     return jsonify(new_session.to_dict()), 201
 
+def _csv_arg(name):
+    value = request.args.get(name)
+    return [v.strip() for v in value.split(',') if v.strip()] if value else None
+
+def _session_include(default_include):
+    include = _csv_arg('include')
+    return tuple(i for i in include if i in InterviewSession.INCLUDES) if include is not None else default_include
+
+def _serialize_sessions(sessions, include=()):
+    """
+    Serialize sessions as summaries (the default for lists) or, with
+    ?include=messages,feedback, in detail. Summary fields for the whole
+    page come from two grouped queries rather than one lazy load per
+    session. ?fields=id,status,... trims the output to the named keys.
+    """
+    fields = _csv_arg('fields')
+
+    summaries = {}
+    if 'messages' not in include or 'feedback' not in include:
+        ids = [s.Id for s in sessions]
+        counts = dict(db.session.query(ChatMessage.SessionId, func.count(ChatMessage.Id))
+                      .filter(ChatMessage.SessionId.in_(ids)).group_by(ChatMessage.SessionId).all()) if ids else {}
+        scores = dict(db.session.query(FeedbackReport.SessionId, FeedbackReport.OverallScore)
+                      .filter(FeedbackReport.SessionId.in_(ids)).all()) if ids else {}
+        summaries = {i: {'messageCount': counts.get(i, 0), 'overallScore': scores.get(i)} for i in ids}
+
+    result = []
+    for s in sessions:
+        data = s.to_dict(include=include)
+        data.update(summaries.get(s.Id, {}))
+        if fields:
+            data = {k: v for k, v in data.items() if k in fields}
+        result.append(data)
+    return result
+
+def _list_sessions(query):
+    include = _session_include(())
+    if 'messages' in include:
+        query = query.options(selectinload(InterviewSession.messages))
+    if 'feedback' in include:
+        query = query.options(selectinload(InterviewSession.feedback))
+    sessions, next_cursor = paginate(query, [InterviewSession.CreatedAt, InterviewSession.Id])
+    return with_next_cursor(jsonify(_serialize_sessions(sessions, include)), next_cursor)
+
 @api.route('/sessions', methods=['GET'])
+@conditional(_sessions_version)
 def get_sessions():
-    sessions = InterviewSession.query.all()
-    return jsonify([s.to_dict() for s in sessions])
+    return _list_sessions(InterviewSession.query)
 
 @api.route('/sessions/<id>', methods=['GET'])
+@conditional(_session_version)
 def get_session(id):
     session = InterviewSession.query.get_or_404(id)
-    return jsonify(session.to_dict())
+    include = _session_include(InterviewSession.INCLUDES)
+    data = _serialize_sessions([session], tuple(i for i in include if i != 'messages'))[0]
+    if 'messages' in include:
+        # First page of the transcript; the rest via /sessions/<id>/messages?cursor=
+        messages, next_cursor = paginate(
+            ChatMessage.query.filter_by(SessionId=id),
+            [ChatMessage.Timestamp, ChatMessage.Id],
+            descending=False, limit_arg='messageLimit', cursor_arg='messageCursor'
+        )
+        data['messages'] = [m.to_dict() for m in messages]
+        data['nextMessagesCursor'] = next_cursor
+    return jsonify(data)
 
 @api.route('/applications/<app_id>/sessions', methods=['GET'])
+@conditional(_sessions_version)
 def get_sessions_by_application(app_id):
-    sessions = InterviewSession.query.filter_by(ApplicationId=app_id).order_by(InterviewSession.CreatedAt.desc()).all()
-    return jsonify([s.to_dict() for s in sessions])
+    return _list_sessions(InterviewSession.query.filter_by(ApplicationId=app_id))
 
 @api.route('/sessions/<id>', methods=['PUT'])
 def update_session(id):
@@ -100,33 +233,86 @@ def update_session(id):
 
 # --- Messages ---
 
+@api.route('/sessions/<session_id>/messages', methods=['GET'])
+@conditional(_session_version)
+def get_messages(session_id):
+    InterviewSession.query.get_or_404(session_id)
+    messages, next_cursor = paginate(
+        ChatMessage.query.filter_by(SessionId=session_id),
+        [ChatMessage.Timestamp, ChatMessage.Id],
+        descending=False
+    )
+    return with_next_cursor(jsonify([m.to_dict() for m in messages]), next_cursor)
+
 @api.route('/sessions/<session_id>/messages', methods=['POST'])
 def add_message(session_id):
     data = request.json
-    new_message = ChatMessage(
-        Id=data['id'],
-        SessionId=session_id,
-        Sender=data['sender'],
-        Text=data['text'],
-        AudioData=data.get('audioData'),
-        Timestamp=data['timestamp']
-    )
+    new_message = build_message(session_id, data)
     db.session.add(new_message)
     db.session.commit()
+    history_cache.append(session_id, new_message)
     return jsonify(new_message.to_dict()), 201
 
+@api.route('/sessions/<session_id>/messages/batch', methods=['POST'])
+def add_messages(session_id):
+    """Append several messages (e.g. a user turn and its reply) in one commit."""
+    InterviewSession.query.get_or_404(session_id)
+    data = request.json
+    items = data.get('messages') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'messages must be a non-empty list'}), 400
+    if len(items) > MESSAGE_BATCH_MAX:
+        return jsonify({'error': f'at most {MESSAGE_BATCH_MAX} messages per batch'}), 400
+    for item in items:
+        error = invalid_message(item)
+        if error:
+            return jsonify({'error': error}), 400
+
+    saved, skipped = save_messages(session_id, items)
+    return jsonify({'messages': [m.to_dict() for m in saved], 'skipped': skipped}), 201
+
+# --- Audio ---
+
+@api.route('/audio/<audio_id>', methods=['GET'])
+def get_audio(audio_id):
+    store = get_audio_store()
+    path = store.locate(audio_id)
+    if not path:
+        abort(404)
+    # conditional=True gives Range/206 and If-None-Match/304 handling
+    return send_file(
+        path,
+        mimetype=store.mimetype(audio_id),
+        conditional=True,
+        etag=audio_id if store.immutable else True,
+        max_age=31536000 if store.immutable else 0
+    )
+
 # --- Interview Logic ---
 
 from .services.ai_service import get_ai_provider
-from .services.resume_import import parse_pdf_bytes, parse_docx_bytes, parse_linkedin_url, parse_text
+from .services.history_cache import history_cache
+from .services.tts_pipeline import join_clips
+from .services.resume_import import parse_upload, parse_linkedin_url, parse_text
+from .services.document_extract import ExtractionError, IMPORT_MAX_BYTES
+from .services.profile_import import apply_import
+from .services.import_jobs import enqueue_import, get_import_job, cancel_import_job
 
 @api.route('/interview/start', methods=['POST'])
 def start_interview():
     data = request.json
     provider_name = data.get('provider', 'gemini')
     app_id = data.get('applicationId')
+    session_id = data.get('sessionId')
     
     application = Application.query.get_or_404(app_id)
+    session = InterviewSession.query.get(session_id) if session_id else None
+
+    def mark_in_progress(text):
+        # Runs while the opening audio is still being synthesized
+        if session:
+            session.Status = 'IN_PROGRESS'
+            db.session.commit()
     
     provider = get_ai_provider(provider_name)
     try:
@@ -134,21 +320,46 @@ def start_interview():
             application.JobTitle,
             application.CompanyName,
             application.PositionDescription,
-            application.CvContent
+            application.CvContent,
+            on_text=mark_in_progress,
+            application_id=application.Id
         )
+        if session and _persist_turns(data):
+            response = persist_turn(session.Id, None, response['text'], response.get('audioData'))
         return jsonify(response)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _persist_turns(data):
+    """
+    With a sessionId the interview endpoints store the generated turn
+    themselves and answer with message ids and an audio URL instead of
+    the audio; persist=false keeps the old return-everything behaviour.
+    """
+    return bool(data.get('sessionId')) and data.get('persist', True) is not False
+
+def _conversation(data):
+    """
+    Resolve the application and prior history for an interview call.
+    With a sessionId the history is rebuilt server-side from ChatMessage
+    rows; a client-supplied history is only used when no session is given.
+    """
+    session_id = data.get('sessionId')
+    if session_id:
+        session = InterviewSession.query.get_or_404(session_id)
+        application = Application.query.get_or_404(data.get('applicationId') or session.ApplicationId)
+        return application, history_cache.get(session_id)
+    application = Application.query.get_or_404(data.get('applicationId'))
+    return application, data.get('history', [])
+
 @api.route('/interview/turn', methods=['POST'])
 def interview_turn():
     data = request.json
     provider_name = data.get('provider', 'gemini')
-    app_id = data.get('applicationId')
-    history = data.get('history', [])
     user_message = data.get('message') # String or {audioData, mimeType}
+    started_at = now_ms()
     
-    application = Application.query.get_or_404(app_id)
+    application, history = _conversation(data)
     
     provider = get_ai_provider(provider_name)
     try:
@@ -158,20 +369,65 @@ def interview_turn():
             application.PositionDescription,
             application.CvContent,
             history,
-            user_message
+            user_message,
+            application_id=application.Id
         )
+        if _persist_turns(data):
+            # User message and reply land in one commit
+            response = persist_turn(data['sessionId'], user_message, response['text'], response.get('audioData'), started_at)
         return jsonify(response)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@api.route('/interview/turn/stream', methods=['POST'])
+def interview_turn_stream():
+    data = request.json
+    provider_name = data.get('provider', 'gemini')
+    user_message = data.get('message') # String or {audioData, mimeType}
+    started_at = now_ms()
+    persist = _persist_turns(data)
+
+    application, history = _conversation(data)
+
+    provider = get_ai_provider(provider_name)
+    events = provider.stream_turn(
+        application.JobTitle,
+        application.CompanyName,
+        application.PositionDescription,
+        application.CvContent,
+        history,
+        user_message,
+        application_id=application.Id
+    )
+
+    def generate():
+        clips = []
+        try:
+            for event, payload in events:
+                if event == 'audio':
+                    clips.append(payload['audioData'])
+                elif event == 'done' and persist:
+                    # The clips already went out as 'audio' events; store them joined, once
+                    payload = persist_turn(data['sessionId'], user_message, payload['text'], join_clips(clips), started_at)
+                yield _sse(event, payload)
+        except Exception as e:
+            yield _sse('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @api.route('/interview/feedback', methods=['POST'])
 def interview_feedback():
     data = request.json
     provider_name = data.get('provider', 'gemini')
-    app_id = data.get('applicationId')
-    history = data.get('history', [])
     
-    application = Application.query.get_or_404(app_id)
+    application, history = _conversation(data)
     
     provider = get_ai_provider(provider_name)
     try:
@@ -187,6 +443,7 @@ def interview_feedback():
 # --- Profile ---
 
 @api.route('/profile', methods=['GET'])
+@conditional(_profile_version)
 def get_profile():
     profile = UserProfile.query.order_by(UserProfile.Id.asc()).first()
     if not profile:
@@ -210,9 +467,39 @@ def upsert_profile():
     db.session.commit()
     return jsonify(profile.to_dict())
 
+def _newest_first(records, column):
+    # Same order as the list endpoints: newest first, undated last
+    return sorted(records, key=lambda r: (getattr(r, column) is not None, getattr(r, column) or date.min), reverse=True)
+
+@api.route('/profile/full', methods=['GET'])
+@conditional(_profile_version)
+def get_profile_full():
+    """Profile plus all five record collections: one query per table, one round trip."""
+    profile = UserProfile.query.options(
+        selectinload(UserProfile.careers),
+        selectinload(UserProfile.educations),
+        selectinload(UserProfile.achievements),
+        selectinload(UserProfile.certificates),
+        selectinload(UserProfile.projects),
+    ).order_by(UserProfile.Id.asc()).first()
+    if not profile:
+        profile = UserProfile()
+        db.session.add(profile)
+        db.session.commit()
+
+    return jsonify({
+        'profile': profile.to_dict(),
+        'career': [r.to_dict() for r in _newest_first(profile.careers, 'StartDate')],
+        'education': [r.to_dict() for r in _newest_first(profile.educations, 'StartDate')],
+        'achievements': [r.to_dict() for r in _newest_first(profile.achievements, 'IssueDate')],
+        'certificates': [r.to_dict() for r in _newest_first(profile.certificates, 'IssueDate')],
+        'projects': [r.to_dict() for r in _newest_first(profile.projects, 'StartDate')],
+    })
+
 # --- Career Records ---
 
 @api.route('/profile/career', methods=['GET'])
+@conditional(_profile_version)
 def list_career():
     profile = UserProfile.query.order_by(UserProfile.Id.asc()).first()
     records = CareerRecord.query.filter_by(ProfileId=profile.Id).order_by(CareerRecord.StartDate.desc().nullslast()).all() if profile else []
@@ -266,6 +553,7 @@ def delete_career(id):
 # --- Education Records ---
 
 @api.route('/profile/education', methods=['GET'])
+@conditional(_profile_version)
 def list_education():
     profile = UserProfile.query.order_by(UserProfile.Id.asc()).first()
     records = EducationRecord.query.filter_by(ProfileId=profile.Id).order_by(EducationRecord.StartDate.desc().nullslast()).all() if profile else []
@@ -317,6 +605,7 @@ def delete_education(id):
 # --- Achievements ---
 
 @api.route('/profile/achievement', methods=['GET'])
+@conditional(_profile_version)
 def list_achievement():
     profile = UserProfile.query.order_by(UserProfile.Id.asc()).first()
     records = Achievement.query.filter_by(ProfileId=profile.Id).order_by(Achievement.IssueDate.desc().nullslast()).all() if profile else []
@@ -362,6 +651,7 @@ def delete_achievement(id):
 # --- Certificates ---
 
 @api.route('/profile/certificate', methods=['GET'])
+@conditional(_profile_version)
 def list_certificate():
     profile = UserProfile.query.order_by(UserProfile.Id.asc()).first()
     records = Certificate.query.filter_by(ProfileId=profile.Id).order_by(Certificate.IssueDate.desc().nullslast()).all() if profile else []
@@ -411,6 +701,7 @@ def delete_certificate(id):
 # --- Projects ---
 
 @api.route('/profile/project', methods=['GET'])
+@conditional(_profile_version)
 def list_project():
     profile = UserProfile.query.order_by(UserProfile.Id.asc()).first()
     records = Project.query.filter_by(ProfileId=profile.Id).order_by(Project.StartDate.desc().nullslast()).all() if profile else []
@@ -459,114 +750,80 @@ def delete_project(id):
 
 # --- Import ---
 
+def _import_param(name):
+    return request.args.get(name) or (request.form.get(name) if request.form else None) or (request.json.get(name) if request.is_json else None)
+
+@api.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    # Raised while parsing a body over MAX_CONTENT_LENGTH (see app.py)
+    return jsonify({'error': f'Upload exceeds the {IMPORT_MAX_BYTES / (1024 * 1024):g} MB limit'}), 413
+
 @api.route('/profile/import', methods=['POST'])
 def import_profile():
-    source = request.args.get('source') or (request.form.get('source') if request.form else None) or (request.json.get('source') if request.is_json else None)
-    apply = (request.args.get('apply') or (request.form.get('apply') if request.form else None) or (request.json.get('apply') if request.is_json else None))
-    apply = str(apply).lower() == 'true'
+    source = _import_param('source')
+    apply = str(_import_param('apply')).lower() == 'true'
+    # async=true queues the import and answers 202 with a job to poll
+    run_async = str(_import_param('async')).lower() == 'true'
     if not source:
         return jsonify({'error': 'source required'}), 400
 
-    parsed = {'career': [], 'education': [], 'achievements': [], 'certificates': [], 'projects': []}
+    if source in ('pdf', 'docx'):
+        if 'file' not in request.files:
+            return jsonify({'error': f'file required for {source}'}), 400
+        payload = request.files['file'].stream
+    elif source == 'linkedin_url':
+        payload = _import_param('url')
+        if not payload:
+            return jsonify({'error': 'url required for linkedin_url'}), 400
+    elif source == 'text':
+        payload = (request.form.get('text') if request.form else None) or (request.json.get('text') if request.is_json else None)
+        if not payload:
+            return jsonify({'error': 'text required for text source'}), 400
+    else:
+        return jsonify({'error': 'unsupported source'}), 400
+
+    if run_async:
+        try:
+            job = enqueue_import(source, payload, apply)
+        except ExtractionError as e:
+            return jsonify({'error': str(e)}), e.status
+        status_url = url_for('api.get_import_job_status', job_id=job.Id)
+        return jsonify({'jobId': job.Id, 'status': job.Status, 'statusUrl': status_url}), 202, {'Location': status_url}
+
     try:
-        if source == 'pdf':
-            if 'file' not in request.files:
-                return jsonify({'error': 'file required for pdf'}), 400
-            f = request.files['file']
-            parsed = parse_pdf_bytes(f.read())
-        elif source == 'docx':
-            if 'file' not in request.files:
-                return jsonify({'error': 'file required for docx'}), 400
-            f = request.files['file']
-            parsed = parse_docx_bytes(f.read())
+        if source in ('pdf', 'docx'):
+            parsed = parse_upload(payload, source)
         elif source == 'linkedin_url':
-            url = request.args.get('url') or (request.form.get('url') if request.form else None) or (request.json.get('url') if request.is_json else None)
-            if not url:
-                return jsonify({'error': 'url required for linkedin_url'}), 400
-            parsed = parse_linkedin_url(url)
-        elif source == 'text':
-            text = (request.form.get('text') if request.form else None) or (request.json.get('text') if request.is_json else None)
-            if not text:
-                return jsonify({'error': 'text required for text source'}), 400
-            parsed = parse_text(text)
+            parsed = parse_linkedin_url(payload)
         else:
-            return jsonify({'error': 'unsupported source'}), 400
+            parsed = parse_text(payload)
+    except ExtractionError as e:
+        return jsonify({'error': str(e)}), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
     if not apply:
         return jsonify({'preview': parsed})
 
-    # Apply to DB
-    profile = UserProfile.query.order_by(UserProfile.Id.asc()).first()
-    if not profile:
-        profile = UserProfile()
-        db.session.add(profile)
-        db.session.commit()
-
-    def _date(v):
-        return datetime.fromisoformat(v).date() if v else None
-
-    for item in parsed.get('career', []):
-        db.session.add(CareerRecord(
-            ProfileId=profile.Id,
-            Title=item.get('title'),
-            Company=item.get('company'),
-            EmploymentType=item.get('employmentType'),
-            StartDate=_date(item.get('startDate')),
-            EndDate=_date(item.get('endDate')),
-            Current=bool(item.get('current')),
-            Location=item.get('location'),
-            Description=item.get('description'),
-            Skills=item.get('skills'),
-        ))
-
-    for item in parsed.get('education', []):
-        db.session.add(EducationRecord(
-            ProfileId=profile.Id,
-            School=item.get('school'),
-            Degree=item.get('degree'),
-            FieldOfStudy=item.get('fieldOfStudy'),
-            StartDate=_date(item.get('startDate')),
-            EndDate=_date(item.get('endDate')),
-            Grade=item.get('grade'),
-            Activities=item.get('activities'),
-            Description=item.get('description'),
-        ))
-
-    for item in parsed.get('achievements', []):
-        db.session.add(Achievement(
-            ProfileId=profile.Id,
-            Title=item.get('title'),
-            Issuer=item.get('issuer'),
-            IssueDate=_date(item.get('issueDate')),
-            Url=item.get('url'),
-            Description=item.get('description'),
-        ))
-
-    for item in parsed.get('certificates', []):
-        db.session.add(Certificate(
-            ProfileId=profile.Id,
-            Name=item.get('name'),
-            Authority=item.get('authority'),
-            LicenseNumber=item.get('licenseNumber'),
-            IssueDate=_date(item.get('issueDate')),
-            ExpirationDate=_date(item.get('expirationDate')),
-            Url=item.get('url'),
-            Description=item.get('description'),
-        ))
-
-    for item in parsed.get('projects', []):
-        db.session.add(Project(
-            ProfileId=profile.Id,
-            Name=item.get('name'),
-            Role=item.get('role'),
-            StartDate=_date(item.get('startDate')),
-            EndDate=_date(item.get('endDate')),
-            Url=item.get('url'),
-            Skills=item.get('skills'),
-            Description=item.get('description'),
-        ))
-
-    db.session.commit()
-    return jsonify({'applied': True})
+    try:
+        return jsonify(apply_import(parsed))
+    except ValueError as e:
+        return jsonify({'error': f'invalid date in import: {e}'}), 400
+
+@api.route('/profile/import/jobs/<job_id>', methods=['GET'])
+def get_import_job_status(job_id):
+    job = get_import_job(job_id)
+    if not job:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job.to_dict())
+
+@api.route('/profile/import/jobs/<job_id>', methods=['DELETE'])
+def cancel_import(job_id):
+    job = get_import_job(job_id)
+    if not job:
+        return jsonify({'error': 'Import job not found'}), 404
+    if not cancel_import_job(job):
+        if job.Status not in ImportJob.FINISHED:
+            return jsonify({'error': 'Import job is already applying its changes'}), 409
+        return jsonify({'error': f'Import job already {job.Status.lower()}'}), 409
+    return jsonify(job.to_dict())
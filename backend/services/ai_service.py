@@ -1,9 +1,16 @@
 import os
 import json
+import math
+import time
+import base64
+import random
+import asyncio
 from abc import ABC, abstractmethod
-from google import genai
 from google.genai import types
-from openai import OpenAI
+from .client_pool import client_pool
+from .prompt_cache import prompt_cache, gemini_context_cache
+from .tts_pipeline import SpeechPipeline, AsyncSpeechPipeline, pcm_to_wav
+from . import metrics, call_policy
 
 # Constants
 SYSTEM_INSTRUCTION_TEMPLATE = """
@@ -25,79 +32,291 @@ INSTRUCTIONS:
 6. Keep your responses concise (under 3 sentences) to keep the conversation flowing, unless explaining a complex concept.
 """
 
+OPENING_PROMPT = "Start the interview. Introduce yourself as the AI interviewer and ask the first question."
+
+def feedback_prompt(job_description, cv_content, history):
+    transcript = "\n".join([f"{m['sender']}: {m['text']}" for m in history])
+    return f"""
+        Analyze the following interview transcript.
+        Job Description: {job_description}
+        Candidate CV: {cv_content}
+        
+        TRANSCRIPT:
+        {transcript}
+        
+        Provide a detailed evaluation in JSON format with: overallScore, strengths, weaknesses, improvements, summary.
+        """
+
+def _http_options():
+    # Gemini request timeout in ms from the call policy's deadline
+    timeout = call_policy.remaining()
+    return types.HttpOptions(timeout=int(timeout * 1000)) if timeout else None
+
+def encode_audio(data):
+    # SDKs hand back raw bytes; the API always ships base64 strings
+    if isinstance(data, (bytes, bytearray)):
+        return base64.b64encode(data).decode('utf-8')
+    return data
+
 class AIProvider(ABC):
+    # Metric labels; tts_model is None when the provider has no speech synthesis
+    name = 'unknown'
+    text_model = None
+    tts_model = None
+    # Whether a recorded answer ({audioData, mimeType}) can be sent to the model as is
+    accepts_audio = False
+    # Container of the clips _synthesize_speech returns; only clips of one format can be joined
+    audio_format = None
+
     @abstractmethod
-    def start_interview(self, job_title, company, job_description, cv_content):
+    def _generate_feedback(self, job_description, cv_content, history):
+        """Return the evaluation dict; raise on failure so the call policy can retry."""
         pass
 
     @abstractmethod
-    def generate_turn(self, job_title, company, job_description, cv_content, history, latest_user_message):
+    def _stream_text(self, system_instruction, history, latest_user_message):
+        """Yield the interviewer reply as text deltas. system_instruction is a PromptPrefix."""
         pass
 
-    @abstractmethod
+    def _synthesize_speech(self, text):
+        """Return base64 audio for text, or None when the provider has no TTS."""
+        return None
+
+    # Every provider call goes through _text, _speech and generate_feedback (and
+    # their async twins), which apply the call policy and record metrics.
+
+    def _text(self, system_instruction, history, latest_user_message):
+        stream = call_policy.stream(self.name, lambda: self._stream_text(system_instruction, history, latest_user_message))
+        return metrics.timed_text(stream, self.name, self.text_model)
+
+    def _speech(self, text):
+        """Audio for one sentence; None if synthesis fails, so the turn still returns its text."""
+        if self.tts_model is None:
+            return self._synthesize_speech(text)
+        started = time.perf_counter()
+        try:
+            audio_data = call_policy.call(self.name, 'tts', self._synthesize_speech, text)
+        except Exception as e:
+            print(f"TTS Error ({self.name}): {e}")
+            metrics.ai_errors.inc(self.name, self.tts_model, 'tts')
+            return None
+        metrics.record_speech(self.name, self.tts_model, text, audio_data, time.perf_counter() - started)
+        return audio_data
+
+    def _reply_speech(self):
+        """The TTS function for every sentence of one reply."""
+        return self._speech
+
+    @metrics.timed_phase('feedback')
     def generate_feedback(self, job_description, cv_content, history):
-        pass
+        """The evaluation dict, or None if the provider failed."""
+        try:
+            return call_policy.call(self.name, 'feedback', self._generate_feedback, job_description, cv_content, history)
+        except Exception as e:
+            print(f"Feedback Error ({self.name}): {e}")
+            metrics.ai_errors.inc(self.name, self.text_model, 'feedback')
+            return None
 
-class GeminiProvider(AIProvider):
-    def __init__(self):
-        self.client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
+    def _get_system_instruction(self, job_title, company, job_description, cv_content, application_id=None):
+        # Rendered once per application and content hash, then reused every turn
+        return prompt_cache.render(SYSTEM_INSTRUCTION_TEMPLATE, job_title, company, job_description, cv_content, application_id)
+
+    def _reply(self, system_instruction, history, latest_user_message):
+        """
+        Generate the reply text and start synthesizing it. Sentences are
+        handed to the TTS pool as soon as they complete, so synthesis
+        overlaps with the rest of text generation. Returns (text, pipeline).
+        """
+        pipeline = SpeechPipeline(self._reply_speech())
+        chunks = []
+        for delta in self._text(system_instruction, history, latest_user_message):
+            if delta:
+                chunks.append(delta)
+                pipeline.feed(delta)
+        ai_text = ''.join(chunks)
+        if not ai_text:
+            ai_text = "I didn't catch that."
+            pipeline.feed(ai_text)
+        pipeline.close()
+        return ai_text, pipeline
+
+    def start_interview(self, job_title, company, job_description, cv_content, on_text=None, application_id=None):
+        """
+        Opening turn: one text generation, then TTS of exactly that text.
+        on_text(text) runs while the audio is still being synthesized, which
+        lets callers overlap their own work (e.g. DB writes) with TTS.
+        """
+        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content, application_id)
+        ai_text, pipeline = self._reply(system_instruction, [], OPENING_PROMPT)
+        if on_text:
+            on_text(ai_text)
+        return {
+            'text': ai_text,
+            'audioData': pipeline.joined()
+        }
 
-    def _get_system_instruction(self, job_title, company, job_description, cv_content):
-        return SYSTEM_INSTRUCTION_TEMPLATE.replace('{{JOB_TITLE}}', job_title) \
-            .replace('{{COMPANY}}', company) \
-            .replace('{{JOB_DESCRIPTION}}', job_description) \
-            .replace('{{CV_CONTENT}}', cv_content)
+    def generate_turn(self, job_title, company, job_description, cv_content, history, latest_user_message, application_id=None):
+        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content, application_id)
+        ai_text, pipeline = self._reply(system_instruction, history, latest_user_message)
+        return {
+            'text': ai_text,
+            'audioData': pipeline.joined()
+        }
 
-    def start_interview(self, job_title, company, job_description, cv_content):
-        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content)
-        
+    def stream_turn(self, job_title, company, job_description, cv_content, history, latest_user_message, application_id=None):
+        """
+        Streaming variant of generate_turn. Yields (event, payload) tuples:
+        'text' for each delta as the model produces it, 'audio' per sentence
+        in order as soon as it is synthesized, then 'done' with the full reply.
+        """
+        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content, application_id)
+
+        pipeline = SpeechPipeline(self._reply_speech())
+        chunks = []
+        for delta in self._text(system_instruction, history, latest_user_message):
+            if delta:
+                chunks.append(delta)
+                pipeline.feed(delta)
+                yield 'text', {'delta': delta}
+                for index, sentence, audio_data in pipeline.ready():
+                    if audio_data:
+                        yield 'audio', {'index': index, 'text': sentence, 'audioData': audio_data}
+        ai_text = ''.join(chunks)
+        if not ai_text:
+            ai_text = "I didn't catch that."
+            pipeline.feed(ai_text)
+
+        for index, sentence, audio_data in pipeline.drain():
+            if audio_data:
+                yield 'audio', {'index': index, 'text': sentence, 'audioData': audio_data}
+
+        yield 'done', {'text': ai_text}
+
+    # Async variants for the ASGI serving path (backend/asgi.py). Providers
+    # override _astream_text/_asynthesize_speech with native async SDK calls;
+    # the defaults run the sync ones on a worker thread.
+
+    async def _astream_text(self, system_instruction, history, latest_user_message):
+        stream = iter(self._stream_text(system_instruction, history, latest_user_message))
+        end = object()
+        while True:
+            delta = await asyncio.to_thread(next, stream, end)
+            if delta is end:
+                return
+            yield delta
+
+    async def _asynthesize_speech(self, text):
+        return await asyncio.to_thread(self._synthesize_speech, text)
+
+    async def _agenerate_feedback(self, job_description, cv_content, history):
+        return await asyncio.to_thread(self._generate_feedback, job_description, cv_content, history)
+
+    def _atext(self, system_instruction, history, latest_user_message):
+        stream = call_policy.astream(self.name, lambda: self._astream_text(system_instruction, history, latest_user_message))
+        return metrics.atimed_text(stream, self.name, self.text_model)
+
+    async def _aspeech(self, text):
+        if self.tts_model is None:
+            return await self._asynthesize_speech(text)
+        started = time.perf_counter()
         try:
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash-preview-tts',
-                contents="Start the interview. Introduce yourself as the AI interviewer and ask the first question.",
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    response_modalities=["AUDIO"],
-                    speech_config=types.SpeechConfig(
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name='Kore')
-                        )
-                    )
-                )
-            )
-            
-            # For TTS model, we might need a separate call for text or infer it.
-            # To keep it simple and consistent with previous logic:
-            text_response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents="Start the interview. Introduce yourself as the AI interviewer and ask the first question.",
-                config=types.GenerateContentConfig(system_instruction=system_instruction)
-            )
-            
-            audio_data = None
-            if response.candidates and response.candidates[0].content.parts:
-                for part in response.candidates[0].content.parts:
-                    if part.inline_data:
-                        audio_data = part.inline_data.data
-            
-            return {
-                'text': text_response.text,
-                'audioData': audio_data
-            }
+            audio_data = await call_policy.acall(self.name, 'tts', self._asynthesize_speech, text)
         except Exception as e:
-            print(f"Gemini Error: {e}")
-            raise e
+            print(f"TTS Error ({self.name}): {e}")
+            metrics.ai_errors.inc(self.name, self.tts_model, 'tts')
+            return None
+        metrics.record_speech(self.name, self.tts_model, text, audio_data, time.perf_counter() - started)
+        return audio_data
 
-    def generate_turn(self, job_title, company, job_description, cv_content, history, latest_user_message):
-        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content)
-        
-        # Convert history to Gemini format
+    def _areply_speech(self):
+        return self._aspeech
+
+    @metrics.timed_phase('feedback')
+    async def agenerate_feedback(self, job_description, cv_content, history):
+        try:
+            return await call_policy.acall(self.name, 'feedback', self._agenerate_feedback, job_description, cv_content, history)
+        except Exception as e:
+            print(f"Feedback Error ({self.name}): {e}")
+            metrics.ai_errors.inc(self.name, self.text_model, 'feedback')
+            return None
+
+    async def _areply(self, system_instruction, history, latest_user_message):
+        pipeline = AsyncSpeechPipeline(self._areply_speech())
+        chunks = []
+        async for delta in self._atext(system_instruction, history, latest_user_message):
+            if delta:
+                chunks.append(delta)
+                pipeline.feed(delta)
+        ai_text = ''.join(chunks)
+        if not ai_text:
+            ai_text = "I didn't catch that."
+            pipeline.feed(ai_text)
+        pipeline.close()
+        return ai_text, pipeline
+
+    async def astart_interview(self, job_title, company, job_description, cv_content, on_text=None, application_id=None):
+        """start_interview for the async path; on_text is awaited while TTS runs."""
+        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content, application_id)
+        ai_text, pipeline = await self._areply(system_instruction, [], OPENING_PROMPT)
+        if on_text:
+            await on_text(ai_text)
+        return {
+            'text': ai_text,
+            'audioData': await pipeline.joined()
+        }
+
+    async def agenerate_turn(self, job_title, company, job_description, cv_content, history, latest_user_message, application_id=None):
+        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content, application_id)
+        ai_text, pipeline = await self._areply(system_instruction, history, latest_user_message)
+        return {
+            'text': ai_text,
+            'audioData': await pipeline.joined()
+        }
+
+    async def astream_turn(self, job_title, company, job_description, cv_content, history, latest_user_message, application_id=None):
+        """Async generator with the same events as stream_turn."""
+        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content, application_id)
+
+        pipeline = AsyncSpeechPipeline(self._areply_speech())
+        try:
+            chunks = []
+            async for delta in self._atext(system_instruction, history, latest_user_message):
+                if delta:
+                    chunks.append(delta)
+                    pipeline.feed(delta)
+                    yield 'text', {'delta': delta}
+                    for index, sentence, audio_data in pipeline.ready():
+                        if audio_data:
+                            yield 'audio', {'index': index, 'text': sentence, 'audioData': audio_data}
+            ai_text = ''.join(chunks)
+            if not ai_text:
+                ai_text = "I didn't catch that."
+                pipeline.feed(ai_text)
+
+            async for index, sentence, audio_data in pipeline.drain():
+                if audio_data:
+                    yield 'audio', {'index': index, 'text': sentence, 'audioData': audio_data}
+
+            yield 'done', {'text': ai_text}
+        finally:
+            pipeline.cancel()
+
+class GeminiProvider(AIProvider):
+    name = 'gemini'
+    accepts_audio = True
+    text_model = 'gemini-2.5-flash'
+    tts_model = 'gemini-2.5-flash-preview-tts'
+    audio_format = 'wav'
+
+    def __init__(self, client=None):
+        self.client = client or client_pool.gemini(os.getenv('GEMINI_API_KEY'))
+
+    def _build_contents(self, history, latest_user_message):
         contents = []
         for msg in history:
             role = 'user' if msg['sender'] == 'USER' else 'model'
             contents.append(types.Content(role=role, parts=[types.Part(text=msg['text'])]))
-            
-        # Add latest user message
+
         user_parts = []
         if isinstance(latest_user_message, str):
             user_parts.append(types.Part(text=latest_user_message))
@@ -106,136 +325,212 @@ class GeminiProvider(AIProvider):
                  mime_type=latest_user_message['mimeType'],
                  data=latest_user_message['audioData']
              )))
-        
+
         contents.append(types.Content(role='user', parts=user_parts))
+        return contents
+
+    def _text_config(self, system_instruction, cached_content=None):
+        if cached_content:
+            return types.GenerateContentConfig(cached_content=cached_content, http_options=_http_options())
+        return types.GenerateContentConfig(system_instruction=system_instruction.text, http_options=_http_options())
+
+    def _record_usage(self, model, usage):
+        if usage is not None:
+            metrics.record_tokens(self.name, model, usage.prompt_token_count,
+                                  usage.candidates_token_count, usage.cached_content_token_count)
 
+    def _texts(self, stream, model):
+        # Usage totals ride on the last chunk
+        usage = None
+        for chunk in stream:
+            usage = getattr(chunk, 'usage_metadata', None) or usage
+            yield chunk.text or ''
+        self._record_usage(model, usage)
+
+    async def _atexts(self, stream, model):
+        usage = None
+        async for chunk in stream:
+            usage = getattr(chunk, 'usage_metadata', None) or usage
+            yield chunk.text or ''
+        self._record_usage(model, usage)
+
+    def _stream_text(self, system_instruction, history, latest_user_message):
+        model = self.text_model
+        cached_content = gemini_context_cache.lookup(self.client, model, system_instruction)
+        started = False
         try:
-            # 1. Generate Text
-            text_resp = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=contents,
-                config=types.GenerateContentConfig(system_instruction=system_instruction)
+            stream = self.client.models.generate_content_stream(
+                model=model,
+                contents=self._build_contents(history, latest_user_message),
+                config=self._text_config(system_instruction, cached_content)
             )
-            ai_text = text_resp.text or "I didn't catch that."
-
-            # 2. Generate Audio
-            tts_resp = self.client.models.generate_content(
-                model='gemini-2.5-flash-preview-tts',
-                contents=ai_text,
-                config=types.GenerateContentConfig(
-                    response_modalities=["AUDIO"],
-                    speech_config=types.SpeechConfig(
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name='Puck')
-                        )
-                    )
+            for text in self._texts(stream, model):
+                started = True
+                yield text
+        except Exception as e:
+            print(f"Gemini Error: {e}")
+            if cached_content and not started:
+                # The cached prefix may have expired or been evicted server-side; resend it inline
+                metrics.ai_errors.inc(self.name, model, 'text')
+                gemini_context_cache.invalidate(self.client, model, system_instruction)
+                stream = self.client.models.generate_content_stream(
+                    model=model,
+                    contents=self._build_contents(history, latest_user_message),
+                    config=self._text_config(system_instruction)
                 )
+                yield from self._texts(stream, model)
+                return
+            raise e
+
+    async def _astream_text(self, system_instruction, history, latest_user_message):
+        model = self.text_model
+        cached_content = await gemini_context_cache.alookup(self.client, model, system_instruction)
+        started = False
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=model,
+                contents=self._build_contents(history, latest_user_message),
+                config=self._text_config(system_instruction, cached_content)
             )
-            
-            audio_data = None
-            if tts_resp.candidates and tts_resp.candidates[0].content.parts:
-                for part in tts_resp.candidates[0].content.parts:
-                    if part.inline_data:
-                        audio_data = part.inline_data.data
-
-            return {
-                'text': ai_text,
-                'audioData': audio_data
-            }
+            async for text in self._atexts(stream, model):
+                started = True
+                yield text
         except Exception as e:
             print(f"Gemini Error: {e}")
+            if cached_content and not started:
+                metrics.ai_errors.inc(self.name, model, 'text')
+                gemini_context_cache.invalidate(self.client, model, system_instruction)
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=model,
+                    contents=self._build_contents(history, latest_user_message),
+                    config=self._text_config(system_instruction)
+                )
+                async for text in self._atexts(stream, model):
+                    yield text
+                return
             raise e
 
-    def generate_feedback(self, job_description, cv_content, history):
-        transcript = "\n".join([f"{m['sender']}: {m['text']}" for m in history])
-        prompt = f"""
-        Analyze the following interview transcript.
-        Job Description: {job_description}
-        Candidate CV: {cv_content}
-        
-        TRANSCRIPT:
-        {transcript}
-        
-        Provide a detailed evaluation in JSON format with: overallScore, strengths, weaknesses, improvements, summary.
-        """
-        
-        try:
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema={
-                        "type": "OBJECT",
-                        "properties": {
-                            "overallScore": {"type": "NUMBER"},
-                            "strengths": {"type": "ARRAY", "items": {"type": "STRING"}},
-                            "weaknesses": {"type": "ARRAY", "items": {"type": "STRING"}},
-                            "improvements": {"type": "ARRAY", "items": {"type": "STRING"}},
-                            "summary": {"type": "STRING"},
-                        },
-                        "required": ["overallScore", "strengths", "weaknesses", "improvements", "summary"]
-                    }
+    def _tts_config(self):
+        return types.GenerateContentConfig(
+            http_options=_http_options(),
+            response_modalities=["AUDIO"],
+            speech_config=types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(voice_name='Puck')
                 )
             )
-            return json.loads(response.text)
-        except Exception as e:
-            print(f"Gemini Feedback Error: {e}")
+        )
+
+    def _audio_from(self, tts_resp):
+        audio_data = None
+        if tts_resp.candidates and tts_resp.candidates[0].content.parts:
+            for part in tts_resp.candidates[0].content.parts:
+                if part.inline_data:
+                    audio_data = part.inline_data
+        if audio_data is None or not audio_data.data:
             return None
+        data = audio_data.data
+        if isinstance(data, (bytes, bytearray)) and not data.startswith(b'RIFF'):
+            # Raw PCM has no header; stored as is it would be served as application/octet-stream
+            data = pcm_to_wav(data, getattr(audio_data, 'mime_type', None))
+        return encode_audio(data)
+
+    def _synthesize_speech(self, text):
+        tts_resp = self.client.models.generate_content(
+            model=self.tts_model,
+            contents=text,
+            config=self._tts_config()
+        )
+        return self._audio_from(tts_resp)
+
+    async def _asynthesize_speech(self, text):
+        tts_resp = await self.client.aio.models.generate_content(
+            model=self.tts_model,
+            contents=text,
+            config=self._tts_config()
+        )
+        return self._audio_from(tts_resp)
+
+    def _generate_feedback(self, job_description, cv_content, history):
+        response = self.client.models.generate_content(
+            model=self.text_model,
+            contents=feedback_prompt(job_description, cv_content, history),
+            config=self._feedback_config()
+        )
+        self._record_usage(self.text_model, getattr(response, 'usage_metadata', None))
+        return json.loads(response.text)
+
+    async def _agenerate_feedback(self, job_description, cv_content, history):
+        response = await self.client.aio.models.generate_content(
+            model=self.text_model,
+            contents=feedback_prompt(job_description, cv_content, history),
+            config=self._feedback_config()
+        )
+        self._record_usage(self.text_model, getattr(response, 'usage_metadata', None))
+        return json.loads(response.text)
+
+    def _feedback_config(self):
+        return types.GenerateContentConfig(
+            http_options=_http_options(),
+            response_mime_type="application/json",
+            response_schema={
+                "type": "OBJECT",
+                "properties": {
+                    "overallScore": {"type": "NUMBER"},
+                    "strengths": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "weaknesses": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "improvements": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "summary": {"type": "STRING"},
+                },
+                "required": ["overallScore", "strengths", "weaknesses", "improvements", "summary"]
+            }
+        )
 
 class OpenAIProvider(AIProvider):
-    def __init__(self, api_key=None, base_url=None, model="gpt-4o"):
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+    name = 'openai'
+    audio_format = 'mp3'
+
+    def __init__(self, api_key=None, base_url=None, model="gpt-4o", client=None, async_client=None):
+        self.client = client or client_pool.openai(api_key, base_url)
         self.model = model
+        self._api_key = api_key
+        self._base_url = base_url
+        self._async_client = async_client
 
-    def _get_system_instruction(self, job_title, company, job_description, cv_content):
-        return SYSTEM_INSTRUCTION_TEMPLATE.replace('{{JOB_TITLE}}', job_title) \
-            .replace('{{COMPANY}}', company) \
-            .replace('{{JOB_DESCRIPTION}}', job_description) \
-            .replace('{{CV_CONTENT}}', cv_content)
-
-    def start_interview(self, job_title, company, job_description, cv_content):
-        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content)
-        messages = [
-            {"role": "system", "content": system_instruction},
-            {"role": "user", "content": "Start the interview. Introduce yourself as the AI interviewer and ask the first question."}
-        ]
-        
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages
-            )
-            text = response.choices[0].message.content
-            
-            # OpenAI TTS (Optional, if not DeepSeek)
-            audio_data = None
-            if "gpt" in self.model: # Only use OpenAI TTS for OpenAI models
-                try:
-                    tts_response = self.client.audio.speech.create(
-                        model="tts-1",
-                        voice="alloy",
-                        input=text
-                    )
-                    # Convert to base64
-                    import base64
-                    audio_data = base64.b64encode(tts_response.content).decode('utf-8')
-                except Exception as e:
-                    print(f"OpenAI TTS Error: {e}")
-
-            return {'text': text, 'audioData': audio_data}
-        except Exception as e:
-            print(f"OpenAI Error: {e}")
-            raise e
+    @property
+    def async_client(self):
+        # Only the ASGI path needs it, so it is fetched from the pool on first use
+        if self._async_client is None:
+            self._async_client = client_pool.async_openai(self._api_key, self._base_url)
+        return self._async_client
+
+    @property
+    def text_model(self):
+        return self.model
+
+    @property
+    def tts_model(self):
+        # Only OpenAI's own models come with its TTS
+        return "tts-1" if "gpt" in self.model else None
+
+    def _timeout_args(self):
+        timeout = call_policy.remaining()
+        return {'timeout': timeout} if timeout else {}
+
+    def _record_usage(self, usage):
+        if usage is not None:
+            details = getattr(usage, 'prompt_tokens_details', None)
+            metrics.record_tokens(self.name, self.model, usage.prompt_tokens, usage.completion_tokens,
+                                  getattr(details, 'cached_tokens', None))
+
+    def _build_messages(self, system_instruction, history, latest_user_message):
+        # The system prompt leads every request byte-for-byte, so the provider's prefix cache can reuse it
+        messages = [{"role": "system", "content": system_instruction.text}]
 
-    def generate_turn(self, job_title, company, job_description, cv_content, history, latest_user_message):
-        system_instruction = self._get_system_instruction(job_title, company, job_description, cv_content)
-        messages = [{"role": "system", "content": system_instruction}]
-        
         for msg in history:
             role = 'user' if msg['sender'] == 'USER' else 'assistant'
             messages.append({"role": role, "content": msg['text']})
-            
+
         if isinstance(latest_user_message, str):
             messages.append({"role": "user", "content": latest_user_message})
         else:
@@ -243,71 +538,383 @@ class OpenAIProvider(AIProvider):
             # OpenAI API doesn't accept audio directly in chat completion (except GPT-4o-audio which is preview)
             # For this implementation, we assume text input or pre-transcribed audio
             messages.append({"role": "user", "content": "(Audio input not supported directly in this provider yet)"})
+        return messages
+
+    def _chat_args(self, system_instruction, history, latest_user_message):
+        args = {
+            'model': self.model,
+            'messages': self._build_messages(system_instruction, history, latest_user_message),
+            'stream': True,
+            # Adds a final chunk with token usage and no choices
+            'stream_options': {'include_usage': True},
+            **self._timeout_args(),
+        }
+        if "gpt" in self.model: # prompt_cache_key routes turns of one application to the same cache
+            args['prompt_cache_key'] = system_instruction.key
+        return args
 
+    def _stream_text(self, system_instruction, history, latest_user_message):
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages
+            stream = self.client.chat.completions.create(
+                **self._chat_args(system_instruction, history, latest_user_message)
             )
-            text = response.choices[0].message.content
-            
-            audio_data = None
-            if "gpt" in self.model:
-                try:
-                    tts_response = self.client.audio.speech.create(
-                        model="tts-1",
-                        voice="alloy",
-                        input=text
-                    )
-                    import base64
-                    audio_data = base64.b64encode(tts_response.content).decode('utf-8')
-                except Exception as e:
-                     print(f"OpenAI TTS Error: {e}")
-
-            return {'text': text, 'audioData': audio_data}
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                elif getattr(chunk, 'usage', None):
+                    self._record_usage(chunk.usage)
         except Exception as e:
             print(f"OpenAI Error: {e}")
             raise e
 
-    def generate_feedback(self, job_description, cv_content, history):
-        transcript = "\n".join([f"{m['sender']}: {m['text']}" for m in history])
-        prompt = f"""
-        Analyze the following interview transcript.
-        Job Description: {job_description}
-        Candidate CV: {cv_content}
-        
-        TRANSCRIPT:
-        {transcript}
-        
-        Provide a detailed evaluation in JSON format with: overallScore, strengths, weaknesses, improvements, summary.
-        """
-        
+    async def _astream_text(self, system_instruction, history, latest_user_message):
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
+            stream = await self.async_client.chat.completions.create(
+                **self._chat_args(system_instruction, history, latest_user_message)
             )
-            return json.loads(response.choices[0].message.content)
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                elif getattr(chunk, 'usage', None):
+                    self._record_usage(chunk.usage)
         except Exception as e:
-            print(f"OpenAI Feedback Error: {e}")
+            print(f"OpenAI Error: {e}")
+            raise e
+
+    def _synthesize_speech(self, text):
+        # OpenAI TTS (Optional, if not DeepSeek)
+        if self.tts_model is None: # Only use OpenAI TTS for OpenAI models
+            return None
+        tts_response = self.client.audio.speech.create(
+            model=self.tts_model,
+            voice="alloy",
+            input=text,
+            **self._timeout_args()
+        )
+        return encode_audio(tts_response.content)
+
+    async def _asynthesize_speech(self, text):
+        if self.tts_model is None:
             return None
+        tts_response = await self.async_client.audio.speech.create(
+            model=self.tts_model,
+            voice="alloy",
+            input=text,
+            **self._timeout_args()
+        )
+        return encode_audio(tts_response.content)
+
+    def _feedback_args(self, job_description, cv_content, history):
+        return {
+            'model': self.model,
+            'messages': [{"role": "user", "content": feedback_prompt(job_description, cv_content, history)}],
+            'response_format': {"type": "json_object"},
+            **self._timeout_args(),
+        }
+
+    def _generate_feedback(self, job_description, cv_content, history):
+        response = self.client.chat.completions.create(**self._feedback_args(job_description, cv_content, history))
+        self._record_usage(response.usage)
+        return json.loads(response.choices[0].message.content)
+
+    async def _agenerate_feedback(self, job_description, cv_content, history):
+        response = await self.async_client.chat.completions.create(**self._feedback_args(job_description, cv_content, history))
+        self._record_usage(response.usage)
+        return json.loads(response.choices[0].message.content)
 
 class DeepSeekProvider(OpenAIProvider):
-    def __init__(self):
+    name = 'deepseek'
+
+    def __init__(self, client=None, async_client=None):
         super().__init__(
             api_key=os.getenv('DEEPSEEK_API_KEY'),
             base_url="https://api.deepseek.com",
-            model="deepseek-chat"
+            model="deepseek-chat",
+            client=client,
+            async_client=async_client
         )
     
     # DeepSeek inherits OpenAI logic but uses DeepSeek API URL and Model
     # Note: DeepSeek does not support TTS, so audioData will be None
 
+# Offline stand-in for load tests and local development. Disabled by
+# default so a client cannot pick it in production.
+MOCK_PROVIDER = os.getenv('MOCK_PROVIDER', 'false').lower() == 'true'
+# Latencies are log-normal: the median in seconds, and sigma for the tail (0 = fixed)
+MOCK_TTFT = float(os.getenv('MOCK_TTFT', '0.4'))
+MOCK_TTS_LATENCY = float(os.getenv('MOCK_TTS_LATENCY', '0.3'))
+MOCK_FEEDBACK_LATENCY = float(os.getenv('MOCK_FEEDBACK_LATENCY', '2.0'))
+MOCK_LATENCY_SIGMA = float(os.getenv('MOCK_LATENCY_SIGMA', '0.5'))
+MOCK_TOKENS_PER_SEC = float(os.getenv('MOCK_TOKENS_PER_SEC', '150'))
+MOCK_TTS_CHARS_PER_SEC = float(os.getenv('MOCK_TTS_CHARS_PER_SEC', '800'))
+MOCK_REPLY_WORDS = int(os.getenv('MOCK_REPLY_WORDS', '45'))
+# 24 kHz 16-bit mono PCM is about 48 KB per second of speech, roughly 15 characters
+MOCK_AUDIO_BYTES_PER_CHAR = int(os.getenv('MOCK_AUDIO_BYTES_PER_CHAR', '3200'))
+
+MOCK_WORDS = ('thanks for walking me through that so how did you decide on the design and what '
+              'would you change if the traffic doubled tell me about a time the team disagreed').split()
+
+class MockProvider(AIProvider):
+    """
+    Simulated provider with no network calls: log-normal time to first
+    token, TTS and feedback latency, a fixed token rate, and random audio
+    sized per character. Sync calls sleep; async calls await, so both
+    serving paths behave like a real SDK under load.
+    """
+    name = 'mock'
+    accepts_audio = True
+    text_model = 'mock-text'
+    tts_model = 'mock-tts'
+    audio_format = 'raw'
+    CHUNK_WORDS = 6
+
+    def __init__(self, ttft=MOCK_TTFT, tts_latency=MOCK_TTS_LATENCY, feedback_latency=MOCK_FEEDBACK_LATENCY,
+                 sigma=MOCK_LATENCY_SIGMA, tokens_per_sec=MOCK_TOKENS_PER_SEC, tts_chars_per_sec=MOCK_TTS_CHARS_PER_SEC,
+                 reply_words=MOCK_REPLY_WORDS, audio_bytes_per_char=MOCK_AUDIO_BYTES_PER_CHAR, seed=None):
+        self.ttft = ttft
+        self.tts_latency = tts_latency
+        self.feedback_latency = feedback_latency
+        self.sigma = sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.tts_chars_per_sec = tts_chars_per_sec
+        self.reply_words = reply_words
+        self.audio_bytes_per_char = audio_bytes_per_char
+        self._rng = random.Random(seed)
+
+    def _latency(self, median):
+        return self._rng.lognormvariate(math.log(median), self.sigma) if median > 0 else 0.0
+
+    def _chunks(self, history, latest_user_message):
+        # Deterministic per conversation length, so repeated runs produce the same text
+        rng = random.Random(len(history))
+        words = [rng.choice(MOCK_WORDS) for _ in range(self.reply_words)]
+        sentences = [' '.join(words[i:i + 12]).capitalize() + '.' for i in range(0, len(words), 12)]
+        words = ' '.join(sentences).split(' ')
+        chunks = [' '.join(words[i:i + self.CHUNK_WORDS]) + ' ' for i in range(0, len(words), self.CHUNK_WORDS)]
+        prompt = len(str(latest_user_message)) + sum(len(m['text']) for m in history)
+        # About 4 characters per token, as with the real tokenizers
+        metrics.record_tokens(self.name, self.text_model, prompt // 4, len(words))
+        return chunks
+
+    def _chunk_delay(self):
+        return self.CHUNK_WORDS / self.tokens_per_sec
+
+    def _audio(self, text):
+        return encode_audio(self._rng.randbytes(len(text) * self.audio_bytes_per_char))
+
+    def _tts_delay(self, text):
+        return self._latency(self.tts_latency) + len(text) / self.tts_chars_per_sec
+
+    def _feedback(self, history):
+        return {
+            'overallScore': 70 + len(history) % 25,
+            'strengths': ['Clear structure in answers', 'Concrete examples'],
+            'weaknesses': ['Limited detail on trade-offs'],
+            'improvements': ['Quantify the impact of past work'],
+            'summary': f'Mock evaluation of {len(history)} messages.',
+        }
+
+    def _stream_text(self, system_instruction, history, latest_user_message):
+        time.sleep(self._latency(self.ttft))
+        for chunk in self._chunks(history, latest_user_message):
+            yield chunk
+            time.sleep(self._chunk_delay())
+
+    async def _astream_text(self, system_instruction, history, latest_user_message):
+        await asyncio.sleep(self._latency(self.ttft))
+        for chunk in self._chunks(history, latest_user_message):
+            yield chunk
+            await asyncio.sleep(self._chunk_delay())
+
+    def _synthesize_speech(self, text):
+        time.sleep(self._tts_delay(text))
+        return self._audio(text)
+
+    async def _asynthesize_speech(self, text):
+        await asyncio.sleep(self._tts_delay(text))
+        return self._audio(text)
+
+    def _generate_feedback(self, job_description, cv_content, history):
+        time.sleep(self._latency(self.feedback_latency))
+        return self._feedback(history)
+
+    async def _agenerate_feedback(self, job_description, cv_content, history):
+        await asyncio.sleep(self._latency(self.feedback_latency))
+        return self._feedback(history)
+
+# Backends 'auto' may use, best first; ones without an API key are skipped
+AI_ROUTING_ORDER = [name.strip() for name in os.getenv('AI_ROUTING_ORDER', 'gemini,openai,deepseek').split(',') if name.strip()]
+# Share of calls sent to a random healthy backend first, so a recovered one gets re-measured
+AI_ROUTING_EXPLORE = float(os.getenv('AI_ROUTING_EXPLORE', '0.05'))
+
+ROUTING_KEYS = {'gemini': 'GEMINI_API_KEY', 'openai': 'OPENAI_API_KEY', 'deepseek': 'DEEPSEEK_API_KEY'}
+
+def _routing_backends():
+    names = [name for name in AI_ROUTING_ORDER
+             if (name == 'mock' and MOCK_PROVIDER) or os.getenv(ROUTING_KEYS.get(name, ''), '')]
+    return [get_ai_provider(name) for name in names] or [GeminiProvider()]
+
+class RoutingProvider(AIProvider):
+    """
+    Sends each call to the backend expected to answer fastest, from the
+    rolling latency and error rates the call policy keeps per provider.
+    Backends with an open circuit go last. Text, speech and feedback are
+    routed independently, so a reply can be written by DeepSeek and
+    spoken by another provider's TTS. When the chosen backend fails
+    before producing anything, the next one is tried; for speech, only
+    backends with the same audio format as the first choice, since one
+    reply's clips are joined into a single recording.
+    """
+    name = 'auto'
+
+    def __init__(self, backends=None):
+        self.backends = backends or _routing_backends()
+
+    def _ranked(self, phase, backends):
+        def key(item):
+            position, backend = item
+            latency = call_policy.expected_latency(backend.name, phase)
+            # Unmeasured backends sort first so each gets measured once; ones that have only failed sort last
+            return (not call_policy.available(backend.name), 0.0 if latency is None else latency, position)
+        ranked = [backend for _, backend in sorted(enumerate(backends), key=key)]
+        healthy = [b for b in ranked if call_policy.available(b.name)]
+        if len(healthy) > 1 and random.random() < AI_ROUTING_EXPLORE:
+            explore = random.choice(healthy[1:])
+            ranked.remove(explore)
+            ranked.insert(0, explore)
+        return ranked
+
+    def _text_backends(self, latest_user_message):
+        if isinstance(latest_user_message, dict):
+            # Only some models take the recording itself; the rest would answer a placeholder
+            listening = [b for b in self.backends if b.accepts_audio]
+            if listening:
+                return self._ranked('ttft', listening)
+        return self._ranked('ttft', self.backends)
+
+    def _speech_backends(self):
+        return self._ranked('tts', [b for b in self.backends if b.tts_model is not None])
+
+    def _failover(self, phase, backend, error):
+        print(f"Routing: {phase} failed on {backend.name}, trying the next backend: {error}")
+        metrics.ai_failovers.inc(phase, backend.name)
+
+    # The backends apply the call policy and record metrics themselves, so
+    # routing replaces the wrapped entry points rather than adding a layer.
+
+    def _stream_text(self, system_instruction, history, latest_user_message):
+        error = None
+        for backend in self._text_backends(latest_user_message):
+            stream = backend._text(system_instruction, history, latest_user_message)
+            try:
+                first = next(stream, None)
+            except Exception as e:
+                self._failover('text', backend, e)
+                error = e
+                continue
+            metrics.ai_routed.inc('text', backend.name)
+            if first is not None:
+                yield first
+                yield from stream
+            return
+        raise error
+
+    def _text(self, system_instruction, history, latest_user_message):
+        return self._stream_text(system_instruction, history, latest_user_message)
+
+    async def _astream_text(self, system_instruction, history, latest_user_message):
+        error = None
+        for backend in self._text_backends(latest_user_message):
+            stream = backend._atext(system_instruction, history, latest_user_message)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                metrics.ai_routed.inc('text', backend.name)
+                return
+            except Exception as e:
+                self._failover('text', backend, e)
+                error = e
+                continue
+            metrics.ai_routed.inc('text', backend.name)
+            yield first
+            async for delta in stream:
+                yield delta
+            return
+        raise error
+
+    def _atext(self, system_instruction, history, latest_user_message):
+        return self._astream_text(system_instruction, history, latest_user_message)
+
+    def _voices(self):
+        # Chosen before the first sentence is submitted, so concurrent sentences agree
+        ranked = self._speech_backends()
+        return [b for b in ranked if b.audio_format == ranked[0].audio_format] if ranked else []
+
+    def _reply_speech(self):
+        voices = self._voices()
+
+        def speech(text):
+            for backend in voices:
+                # A backend's _speech returns None once its own retries are exhausted
+                audio_data = backend._speech(text)
+                if audio_data:
+                    metrics.ai_routed.inc('tts', backend.name)
+                    return audio_data
+                self._failover('tts', backend, 'no audio')
+            return None
+        return speech
+
+    def _areply_speech(self):
+        voices = self._voices()
+
+        async def speech(text):
+            for backend in voices:
+                audio_data = await backend._aspeech(text)
+                if audio_data:
+                    metrics.ai_routed.inc('tts', backend.name)
+                    return audio_data
+                self._failover('tts', backend, 'no audio')
+            return None
+        return speech
+
+    def _speech(self, text):
+        return self._reply_speech()(text)
+
+    async def _aspeech(self, text):
+        return await self._areply_speech()(text)
+
+    def _generate_feedback(self, job_description, cv_content, history):
+        for backend in self._ranked('feedback', self.backends):
+            feedback = backend.generate_feedback(job_description, cv_content, history)
+            if feedback is not None:
+                metrics.ai_routed.inc('feedback', backend.name)
+                return feedback
+            self._failover('feedback', backend, 'no evaluation')
+        return None
+
+    def generate_feedback(self, job_description, cv_content, history):
+        return self._generate_feedback(job_description, cv_content, history)
+
+    async def agenerate_feedback(self, job_description, cv_content, history):
+        for backend in self._ranked('feedback', self.backends):
+            feedback = await backend.agenerate_feedback(job_description, cv_content, history)
+            if feedback is not None:
+                metrics.ai_routed.inc('feedback', backend.name)
+                return feedback
+            self._failover('feedback', backend, 'no evaluation')
+        return None
+
 def get_ai_provider(provider_name='gemini'):
+    # Providers are cheap wrappers; the SDK clients underneath come from the process-wide pool
     if provider_name == 'openai':
         return OpenAIProvider(api_key=os.getenv('OPENAI_API_KEY'))
     elif provider_name == 'deepseek':
         return DeepSeekProvider()
+    elif provider_name == 'mock' and MOCK_PROVIDER:
+        return MockProvider()
+    elif provider_name == 'auto':
+        return RoutingProvider()
     else:
+        if provider_name not in (None, 'gemini'):
+            print(f"Unknown AI provider '{provider_name}', using gemini")
         return GeminiProvider()
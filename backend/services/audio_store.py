@@ -0,0 +1,123 @@
+import os
+import re
+import uuid
+import base64
+import hashlib
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from flask import current_app
+
+AUDIO_ID_PATTERN = re.compile(r'^[0-9a-f]{32,64}$')
+
+# Magic numbers for the formats the providers hand back
+_SIGNATURES = [
+    (b'ID3', 'audio/mpeg'),
+    (b'\xff\xfb', 'audio/mpeg'),
+    (b'\xff\xf3', 'audio/mpeg'),
+    (b'\xff\xf2', 'audio/mpeg'),
+    (b'RIFF', 'audio/wav'),
+    (b'OggS', 'audio/ogg'),
+    (b'\x1a\x45\xdf\xa3', 'audio/webm'),
+    (b'fLaC', 'audio/flac'),
+]
+
+def sniff_mimetype(head):
+    for signature, mimetype in _SIGNATURES:
+        if head.startswith(signature):
+            return mimetype
+    return 'application/octet-stream'
+
+class AudioStore(ABC):
+    """Stores audio clips as raw bytes outside the database; messages keep only the id."""
+
+    immutable = False
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @abstractmethod
+    def _new_id(self, data):
+        pass
+
+    @abstractmethod
+    def path(self, audio_id):
+        """Filesystem path for audio_id (the id must already be validated)."""
+        pass
+
+    def put(self, data):
+        audio_id = self._new_id(data)
+        target = self.path(audio_id)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Write-then-rename so readers never see a half-written clip
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, target)
+        return audio_id
+
+    def put_base64(self, audio_b64):
+        return self.put(base64.b64decode(audio_b64)) if audio_b64 else None
+
+    def locate(self, audio_id):
+        """Return the path for a stored clip, or None for unknown or malformed ids."""
+        if not audio_id or not AUDIO_ID_PATTERN.match(audio_id):
+            return None
+        target = self.path(audio_id)
+        return target if os.path.isfile(target) else None
+
+    def mimetype(self, audio_id):
+        with open(self.path(audio_id), 'rb') as f:
+            return sniff_mimetype(f.read(16))
+
+    def delete(self, audio_id):
+        target = self.locate(audio_id)
+        if target:
+            os.remove(target)
+
+class FileSystemAudioStore(AudioStore):
+    """One file per clip in a flat directory, named by a random id."""
+
+    def _new_id(self, data):
+        return uuid.uuid4().hex
+
+    def path(self, audio_id):
+        return os.path.join(self.root, audio_id)
+
+class ContentAddressedAudioStore(AudioStore):
+    """
+    Clips named by their SHA-256 and fanned out over two directory levels.
+    Identical clips are stored once and ids never change meaning, so
+    responses can be cached forever.
+    """
+
+    immutable = True
+
+    def _new_id(self, data):
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, audio_id):
+        return os.path.join(self.root, audio_id[:2], audio_id[2:4], audio_id)
+
+AUDIO_STORE_BACKENDS = {
+    'filesystem': FileSystemAudioStore,
+    'cas': ContentAddressedAudioStore,
+}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_audio_store():
+    backend = current_app.config['AUDIO_STORE']
+    root = current_app.config['AUDIO_STORE_DIR']
+    key = (backend, root)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = AUDIO_STORE_BACKENDS[backend](root)
+                _stores[key] = store
+    return store
@@ -0,0 +1,421 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from . import metrics
+
+# Whole-call deadlines per phase in seconds, retries included. ttft bounds the
+# wait for the first text delta, text the whole streamed reply.
+AI_DEADLINES = {
+    'ttft': float(os.getenv('AI_TTFT_DEADLINE', '20')),
+    'text': float(os.getenv('AI_TEXT_DEADLINE', '60')),
+    'tts': float(os.getenv('AI_TTS_DEADLINE', '20')),
+    'feedback': float(os.getenv('AI_FEEDBACK_DEADLINE', '90')),
+}
+AI_MAX_RETRIES = int(os.getenv('AI_MAX_RETRIES', '2'))
+AI_RETRY_BASE = float(os.getenv('AI_RETRY_BASE', '0.25'))
+AI_RETRY_CAP = float(os.getenv('AI_RETRY_CAP', '4'))
+# Send a duplicate request if the first has not answered after this many seconds; 0 turns hedging off.
+# Only idempotent one-shot calls are hedged, never streams.
+AI_HEDGE_AFTER = {
+    'tts': float(os.getenv('AI_HEDGE_TTS_AFTER', '0')),
+    'feedback': float(os.getenv('AI_HEDGE_FEEDBACK_AFTER', '0')),
+}
+AI_HEDGE_WORKERS = int(os.getenv('AI_HEDGE_WORKERS', '8'))
+# Consecutive transient failures that open a provider's circuit, and how long it stays open
+AI_BREAKER_FAILURES = int(os.getenv('AI_BREAKER_FAILURES', '5'))
+AI_BREAKER_RESET = float(os.getenv('AI_BREAKER_RESET', '30'))
+# Weight of the newest observation in the rolling latency and error averages
+AI_HEALTH_DECAY = float(os.getenv('AI_HEALTH_DECAY', '0.2'))
+
+# HTTP statuses worth retrying; other 4xx are the request's fault and would fail again
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+class CircuitOpen(Exception):
+    def __init__(self, provider):
+        super().__init__(f'{provider} is unavailable (circuit open)')
+        self.provider = provider
+
+def is_transient(error):
+    """Timeouts, connection failures, 429 and 5xx; SDKs expose the status as status_code or code."""
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    if isinstance(status, int):
+        return status in RETRY_STATUSES
+    # Bad model output or a bug in our code; retrying will not help
+    return not isinstance(error, (ValueError, TypeError, KeyError, AttributeError, CircuitOpen))
+
+def _is_timeout(error):
+    return isinstance(error, TimeoutError) or 'Timeout' in type(error).__name__
+
+class CircuitBreaker:
+    """
+    Closed -> open after AI_BREAKER_FAILURES consecutive transient
+    failures; open -> half-open after AI_BREAKER_RESET, letting one trial
+    call through; the trial's outcome closes or reopens the circuit.
+    """
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2  # also the exported gauge values
+
+    def __init__(self, failures=AI_BREAKER_FAILURES, reset_after=AI_BREAKER_RESET):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.state = self.CLOSED
+        self._consecutive = 0
+        self._changed_at = 0.0
+        self._lock = threading.Lock()
+
+    def available(self):
+        """Whether allow() would let a call through, without starting a trial."""
+        with self._lock:
+            return self.state == self.CLOSED or time.monotonic() - self._changed_at >= self.reset_after
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            # A trial that never reported back (e.g. an abandoned stream) must not wedge the circuit
+            if time.monotonic() - self._changed_at < self.reset_after:
+                return False
+            self.state = self.HALF_OPEN
+            self._changed_at = time.monotonic()
+            return True
+
+    def success(self):
+        with self._lock:
+            self._consecutive = 0
+            self.state = self.CLOSED
+
+    def failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self.state == self.HALF_OPEN or self._consecutive >= self.failures:
+                self.state = self.OPEN
+                self._changed_at = time.monotonic()
+
+class ProviderHealth:
+    """Exponentially weighted latency of successful calls and share of failed ones."""
+
+    def __init__(self, decay=AI_HEALTH_DECAY):
+        self.decay = decay
+        self.latency = None
+        self.error_rate = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds=None, ok=True):
+        with self._lock:
+            self.error_rate += self.decay * ((0.0 if ok else 1.0) - self.error_rate)
+            if ok:
+                self.latency = seconds if self.latency is None else self.latency + self.decay * (seconds - self.latency)
+
+    def expected_latency(self):
+        """
+        Latency inflated by the error rate (a failed call costs a retry);
+        None until measured, infinite if every call so far has failed.
+        """
+        with self._lock:
+            if self.latency is None:
+                return float('inf') if self.error_rate > 0 else None
+            return self.latency / max(0.05, 1.0 - self.error_rate)
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+_health = {}  # (provider, phase) -> ProviderHealth; phases: ttft, tts, feedback
+
+def get_breaker(provider):
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(provider, CircuitBreaker())
+    return breaker
+
+def get_health(provider, phase):
+    health = _health.get((provider, phase))
+    if health is None:
+        with _breakers_lock:
+            health = _health.setdefault((provider, phase), ProviderHealth())
+    return health
+
+def available(provider):
+    return get_breaker(provider).available()
+
+def expected_latency(provider, phase):
+    return get_health(provider, phase).expected_latency()
+
+def _collect_breakers():
+    for provider, breaker in list(_breakers.items()):
+        metrics.ai_circuit_state.set(provider, value=breaker.state)
+    for (provider, phase), health in list(_health.items()):
+        if health.latency is not None:
+            metrics.ai_latency_ewma.set(provider, phase, value=health.latency)
+        metrics.ai_error_rate.set(provider, phase, value=health.error_rate)
+
+metrics.registry.add_collector(_collect_breakers)
+
+_hedge_executor = None
+_hedge_lock = threading.Lock()
+
+def _get_hedge_executor():
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=AI_HEDGE_WORKERS, thread_name_prefix='hedge')
+        return _hedge_executor
+
+def _forget_executor():
+    global _hedge_executor, _hedge_lock
+    _hedge_executor = None
+    _hedge_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_executor)
+
+# Absolute time.monotonic() deadline of the call in progress, read by providers
+# through remaining() to set SDK request timeouts
+_deadline = contextvars.ContextVar('ai_call_deadline', default=None)
+
+def remaining():
+    """Seconds left for the provider call in progress, or None outside the policy."""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.001, deadline - time.monotonic())
+
+def _retry_delay(error, attempt, deadline):
+    """Backoff before the next attempt, or None to give up."""
+    if attempt >= AI_MAX_RETRIES or not is_transient(error):
+        return None
+    # Full jitter, so callers that failed together do not retry together
+    delay = random.uniform(0, min(AI_RETRY_CAP, AI_RETRY_BASE * 2 ** attempt))
+    return delay if time.monotonic() + delay < deadline else None
+
+def _failed(breaker, provider, phase, error):
+    if _is_timeout(error):
+        metrics.ai_timeouts.inc(provider, phase)
+    # Routing avoids any failing backend, including one rejecting a revoked or invalid key
+    get_health(provider, 'ttft' if phase == 'text' else phase).observe(ok=False)
+    if is_transient(error):
+        breaker.failure()
+    else:
+        breaker.success()  # the provider answered; the request itself was bad
+
+def _succeeded(breaker, provider, phase, started):
+    breaker.success()
+    get_health(provider, phase).observe(time.monotonic() - started)
+
+def _admit(breaker, provider):
+    if not breaker.allow():
+        metrics.ai_circuit_rejections.inc(provider)
+        raise CircuitOpen(provider)
+
+def _retrying(provider, phase, error, delay):
+    metrics.ai_retries.inc(provider, phase)
+    print(f"Retrying {provider} {phase} in {delay:.2f}s: {error}")
+
+# --- Sync ---
+
+def _in_context(deadline, fn, args):
+    token = _deadline.set(deadline)
+    try:
+        return fn(*args)
+    finally:
+        _deadline.reset(token)
+
+def _hedged(provider, phase, fn, args, deadline, hedge_after):
+    executor = _get_hedge_executor()
+    futures = [executor.submit(_in_context, deadline, fn, args)]
+    done, _ = wait(futures, timeout=min(hedge_after, deadline - time.monotonic()))
+    if not done and time.monotonic() < deadline:
+        metrics.ai_hedges.inc(provider, phase)
+        futures.append(executor.submit(_in_context, deadline, fn, args))
+    error = None
+    while futures:
+        done, pending = wait(futures, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded(f'{provider} {phase} exceeded {AI_DEADLINES[phase]}s')
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.cancel()
+                return future.result()
+            error = future.exception()
+        futures = list(pending)
+    raise error
+
+def call(provider, phase, fn, *args):
+    """Run a one-shot provider call under the phase's deadline, retries, hedging and the provider's breaker."""
+    breaker = get_breaker(provider)
+    deadline = time.monotonic() + AI_DEADLINES[phase]
+    hedge_after = AI_HEDGE_AFTER.get(phase, 0)
+    attempt = 0
+    while True:
+        _admit(breaker, provider)
+        started = time.monotonic()
+        try:
+            if hedge_after > 0:
+                result = _hedged(provider, phase, fn, args, deadline, hedge_after)
+            else:
+                result = _in_context(deadline, fn, args)
+        except Exception as e:
+            _failed(breaker, provider, phase, e)
+            delay = _retry_delay(e, attempt, deadline)
+            if delay is None:
+                raise
+            _retrying(provider, phase, e, delay)
+            time.sleep(delay)
+            attempt += 1
+            continue
+        _succeeded(breaker, provider, phase, started)
+        return result
+
+_END = object()
+
+def stream(provider, make_stream):
+    """
+    Iterate make_stream() under the text deadlines. Attempts are retried
+    only until the first delta arrives; after that the reply is partly
+    delivered and a failure is final. Blocking reads are bounded by the
+    SDK timeout taken from remaining(); the total deadline is checked
+    between deltas.
+    """
+    breaker = get_breaker(provider)
+    started = time.monotonic()
+    deadline = started + AI_DEADLINES['text']
+    attempt = 0
+    while True:
+        _admit(breaker, provider)
+        attempt_started = time.monotonic()
+        first_deadline = min(deadline, attempt_started + AI_DEADLINES['ttft'])
+        iterator = None
+        try:
+            iterator = iter(_in_context(first_deadline, make_stream, ()))
+            delta = _in_context(first_deadline, next, (iterator, _END))
+            break
+        except Exception as e:
+            _failed(breaker, provider, 'text', e)
+            delay = _retry_delay(e, attempt, deadline)
+            if delay is None:
+                raise
+            _retrying(provider, 'text', e, delay)
+            time.sleep(delay)
+            attempt += 1
+    _succeeded(breaker, provider, 'ttft', attempt_started)
+
+    while delta is not _END:
+        yield delta
+        if time.monotonic() > deadline:
+            metrics.ai_timeouts.inc(provider, 'text')
+            breaker.failure()
+            iterator.close()
+            raise DeadlineExceeded(f'{provider} text exceeded {AI_DEADLINES["text"]}s')
+        try:
+            delta = _in_context(deadline, next, (iterator, _END))
+        except Exception as e:
+            _failed(breaker, provider, 'text', e)
+            raise
+
+# --- Async ---
+
+async def _ain_context(deadline, make_awaitable):
+    token = _deadline.set(deadline)
+    try:
+        # wait_for runs the call as a task, which copies the context with the deadline in it
+        return await asyncio.wait_for(make_awaitable(), timeout=max(0, deadline - time.monotonic()))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded('deadline exceeded') from None
+    finally:
+        _deadline.reset(token)
+
+async def _ahedged(provider, phase, fn, args, deadline, hedge_after):
+    token = _deadline.set(deadline)
+    try:
+        tasks = {asyncio.ensure_future(fn(*args))}
+        done, _ = await asyncio.wait(tasks, timeout=min(hedge_after, deadline - time.monotonic()))
+        if not done and time.monotonic() < deadline:
+            metrics.ai_hedges.inc(provider, phase)
+            tasks.add(asyncio.ensure_future(fn(*args)))
+    finally:
+        _deadline.reset(token)
+    error = None
+    try:
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, timeout=max(0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded(f'{provider} {phase} exceeded {AI_DEADLINES[phase]}s')
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def acall(provider, phase, fn, *args):
+    """call() for coroutine functions; deadlines cancel the attempt instead of waiting on the SDK timeout."""
+    breaker = get_breaker(provider)
+    deadline = time.monotonic() + AI_DEADLINES[phase]
+    hedge_after = AI_HEDGE_AFTER.get(phase, 0)
+    attempt = 0
+    while True:
+        _admit(breaker, provider)
+        started = time.monotonic()
+        try:
+            if hedge_after > 0:
+                result = await _ahedged(provider, phase, fn, args, deadline, hedge_after)
+            else:
+                result = await _ain_context(deadline, lambda: fn(*args))
+        except Exception as e:
+            _failed(breaker, provider, phase, e)
+            delay = _retry_delay(e, attempt, deadline)
+            if delay is None:
+                raise
+            _retrying(provider, phase, e, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        _succeeded(breaker, provider, phase, started)
+        return result
+
+async def astream(provider, make_stream):
+    """stream() for async iterators; every wait for a delta is cancelled at the deadline."""
+    breaker = get_breaker(provider)
+    deadline = time.monotonic() + AI_DEADLINES['text']
+    attempt = 0
+    while True:
+        _admit(breaker, provider)
+        attempt_started = time.monotonic()
+        first_deadline = min(deadline, attempt_started + AI_DEADLINES['ttft'])
+        token = _deadline.set(first_deadline)
+        try:
+            # Async generators run in the caller's context, so the deadline must be set when it is created
+            iterator = make_stream().__aiter__()
+        finally:
+            _deadline.reset(token)
+        try:
+            delta = await _ain_context(first_deadline, iterator.__anext__)
+            break
+        except StopAsyncIteration:
+            delta = _END
+            break
+        except Exception as e:
+            _failed(breaker, provider, 'text', e)
+            delay = _retry_delay(e, attempt, deadline)
+            if delay is None:
+                raise
+            _retrying(provider, 'text', e, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+    _succeeded(breaker, provider, 'ttft', attempt_started)
+
+    while delta is not _END:
+        yield delta
+        try:
+            delta = await _ain_context(deadline, iterator.__anext__)
+        except StopAsyncIteration:
+            return
+        except Exception as e:
+            _failed(breaker, provider, 'text', e)
+            raise
@@ -0,0 +1,131 @@
+import os
+import time
+import hashlib
+import threading
+import httpx
+import openai
+from google import genai
+from google.genai import types
+from . import metrics
+
+# Keep-alive pool sizing for every upstream AI client
+AI_HTTP_MAX_CONNECTIONS = int(os.getenv('AI_HTTP_MAX_CONNECTIONS', '100'))
+AI_HTTP_MAX_KEEPALIVE = int(os.getenv('AI_HTTP_MAX_KEEPALIVE', '20'))
+AI_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('AI_HTTP_KEEPALIVE_EXPIRY', '60'))
+
+def _limits():
+    return httpx.Limits(
+        max_connections=AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=AI_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=AI_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+def _fingerprint(api_key):
+    # Never keep raw keys in stats or dict keys that may end up in logs
+    return hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:12]
+
+class ClientPool:
+    """
+    One SDK client per (provider, API key, base URL) per worker process.
+
+    Clients hold their own keep-alive HTTP pools, so reusing them across
+    requests skips the TLS handshake on every turn. The pool is dropped in
+    forked children (gunicorn --preload) because sockets must not be shared
+    between processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._clients = {}
+        self._hits = 0
+        self._misses = 0
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _get(self, provider, api_key, base_url, factory):
+        if self._pid != os.getpid():
+            self.after_fork()
+        key = (provider, _fingerprint(api_key), base_url)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                self._misses += 1
+                entry = {'client': factory(), 'createdAt': time.time(), 'hits': 0}
+                self._clients[key] = entry
+            else:
+                self._hits += 1
+                entry['hits'] += 1
+            return entry['client']
+
+    def gemini(self, api_key):
+        # client.aio shares this client; an explicit transport keeps it on httpx with the same limits
+        return self._get('gemini', api_key, None, lambda: genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                client_args={'limits': _limits()},
+                async_client_args={'transport': httpx.AsyncHTTPTransport(limits=_limits())}
+            )
+        ))
+
+    # Retries belong to the call policy (call_policy.py); SDK retries would multiply them
+    def openai(self, api_key, base_url=None):
+        return self._get('openai', api_key, base_url, lambda: openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=openai.DefaultHttpxClient(limits=_limits())
+        ))
+
+    def async_openai(self, api_key, base_url=None):
+        return self._get('openai-async', api_key, base_url, lambda: openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=openai.DefaultAsyncHttpxClient(limits=_limits())
+        ))
+
+    def stats(self):
+        # No key fingerprints: clients are listed by provider and base URL only
+        with self._lock:
+            return {
+                'pid': self._pid,
+                'hits': self._hits,
+                'misses': self._misses,
+                'clients': [
+                    {
+                        'provider': provider,
+                        'baseUrl': base_url,
+                        'hits': entry['hits'],
+                        'ageSeconds': round(time.time() - entry['createdAt'], 1),
+                    }
+                    for (provider, _, base_url), entry in self._clients.items()
+                ],
+                'limits': {
+                    'maxConnections': AI_HTTP_MAX_CONNECTIONS,
+                    'maxKeepalive': AI_HTTP_MAX_KEEPALIVE,
+                    'keepaliveExpiry': AI_HTTP_KEEPALIVE_EXPIRY,
+                },
+            }
+
+client_pool = ClientPool()
+
+def _collect_pool():
+    stats = client_pool.stats()
+    per_provider = {}
+    for client in stats['clients']:
+        per_provider[client['provider']] = per_provider.get(client['provider'], 0) + 1
+    for provider, count in per_provider.items():
+        metrics.ai_pool_clients.set(provider, value=count)
+    metrics.ai_pool_lookups.set('hit', value=stats['hits'])
+    metrics.ai_pool_lookups.set('miss', value=stats['misses'])
+
+metrics.registry.add_collector(_collect_pool)
+
+if hasattr(os, 'register_at_fork'):  # Not available on Windows (waitress is single-process there)
+    os.register_at_fork(after_in_child=client_pool.after_fork)
@@ -0,0 +1,243 @@
+import os
+import math
+import time
+import signal
+import tempfile
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource  # POSIX only; on Windows jobs are bounded by the wall-clock timeout alone
+except ImportError:
+    resource = None
+
+EXTRACT_MAX_WORKERS = int(os.getenv('EXTRACT_MAX_WORKERS', str(min(4, os.cpu_count() or 1))))
+EXTRACT_MAX_PAGES = int(os.getenv('EXTRACT_MAX_PAGES', '50'))
+EXTRACT_PAGES_PER_JOB = int(os.getenv('EXTRACT_PAGES_PER_JOB', '8'))
+EXTRACT_CPU_SECONDS = int(os.getenv('EXTRACT_CPU_SECONDS', '20'))
+EXTRACT_TIMEOUT = float(os.getenv('EXTRACT_TIMEOUT', '60'))
+IMPORT_MAX_BYTES = int(os.getenv('IMPORT_MAX_BYTES', str(10 * 1024 * 1024)))
+
+class ExtractionError(Exception):
+    """Extraction refused or failed; status is the HTTP code to answer with."""
+
+    def __init__(self, message, status=422):
+        super().__init__(message)
+        self.status = status
+
+class ExtractionCancelled(ExtractionError):
+    def __init__(self, message='Extraction cancelled'):
+        super().__init__(message, 409)
+
+class CpuLimitExceeded(Exception):
+    pass
+
+# --- Pool worker side ---
+
+def _cpu_exceeded(signum, frame):
+    raise CpuLimitExceeded()
+
+def _init_worker():
+    if hasattr(signal, 'SIGXCPU'):
+        signal.signal(signal.SIGXCPU, _cpu_exceeded)
+
+@contextmanager
+def _cpu_budget(seconds):
+    """
+    Cap the CPU time of one job. RLIMIT_CPU counts the whole process, so
+    the soft limit is set relative to what this worker has already used
+    and lifted again afterwards.
+    """
+    if resource is None:
+        yield
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    limit = math.ceil(usage.ru_utime + usage.ru_stime) + seconds
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _check_cancelled(path, cancel_path):
+    # A deleted upload also means nobody is waiting for the text any more
+    if os.path.exists(cancel_path) or not os.path.exists(path):
+        raise ExtractionCancelled()
+
+def _pdf_page_count(path, cpu_seconds):
+    from pypdf import PdfReader
+    with _cpu_budget(cpu_seconds):
+        return len(PdfReader(path).pages)
+
+def _pdf_pages(path, start, stop, cancel_path, cpu_seconds):
+    from pypdf import PdfReader
+    with _cpu_budget(cpu_seconds):
+        reader = PdfReader(path)
+        texts = []
+        for index in range(start, stop):
+            _check_cancelled(path, cancel_path)
+            texts.append(reader.pages[index].extract_text() or "")
+        return texts
+
+def _docx_text(path, cancel_path, cpu_seconds):
+    from docx import Document
+    with _cpu_budget(cpu_seconds):
+        _check_cancelled(path, cancel_path)
+        return "\n".join(p.text for p in Document(path).paragraphs)
+
+# --- Request side ---
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_extract_pool():
+    """
+    Process-wide pool for document extraction. Workers are spawned, not
+    forked, so they never inherit the server's threads or sockets.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_MAX_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return _pool
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def _forget_pool():
+    # A forked child (gunicorn --preload) must not share the parent's workers
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pool)
+
+class ExtractionJob:
+    """
+    Text extraction for one document on disk. PDFs are split into page
+    ranges that run in parallel on the pool. cancel() may be called from
+    any thread: queued ranges are dropped, and running ones stop at the
+    next page via a marker file next to the document.
+    """
+
+    def __init__(self, path, kind):
+        if kind not in ('pdf', 'docx'):
+            raise ValueError(f'unsupported document kind: {kind}')
+        self.path = path
+        self.kind = kind
+        self.cancel_path = path + '.cancel'
+        self._futures = []
+        self._cancelled = False
+
+    def _submit(self, fn, *args):
+        if self._cancelled:
+            raise ExtractionCancelled()
+        future = get_extract_pool().submit(fn, *args)
+        self._futures.append(future)
+        return future
+
+    def _wait(self, future, deadline):
+        try:
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeout:
+            self.cancel()
+            raise ExtractionError('Document extraction timed out', 504)
+
+    def run(self, timeout=EXTRACT_TIMEOUT, on_progress=None):
+        """Return the document text. on_progress(done, total) is called as PDF page ranges finish."""
+        deadline = time.monotonic() + timeout
+        try:
+            if self.kind == 'docx':
+                return self._wait(self._submit(_docx_text, self.path, self.cancel_path, EXTRACT_CPU_SECONDS), deadline)
+
+            pages = self._wait(self._submit(_pdf_page_count, self.path, EXTRACT_CPU_SECONDS), deadline)
+            if pages > EXTRACT_MAX_PAGES:
+                raise ExtractionError(f'PDF has {pages} pages; the limit is {EXTRACT_MAX_PAGES}', 413)
+            ranges = [
+                self._submit(_pdf_pages, self.path, start, min(start + EXTRACT_PAGES_PER_JOB, pages), self.cancel_path, EXTRACT_CPU_SECONDS)
+                for start in range(0, pages, EXTRACT_PAGES_PER_JOB)
+            ]
+            texts = []
+            for future in ranges:
+                texts.extend(self._wait(future, deadline))
+                if on_progress:
+                    on_progress(len(texts), pages)
+            return "\n".join(texts)
+        except CpuLimitExceeded:
+            self.cancel()
+            raise ExtractionError('Document is too complex to extract')
+        except BrokenProcessPool:
+            self.cancel()
+            _reset_pool()
+            raise ExtractionError('Document extraction failed')
+        except ExtractionError:
+            raise
+        except Exception as e:
+            # Malformed files surface as parser errors from pypdf / python-docx
+            self.cancel()
+            raise ExtractionError(f'Could not read {self.kind} file: {e}')
+
+    def cancel(self):
+        """Stop the job; the marker file is removed along with the upload."""
+        self._cancelled = True
+        with open(self.cancel_path, 'a'):
+            pass
+        for future in self._futures:
+            future.cancel()
+
+def save_upload(stream, suffix, max_bytes=IMPORT_MAX_BYTES, digest=None):
+    """
+    Copy an upload stream to a temp file in chunks, enforcing the size cap;
+    returns the path. A hashlib object passed as digest is fed each chunk.
+    """
+    fd, path = tempfile.mkstemp(prefix='import-', suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            copied = 0
+            while True:
+                chunk = stream.read(64 * 1024)
+                if not chunk:
+                    break
+                copied += len(chunk)
+                if copied > max_bytes:
+                    raise ExtractionError(f'Upload exceeds the {max_bytes / (1024 * 1024):g} MB limit', 413)
+                out.write(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+    except BaseException:
+        discard_upload(path)
+        raise
+    return path
+
+def discard_upload(path):
+    """Remove a saved upload and its cancel marker."""
+    for leftover in (path, path + '.cancel'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+@contextmanager
+def upload_to_disk(stream, suffix, max_bytes=IMPORT_MAX_BYTES, digest=None):
+    """save_upload() for the length of a with block; yields the path."""
+    path = save_upload(stream, suffix, max_bytes, digest)
+    try:
+        yield path
+    finally:
+        discard_upload(path)
+
+def extract_text(path, kind, timeout=EXTRACT_TIMEOUT):
+    return ExtractionJob(path, kind).run(timeout)
@@ -0,0 +1,96 @@
+import os
+import threading
+from collections import OrderedDict
+from sqlalchemy import func, case, and_, or_
+from ..models import db, ChatMessage
+
+HISTORY_CACHE_SESSIONS = int(os.getenv('HISTORY_CACHE_SESSIONS', '256'))
+
+def _entry(message):
+    # Only what the providers read; audio never goes back to the model
+    return {'sender': message.Sender, 'text': message.Text}
+
+def _key(message):
+    return (message.Timestamp, message.Id)
+
+def _after(key):
+    # (Timestamp, Id) > key spelled out, since MSSQL has no row-value comparison
+    timestamp, id = key
+    return or_(ChatMessage.Timestamp > timestamp, and_(ChatMessage.Timestamp == timestamp, ChatMessage.Id > id))
+
+class HistoryCache:
+    """
+    Per-process conversation history keyed by session id.
+
+    Entries grow incrementally as messages are added and remember the
+    (Timestamp, Id) of their last message. Before use, an entry is checked
+    with one index-only query counting the session's rows in total and up
+    to that key: new rows that sort after it (written by another worker)
+    are loaded as the tail, and anything else (a back-dated client
+    timestamp, a deletion) reloads the whole history.
+    """
+
+    def __init__(self, max_sessions=HISTORY_CACHE_SESSIONS):
+        self._max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _query(self, session_id):
+        return ChatMessage.query.filter_by(SessionId=session_id) \
+            .order_by(ChatMessage.Timestamp.asc(), ChatMessage.Id.asc())
+
+    def _load(self, session_id, after=None):
+        query = self._query(session_id)
+        if after is not None:
+            query = query.filter(_after(after))
+        messages = query.all()
+        return [_entry(m) for m in messages], (_key(messages[-1]) if messages else after)
+
+    def get(self, session_id):
+        with self._lock:
+            cached = self._sessions.get(session_id)
+            if cached is not None:
+                self._sessions.move_to_end(session_id)
+
+        if cached is None or cached[1] is None:
+            history, last = self._load(session_id)
+        else:
+            history, last = cached
+            total, through_last = db.session.query(
+                func.count(ChatMessage.Id),
+                func.count(case((_after(last), None), else_=ChatMessage.Id)),
+            ).filter_by(SessionId=session_id).one()
+            if through_last != len(history):
+                history, last = self._load(session_id)
+            elif total > len(history):
+                tail, last = self._load(session_id, after=last)
+                history = history + tail
+
+        self._store(session_id, (history, last))
+        return list(history)
+
+    def append(self, session_id, *messages):
+        with self._lock:
+            cached = self._sessions.get(session_id)
+            if cached is None:
+                return
+            history, last = cached
+            ordered = sorted(messages, key=_key)
+            if last is not None and ordered and _key(ordered[0]) <= last:
+                # Sorts inside the cached prefix; the next get reloads
+                self._sessions.pop(session_id)
+                return
+            self._sessions[session_id] = (history + [_entry(m) for m in ordered], _key(ordered[-1]) if ordered else last)
+
+    def invalidate(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _store(self, session_id, history):
+        with self._lock:
+            self._sessions[session_id] = history
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+history_cache = HistoryCache()
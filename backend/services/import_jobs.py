@@ -0,0 +1,160 @@
+import os
+import json
+import uuid
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from ..models import db, ImportJob
+from .document_extract import ExtractionJob, ExtractionCancelled, ExtractionError, save_upload, discard_upload
+from .profile_import import apply_import
+from .parse_cache import parse_cache
+from .resume_import import cache_key, url_cache_key, fetch_linkedin_text, parse_text
+
+IMPORT_JOB_WORKERS = int(os.getenv('IMPORT_JOB_WORKERS', '2'))
+# A job that has not moved for this long belonged to a worker that died or restarted
+IMPORT_JOB_STALE_SECONDS = int(os.getenv('IMPORT_JOB_STALE_SECONDS', '900'))
+
+# stage -> progress when the stage starts; PDF extraction fills in 10..60 page range by page range
+STAGES = {'queued': 0, 'extracting': 10, 'parsing': 60, 'applying': 80, 'done': 100}
+
+_executor = None
+_executor_lock = threading.Lock()
+_running = {}  # job id -> ExtractionJob, so a cancel can stop the pool workers
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IMPORT_JOB_WORKERS, thread_name_prefix='import')
+        return _executor
+
+def _forget_executor():
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+    _running.clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_executor)
+
+def _update(job_id, **fields):
+    """Write job fields unless the job was cancelled or failed meanwhile; returns False if so."""
+    # One conditional UPDATE, so a cancel cannot land between the check and the write
+    updated = ImportJob.query.filter(ImportJob.Id == job_id, ImportJob.Status.notin_(ImportJob.FINISHED)) \
+        .update(dict(fields, UpdatedAt=datetime.utcnow()), synchronize_session=False)
+    db.session.commit()
+    return updated > 0
+
+def _stage(job_id, stage, progress=None):
+    if not _update(job_id, Status='RUNNING', Stage=stage, Progress=STAGES[stage] if progress is None else progress):
+        raise ExtractionCancelled()
+
+def _extract(job_id, kind, path):
+    extraction = ExtractionJob(path, kind)
+    _running[job_id] = extraction
+    span = STAGES['parsing'] - STAGES['extracting']
+
+    def on_progress(done, total):
+        _stage(job_id, 'extracting', STAGES['extracting'] + span * done // total)
+
+    try:
+        return extraction.run(on_progress=on_progress)
+    finally:
+        _running.pop(job_id, None)
+
+def _parse(job_id, source, payload):
+    _stage(job_id, 'extracting')
+    if source in ('pdf', 'docx'):
+        text = _extract(job_id, source, payload)
+    elif source == 'linkedin_url':
+        text = fetch_linkedin_text(payload)
+    else:
+        text = payload
+    _stage(job_id, 'parsing')
+    return parse_text(text)
+
+def _run(app, job_id, source, payload, apply, key):
+    with app.app_context():
+        try:
+            if key:
+                parsed = parse_cache.get_or_parse(key, lambda: _parse(job_id, source, payload))
+            else:
+                parsed = _parse(job_id, source, payload)
+
+            if apply:
+                _stage(job_id, 'applying')
+                try:
+                    result = apply_import(parsed)
+                except ValueError as e:
+                    raise ExtractionError(f'invalid date in import: {e}', 400)
+            else:
+                result = {'preview': parsed}
+            _update(job_id, Status='SUCCEEDED', Stage='done', Progress=STAGES['done'], Result=json.dumps(result))
+        except ExtractionCancelled:
+            db.session.rollback()
+            _update(job_id, Status='CANCELLED')
+        except Exception as e:
+            db.session.rollback()
+            print(f"Import job {job_id} failed: {e}")
+            _update(job_id, Status='FAILED', Error=str(e))
+        finally:
+            if source in ('pdf', 'docx'):
+                discard_upload(payload)
+            db.session.remove()
+
+def enqueue_import(source, payload, apply):
+    """
+    Queue an import and return its ImportJob row. payload is the upload
+    stream for pdf/docx (saved to disk here, so the size cap still answers
+    synchronously), the URL for linkedin_url, or the resume text.
+    """
+    key = None
+    if source in ('pdf', 'docx'):
+        digest = hashlib.sha256()
+        payload = save_upload(payload, f'.{source}', digest=digest)
+        key = cache_key(source, digest.hexdigest())
+    elif source == 'linkedin_url':
+        key = url_cache_key(payload)
+    job = ImportJob(Id=str(uuid.uuid4()), Source=source, Apply=apply, Status='QUEUED', Stage='queued', Progress=0)
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except Exception:
+        if source in ('pdf', 'docx'):
+            discard_upload(payload)
+        raise
+    _get_executor().submit(_run, current_app._get_current_object(), job.Id, source, payload, apply, key)
+    return job
+
+def get_import_job(job_id):
+    """Load a job, failing it if it has been stuck past IMPORT_JOB_STALE_SECONDS."""
+    job = ImportJob.query.get(job_id)
+    if job and job.Status not in ImportJob.FINISHED and job.Id not in _running:
+        if job.UpdatedAt and datetime.utcnow() - job.UpdatedAt > timedelta(seconds=IMPORT_JOB_STALE_SECONDS):
+            job.Status = 'FAILED'
+            job.Error = 'Import job was interrupted'
+            job.UpdatedAt = datetime.utcnow()
+            db.session.commit()
+    return job
+
+def cancel_import_job(job):
+    """
+    Mark a job cancelled; if it is extracting in this process, stop the
+    extraction too. Returns False if the job has finished or has started
+    applying, since rows written to the profile are not rolled back.
+    """
+    cancelled = ImportJob.query.filter(
+        ImportJob.Id == job.Id,
+        ImportJob.Status.notin_(ImportJob.FINISHED),
+        ImportJob.Stage != 'applying',
+    ).update({'Status': 'CANCELLED', 'UpdatedAt': datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    db.session.refresh(job)
+    if not cancelled:
+        return False
+    extraction = _running.get(job.Id)
+    if extraction:
+        extraction.cancel()
+    return True
@@ -0,0 +1,90 @@
+import os
+import time
+import uuid
+from ..models import db, ChatMessage
+from .audio_store import get_audio_store
+from .history_cache import history_cache
+
+MESSAGE_BATCH_MAX = int(os.getenv('MESSAGE_BATCH_MAX', '100'))
+
+REQUIRED_FIELDS = ('id', 'sender', 'text', 'timestamp')
+
+def build_message(session_id, data):
+    return ChatMessage(
+        Id=data['id'],
+        SessionId=session_id,
+        Sender=data['sender'],
+        Text=data['text'],
+        AudioRef=get_audio_store().put_base64(data.get('audioData')),
+        Timestamp=data['timestamp']
+    )
+
+def save_messages(session_id, items):
+    """
+    Persist several messages for a session in one transaction and one
+    commit. Ids that are already stored are skipped, so a retried batch
+    does not fail or duplicate. Returns (saved, skipped) with saved in
+    the given order.
+    """
+    ids = [item['id'] for item in items]
+    existing = {
+        row.Id for row in db.session.query(ChatMessage.Id).filter(ChatMessage.Id.in_(ids))
+    } if ids else set()
+
+    saved, seen = [], set(existing)
+    for item in items:
+        if item['id'] in seen:
+            continue
+        seen.add(item['id'])
+        saved.append(build_message(session_id, item))
+
+    if saved:
+        db.session.add_all(saved)
+        db.session.commit()
+        history_cache.append(session_id, *saved)
+    return saved, len(items) - len(saved)
+
+def invalid_message(item):
+    """Why a message payload cannot be stored, or None if it can."""
+    if not isinstance(item, dict):
+        return 'each message must be an object'
+    missing = [f for f in REQUIRED_FIELDS if item.get(f) is None]
+    return f"message missing {', '.join(missing)}" if missing else None
+
+# Stored text for a spoken user turn; the recording itself goes to the audio store
+AUDIO_RESPONSE_TEXT = '(Audio Response)'
+
+def now_ms():
+    return int(time.time() * 1000)
+
+def _payload(sender, text, audio_data, timestamp):
+    return {'id': uuid.uuid4().hex, 'sender': sender, 'text': text, 'audioData': audio_data, 'timestamp': timestamp}
+
+def persist_turn(session_id, user_message, ai_text, ai_audio, started_at=None):
+    """
+    Store a server-generated turn: the user's message (text, or the
+    {audioData, mimeType} recording) and the AI reply with its audio, in
+    one commit. Pass user_message=None for the opening turn. Returns the
+    ids and audio URL the client needs instead of the audio itself.
+    """
+    items = []
+    if user_message is not None:
+        if isinstance(user_message, dict):
+            items.append(_payload('USER', AUDIO_RESPONSE_TEXT, user_message.get('audioData'), started_at or now_ms()))
+        else:
+            items.append(_payload('USER', user_message, None, started_at or now_ms()))
+    # Never share a timestamp with the user message, so transcript order is stable
+    items.append(_payload('AI', ai_text, ai_audio, max(now_ms(), items[0]['timestamp'] + 1 if items else 0)))
+
+    saved, _ = save_messages(session_id, items)
+    ai = saved[-1]
+    result = {
+        'text': ai_text,
+        'messageId': ai.Id,
+        'timestamp': ai.Timestamp,
+        'audioUrl': ai.to_dict()['audioUrl'],
+    }
+    if user_message is not None:
+        result['userMessageId'] = saved[0].Id
+        result['userTimestamp'] = saved[0].Timestamp
+    return result
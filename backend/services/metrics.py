@@ -0,0 +1,259 @@
+"""
+In-process metrics with Prometheus text exposition (GET /api/metrics).
+
+Counters and histograms are plain dicts of floats behind one lock per
+metric, so recording costs about a microsecond and can stay on in
+production. Each worker process keeps its own registry; scrape every
+worker (or run one) for complete numbers.
+"""
+import os
+import time
+import inspect
+import threading
+from functools import wraps
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Seconds; spans DB commits (ms) through full model turns (tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, _labels(self.labelnames, labels), value
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        if not METRICS_ENABLED:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                yield self.name + '_bucket', _labels(self.labelnames, labels, [('le', _number(bound))]), cumulative
+            yield self.name + '_count', _labels(self.labelnames, labels), cumulative
+            yield self.name + '_sum', _labels(self.labelnames, labels), series[-1]
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        """collect() runs at scrape time, e.g. to refresh gauges from live state."""
+        self._collectors.append(collect)
+
+    def render(self):
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"Metrics Collector Error: {e}")
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+# --- HTTP ---
+
+http_request_seconds = registry.register(Histogram(
+    'prepmaster_http_request_duration_seconds', 'Time to produce a response (to first byte for streams).',
+    ('method', 'route', 'status')))
+db_commit_seconds = registry.register(Histogram(
+    'prepmaster_db_commit_duration_seconds', 'Session commit time, including the flush.'))
+json_serialize_seconds = registry.register(Histogram(
+    'prepmaster_json_serialize_duration_seconds', 'Time spent encoding JSON response bodies.'))
+response_compress_seconds = registry.register(Histogram(
+    'prepmaster_response_compress_duration_seconds', 'Time spent compressing response bodies.', ('encoding',)))
+
+# --- Model providers ---
+
+ai_phase_seconds = registry.register(Histogram(
+    'prepmaster_ai_phase_duration_seconds',
+    'Provider call latency by phase: ttft (first text delta), text (whole reply), tts (one sentence), feedback.',
+    ('provider', 'model', 'phase')))
+ai_tokens = registry.register(Counter(
+    'prepmaster_ai_tokens_total', 'Tokens reported by the provider, by kind (prompt, completion, cached).',
+    ('provider', 'model', 'kind')))
+ai_characters = registry.register(Counter(
+    'prepmaster_ai_characters_total', 'Characters of generated text (text) and text sent to speech synthesis (tts).',
+    ('provider', 'model', 'phase')))
+ai_audio_bytes = registry.register(Counter(
+    'prepmaster_ai_audio_bytes_total', 'Decoded audio bytes returned by speech synthesis.',
+    ('provider', 'model')))
+ai_errors = registry.register(Counter(
+    'prepmaster_ai_errors_total', 'Failed provider calls by phase.',
+    ('provider', 'model', 'phase')))
+
+# --- SDK client pool (services/client_pool.py) ---
+
+ai_pool_clients = registry.register(Gauge(
+    'prepmaster_ai_pool_clients', 'SDK clients held by the client pool of this worker.', ('provider',)))
+ai_pool_lookups = registry.register(Gauge(
+    'prepmaster_ai_pool_lookups', 'Client pool lookups since the worker started: hit reused a client, miss created one.', ('result',)))
+
+# --- Call policy (services/call_policy.py) ---
+
+ai_retries = registry.register(Counter(
+    'prepmaster_ai_retries_total', 'Provider calls retried after a transient failure.', ('provider', 'phase')))
+ai_timeouts = registry.register(Counter(
+    'prepmaster_ai_timeouts_total', 'Provider call attempts that hit their deadline.', ('provider', 'phase')))
+ai_hedges = registry.register(Counter(
+    'prepmaster_ai_hedges_total', 'Duplicate requests sent because the first was slow.', ('provider', 'phase')))
+ai_circuit_rejections = registry.register(Counter(
+    'prepmaster_ai_circuit_rejections_total', 'Calls refused without trying because the circuit was open.', ('provider',)))
+ai_latency_ewma = registry.register(Gauge(
+    'prepmaster_ai_latency_ewma_seconds', 'Rolling average latency of successful calls, used for routing.', ('provider', 'phase')))
+ai_error_rate = registry.register(Gauge(
+    'prepmaster_ai_error_rate', 'Rolling share of calls that failed, used for routing.', ('provider', 'phase')))
+ai_routed = registry.register(Counter(
+    'prepmaster_ai_routed_total', 'Calls the auto provider sent to each backend.', ('phase', 'provider')))
+ai_failovers = registry.register(Counter(
+    'prepmaster_ai_failovers_total', 'Calls the auto provider moved off a failing backend.', ('phase', 'provider')))
+ai_circuit_state = registry.register(Gauge(
+    'prepmaster_ai_circuit_state', 'Circuit breaker per provider: 0 closed, 1 open, 2 half-open.', ('provider',)))
+
+def record_tokens(provider, model, prompt=None, completion=None, cached=None):
+    for kind, count in (('prompt', prompt), ('completion', completion), ('cached', cached)):
+        if count:
+            ai_tokens.inc(provider, model, kind, amount=count)
+
+def timed_phase(phase):
+    """Time a provider method, sync or async, under its name and text_model."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def timed(self, *args, **kwargs):
+                with ai_phase_seconds.time(self.name, self.text_model, phase):
+                    return await fn(self, *args, **kwargs)
+        else:
+            @wraps(fn)
+            def timed(self, *args, **kwargs):
+                with ai_phase_seconds.time(self.name, self.text_model, phase):
+                    return fn(self, *args, **kwargs)
+        return timed
+    return decorate
+
+def timed_text(stream, provider, model):
+    """Wrap a text-delta iterator: time to first delta, total time, characters and errors."""
+    started = time.perf_counter()
+    first = True
+    try:
+        for delta in stream:
+            if first and delta:
+                ai_phase_seconds.observe(time.perf_counter() - started, provider, model, 'ttft')
+                first = False
+            ai_characters.inc(provider, model, 'text', amount=len(delta or ''))
+            yield delta
+    except Exception:
+        ai_errors.inc(provider, model, 'text')
+        raise
+    ai_phase_seconds.observe(time.perf_counter() - started, provider, model, 'text')
+
+async def atimed_text(stream, provider, model):
+    """timed_text for async iterators."""
+    started = time.perf_counter()
+    first = True
+    try:
+        async for delta in stream:
+            if first and delta:
+                ai_phase_seconds.observe(time.perf_counter() - started, provider, model, 'ttft')
+                first = False
+            ai_characters.inc(provider, model, 'text', amount=len(delta or ''))
+            yield delta
+    except Exception:
+        ai_errors.inc(provider, model, 'text')
+        raise
+    ai_phase_seconds.observe(time.perf_counter() - started, provider, model, 'text')
+
+def record_speech(provider, model, text, audio_b64, seconds):
+    ai_phase_seconds.observe(seconds, provider, model, 'tts')
+    ai_characters.inc(provider, model, 'tts', amount=len(text))
+    if audio_b64:
+        # base64 is 4 characters per 3 bytes
+        ai_audio_bytes.inc(provider, model, amount=len(audio_b64) * 3 // 4)
@@ -0,0 +1,118 @@
+import os
+import copy
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+PARSE_CACHE_SIZE = int(os.getenv('PARSE_CACHE_SIZE', '64'))
+PARSE_CACHE_TTL = int(os.getenv('PARSE_CACHE_TTL', '3600'))
+# Shared by every worker on the host, so preview and apply can land on different processes
+PARSE_CACHE_DIR = os.getenv('PARSE_CACHE_DIR', '')
+_SWEEP_EVERY = 100
+
+def normalize_url(url):
+    """Drop the fragment, trailing slash and query order so one profile has one key."""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
+class ParseCache:
+    """
+    Parsed resume results keyed by content hash and parser version.
+
+    An in-memory LRU with a TTL sits in front of an optional directory of
+    JSON files. Callers get their own copy of each result, since the
+    parsed dicts are mutable.
+    """
+
+    def __init__(self, max_entries=PARSE_CACHE_SIZE, ttl=PARSE_CACHE_TTL, directory=PARSE_CACHE_DIR):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._dir = directory
+        self._entries = OrderedDict()  # key -> (expires at, parsed)
+        self._lock = threading.Lock()
+        self._puts = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self._dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _remember(self, key, parsed, expires):
+        with self._lock:
+            self._entries[key] = (expires, parsed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _read_disk(self, key, now):
+        path = self._path(key)
+        try:
+            expires = os.path.getmtime(path) + self._ttl
+            if expires <= now:
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                return expires, json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, parsed):
+        # Write-then-rename so another worker never reads half a file
+        fd, tmp = tempfile.mkstemp(dir=self._dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(parsed, f)
+        os.replace(tmp, self._path(key))
+
+    def _sweep_disk(self, now):
+        for name in os.listdir(self._dir):
+            path = os.path.join(self._dir, name)
+            try:
+                if os.path.getmtime(path) + self._ttl <= now:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+        if not self._dir:
+            return None
+        entry = self._read_disk(key, now)
+        if entry is None:
+            return None
+        self._remember(key, entry[1], entry[0])
+        return copy.deepcopy(entry[1])
+
+    def put(self, key, parsed):
+        now = time.time()
+        parsed = copy.deepcopy(parsed)
+        self._remember(key, parsed, now + self._ttl)
+        if not self._dir:
+            return
+        try:
+            self._write_disk(key, parsed)
+            self._puts += 1
+            if self._puts % _SWEEP_EVERY == 0:
+                self._sweep_disk(now)
+        except OSError as e:
+            print(f"Parse Cache Error: {e}")
+
+    def get_or_parse(self, key, parse):
+        parsed = self.get(key)
+        if parsed is None:
+            parsed = parse()
+            self.put(key, parsed)
+        return parsed
+
+parse_cache = ParseCache()
@@ -0,0 +1,134 @@
+from datetime import datetime
+from sqlalchemy import insert
+from ..models import db, UserProfile, CareerRecord, EducationRecord, Achievement, Certificate, Project
+
+def _date(v):
+    return datetime.fromisoformat(v).date() if v else None
+
+def _career(item):
+    return {
+        'Title': item.get('title'),
+        'Company': item.get('company'),
+        'EmploymentType': item.get('employmentType'),
+        'StartDate': _date(item.get('startDate')),
+        'EndDate': _date(item.get('endDate')),
+        'Current': bool(item.get('current')),
+        'Location': item.get('location'),
+        'Description': item.get('description'),
+        'Skills': item.get('skills'),
+    }
+
+def _education(item):
+    return {
+        'School': item.get('school'),
+        'Degree': item.get('degree'),
+        'FieldOfStudy': item.get('fieldOfStudy'),
+        'StartDate': _date(item.get('startDate')),
+        'EndDate': _date(item.get('endDate')),
+        'Grade': item.get('grade'),
+        'Activities': item.get('activities'),
+        'Description': item.get('description'),
+    }
+
+def _achievement(item):
+    return {
+        'Title': item.get('title'),
+        'Issuer': item.get('issuer'),
+        'IssueDate': _date(item.get('issueDate')),
+        'Url': item.get('url'),
+        'Description': item.get('description'),
+    }
+
+def _certificate(item):
+    return {
+        'Name': item.get('name'),
+        'Authority': item.get('authority'),
+        'LicenseNumber': item.get('licenseNumber'),
+        'IssueDate': _date(item.get('issueDate')),
+        'ExpirationDate': _date(item.get('expirationDate')),
+        'Url': item.get('url'),
+        'Description': item.get('description'),
+    }
+
+def _project(item):
+    return {
+        'Name': item.get('name'),
+        'Role': item.get('role'),
+        'StartDate': _date(item.get('startDate')),
+        'EndDate': _date(item.get('endDate')),
+        'Url': item.get('url'),
+        'Skills': item.get('skills'),
+        'Description': item.get('description'),
+    }
+
+# parsed key -> (model, row builder, natural key columns, required columns)
+IMPORT_SECTIONS = {
+    'career': (CareerRecord, _career, ('Title', 'Company', 'StartDate'), ()),
+    'education': (EducationRecord, _education, ('School', 'Degree', 'StartDate'), ()),
+    'achievements': (Achievement, _achievement, ('Title', 'Issuer', 'IssueDate'), ('Title',)),
+    'certificates': (Certificate, _certificate, ('Name', 'Authority', 'IssueDate'), ('Name',)),
+    'projects': (Project, _project, ('Name', 'Role', 'StartDate'), ()),
+}
+
+def _natural_key(values):
+    # Case- and whitespace-insensitive so "Acme Inc" and "acme inc " collide
+    return tuple(' '.join(v.split()).casefold() if isinstance(v, str) else v for v in values)
+
+def import_records(profile_id, parsed):
+    """
+    Insert parsed resume sections for a profile, skipping entries whose
+    natural key already exists (in the DB or earlier in the same import).
+    Each section is one executemany INSERT; the caller owns the commit.
+    Returns {section: {'inserted': n, 'skipped': n}}.
+    """
+    summary = {}
+    for section, (model, build, key_columns, required) in IMPORT_SECTIONS.items():
+        items = parsed.get(section) or []
+        summary[section] = {'inserted': 0, 'skipped': 0}
+        if not items:
+            continue
+
+        columns = [getattr(model, c) for c in key_columns]
+        seen = {
+            _natural_key(row)
+            for row in db.session.query(*columns).filter(model.ProfileId == profile_id)
+        }
+
+        rows = []
+        for item in items:
+            row = build(item)
+            key = _natural_key(row[c] for c in key_columns)
+            if key in seen or any(not row[c] for c in required):
+                summary[section]['skipped'] += 1
+                continue
+            seen.add(key)
+            row['ProfileId'] = profile_id
+            rows.append(row)
+
+        if rows:
+            db.session.execute(insert(model), rows)
+        summary[section]['inserted'] = len(rows)
+    return summary
+
+def apply_import(parsed):
+    """
+    Import parsed sections into the user profile (created if missing) as
+    one transaction. Rolls back and re-raises ValueError on a bad date.
+    """
+    # Flush (not commit) so a new profile gets its Id inside the same transaction
+    profile = UserProfile.query.order_by(UserProfile.Id.asc()).first()
+    if not profile:
+        profile = UserProfile()
+        db.session.add(profile)
+        db.session.flush()
+
+    try:
+        summary = import_records(profile.Id, parsed)
+    except ValueError:
+        db.session.rollback()
+        raise
+    if any(counts['inserted'] for counts in summary.values()):
+        # The bulk inserts skip the ORM change tracking that keeps LastUpdated current
+        profile.LastUpdated = datetime.utcnow()
+    db.session.commit()
+    return {'applied': True, 'summary': summary}
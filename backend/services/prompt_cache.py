@@ -0,0 +1,129 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from google.genai import types
+
+PROMPT_CACHE_SIZE = int(os.getenv('PROMPT_CACHE_SIZE', '128'))
+GEMINI_CONTEXT_CACHE = os.getenv('GEMINI_CONTEXT_CACHE', 'true').lower() == 'true'
+GEMINI_CACHE_TTL = int(os.getenv('GEMINI_CACHE_TTL', '3600'))
+# Gemini rejects cached content below its minimum size, so small prompts go inline
+GEMINI_CACHE_MIN_TOKENS = int(os.getenv('GEMINI_CACHE_MIN_TOKENS', '1024'))
+GEMINI_CACHE_RETRY_AFTER = 300
+
+PLACEHOLDER = re.compile(r'\{\{(JOB_TITLE|COMPANY|JOB_DESCRIPTION|CV_CONTENT)\}\}')
+
+# Rendered system instruction plus a stable cache key ("<application id>:<content hash>")
+PromptPrefix = namedtuple('PromptPrefix', ['text', 'key'])
+
+def _estimate_tokens(text):
+    return len(text) // 4
+
+class RenderedPromptCache:
+    """LRU of rendered system instructions keyed by application id and content hash."""
+
+    def __init__(self, max_entries=PROMPT_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, template, job_title, company, job_description, cv_content, application_id=None):
+        values = {
+            'JOB_TITLE': job_title or '',
+            'COMPANY': company or '',
+            'JOB_DESCRIPTION': job_description or '',
+            'CV_CONTENT': cv_content or '',
+        }
+        digest = hashlib.sha256('\0'.join([template] + list(values.values())).encode('utf-8')).hexdigest()[:16]
+        key = f"{application_id or 'adhoc'}:{digest}"
+        with self._lock:
+            prefix = self._entries.get(key)
+            if prefix is not None:
+                self._entries.move_to_end(key)
+                return prefix
+        # One pass over the template instead of four chained replace() copies
+        prefix = PromptPrefix(PLACEHOLDER.sub(lambda m: values[m.group(1)], template), key)
+        with self._lock:
+            self._entries[key] = prefix
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return prefix
+
+class GeminiContextCache:
+    """
+    Registers each system instruction once as a Gemini cached-content
+    resource, so later turns bill the prefix at the cached rate and skip
+    re-processing it. Failures are remembered for a while and the caller
+    falls back to sending the instruction inline.
+    """
+
+    def __init__(self):
+        self._entries = {}  # (client id, model, prefix key) -> (cache name or None, valid until)
+        self._lock = threading.Lock()
+
+    def _wanted(self, prefix):
+        return GEMINI_CONTEXT_CACHE and _estimate_tokens(prefix.text) >= GEMINI_CACHE_MIN_TOKENS
+
+    def _cached(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+        # Refresh a minute early so a turn never races the server-side expiry
+        return entry if entry and entry[1] > now + 60 else None
+
+    def _config(self, prefix):
+        return types.CreateCachedContentConfig(
+            system_instruction=prefix.text,
+            display_name=prefix.key,
+            ttl=f"{GEMINI_CACHE_TTL}s",
+        )
+
+    def _remember(self, key, now, cached=None, error=None):
+        if error is not None:
+            print(f"Gemini Cache Error: {error}")
+            entry = (None, now + GEMINI_CACHE_RETRY_AFTER)
+        else:
+            entry = (cached.name, now + GEMINI_CACHE_TTL)
+        with self._lock:
+            self._entries[key] = entry
+            if len(self._entries) > PROMPT_CACHE_SIZE:
+                for stale in [k for k, (_, until) in self._entries.items() if until <= now]:
+                    del self._entries[stale]
+        return entry[0]
+
+    def lookup(self, client, model, prefix):
+        if not self._wanted(prefix):
+            return None
+        key = (id(client), model, prefix.key)
+        now = time.time()
+        entry = self._cached(key, now)
+        if entry:
+            return entry[0]
+        try:
+            cached = client.caches.create(model=model, config=self._config(prefix))
+        except Exception as e:
+            return self._remember(key, now, error=e)
+        return self._remember(key, now, cached)
+
+    async def alookup(self, client, model, prefix):
+        """lookup() for the async path; creates the cache through client.aio."""
+        if not self._wanted(prefix):
+            return None
+        key = (id(client), model, prefix.key)
+        now = time.time()
+        entry = self._cached(key, now)
+        if entry:
+            return entry[0]
+        try:
+            cached = await client.aio.caches.create(model=model, config=self._config(prefix))
+        except Exception as e:
+            return self._remember(key, now, error=e)
+        return self._remember(key, now, cached)
+
+    def invalidate(self, client, model, prefix):
+        with self._lock:
+            self._entries.pop((id(client), model, prefix.key), None)
+
+prompt_cache = RenderedPromptCache()
+gemini_context_cache = GeminiContextCache()
@@ -1,200 +1,212 @@
 import re
-from datetime import datetime
+import hashlib
+from datetime import date
 from typing import Dict, List, Tuple, Optional
+from .document_extract import extract_text, upload_to_disk
+from .parse_cache import parse_cache, normalize_url
 
-def _to_date(v: Optional[str]) -> Optional[datetime.date]:
-    if not v:
-        return None
-    v = v.strip()
-    # Accept formats: YYYY, YYYY-MM, MMM YYYY
-    for fmt in ["%Y-%m-%d", "%Y-%m", "%b %Y", "%B %Y", "%Y"]:
-        try:
-            dt = datetime.strptime(v, fmt)
-            # Normalize to first day of month if month missing
-            return dt.date().replace(day=1)
-        except Exception:
-            continue
-    return None
+# Part of every parse cache key; bump it whenever extraction or parsing output changes
+PARSER_VERSION = '2'
+
+# Heading lines (stripped, lower-cased, trailing colon dropped) -> output bucket
+SECTION_HEADINGS = {
+    'experience': 'career',
+    'work experience': 'career',
+    'employment': 'career',
+    'education': 'education',
+    'certifications': 'certificates',
+    'certificates': 'certificates',
+    'projects': 'projects',
+    'achievements': 'achievements',
+    'awards': 'achievements',
+}
+
+# "Experience: Engineer at Acme" style headings with content on the same line
+INLINE_HEADING = re.compile(
+    r"(work experience|experience|employment|education|certifications|certificates|projects|achievements|awards)\s*[:|–—-]\s*(.+)",
+    re.IGNORECASE
+)
+
+MONTHS = {m: i for i, m in enumerate(['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+_MONTH = r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+# The digit lookbehind sits after the year so the search can still skip ahead on its first character
+_YEAR = r"(?P<{0}year>(?:19|20)\d{{2}})(?<!\d{{5}})(?:-(?P<{0}num>\d{{2}}))?(?!\d)"
+
+# Jan 2020 - Present | 2021–2024 | 2020-03 — 2022-11 | Sept. 2019 - now
+# The search is anchored on the start year, which is far cheaper than
+# trying an optional month name at every position; a month name in front
+# of the match is picked up by MONTH_BEFORE.
+DATE_RANGE = re.compile(
+    _YEAR.format('s') + r"\s*[–—-]\s*(?:(?P<present>present|current|now)\b|(?:\b(?P<emonth>" + _MONTH + r")\.?\s+)?" + _YEAR.format('e') + ")",
+    re.IGNORECASE
+)
+MONTH_BEFORE = re.compile(r"\b(" + _MONTH + r")\.?\s+$", re.IGNORECASE)
+DATE_TOKEN = re.compile(r"(?:(?P<month>" + _MONTH + r")\.?\s+)?" + _YEAR.format('') + r"(?:-\d{2})?", re.IGNORECASE)
+
+# Longest heading plus " :"
+MAX_HEADING_LENGTH = max(len(h) for h in SECTION_HEADINGS) + 2
+
+LOCATION = re.compile(r"[A-Za-z]+,\s*[A-Za-z]+")
+DEGREE_FIELD = re.compile(r" in ", re.IGNORECASE)
+
+def _lex_date(month_name: Optional[str], year: str, month_number: Optional[str]) -> Optional[date]:
+    # Dates are normalized to the first of the month
+    if month_name:
+        month = MONTHS[month_name[:3].lower()]
+    else:
+        month = int(month_number) if month_number else 1
+    return date(int(year), month, 1) if 1 <= month <= 12 else None
 
-def _parse_date_range(line: str) -> Tuple[Optional[datetime.date], Optional[datetime.date], bool]:
-    # Match variations like: Jan 2020 - Present | 2021–2024 | 2020 — 2022
-    m = re.search(r"([A-Za-z]{3,9}\s\d{4}|\d{4}(?:-\d{2})?)\s*[–—-]\s*(Present|[A-Za-z]{3,9}\s\d{4}|\d{4}(?:-\d{2})?)", line)
+def _to_date(v: Optional[str]) -> Optional[date]:
+    # Accept formats: YYYY, YYYY-MM, YYYY-MM-DD, MMM YYYY, Month YYYY
+    m = DATE_TOKEN.fullmatch(v.strip()) if v else None
+    return _lex_date(m.group('month'), m.group('year'), m.group('num')) if m else None
+
+def _parse_date_range(text: str) -> Tuple[Optional[date], Optional[date], bool]:
+    m = DATE_RANGE.search(text)
     if not m:
         return None, None, False
-    start = _to_date(m.group(1))
-    end_token = m.group(2)
-    current = end_token.lower() == "present"
-    end = None if current else _to_date(end_token)
+    before = MONTH_BEFORE.search(text, max(0, m.start() - 16), m.start())
+    start = _lex_date(before.group(1) if before else None, m.group('syear'), m.group('snum'))
+    current = m.group('present') is not None
+    end = None if current else _lex_date(m.group('emonth'), m.group('eyear'), m.group('enum'))
     return start, end, current
 
+def scan_sections(text: str) -> Tuple[Dict[str, List[List[str]]], Dict[str, List[List[str]]]]:
+    """
+    Tokenize the text in one pass over its lines. Returns (sections, inline):
+    bucket -> blocks, where a block is the stripped non-empty lines between
+    blank lines or headings. `inline` holds sections opened by
+    "Heading: content" lines before the first proper heading; they are
+    only used as a fallback.
+    """
+    sections: Dict[str, List[List[str]]] = {}
+    inline: Dict[str, List[List[str]]] = {}
+    blocks = None  # block list of the section being read; None in the preamble
+    block = None
+    in_heading_section = False
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            block = None
+            continue
+        # Headings are short; longer lines skip the lookup entirely
+        bucket = SECTION_HEADINGS.get(line.lower().rstrip(': \t')) if len(line) <= MAX_HEADING_LENGTH else None
+        if bucket:
+            blocks = sections.setdefault(bucket, [])
+            block = None
+            in_heading_section = True
+            continue
+        if not in_heading_section:
+            m = INLINE_HEADING.match(line)
+            if m:
+                blocks = inline.setdefault(SECTION_HEADINGS[m.group(1).lower()], [])
+                block = None
+                line = m.group(2).strip()
+        if blocks is None:
+            continue  # Preamble (name, contact details) before the first heading
+        if block is None:
+            block = []
+            blocks.append(block)
+        block.append(line)
+    return sections, inline
+
 def extract_sections(text: str) -> Dict[str, str]:
-    sections: Dict[str, str] = {}
-    # Find heading lines at line starts, case-insensitive
-    pattern = re.compile(r"(?im)^(Experience|Work Experience|Employment|Education|Certifications|Certificates|Projects|Achievements|Awards)\s*$")
-    matches = list(pattern.finditer(text))
-    if not matches:
-        return sections
-    for i, m in enumerate(matches):
-        key = m.group(1)
-        start_idx = m.end()
-        end_idx = matches[i + 1].start() if i + 1 < len(matches) else len(text)
-        content = text[start_idx:end_idx].strip()
-        sections[key] = content
-    return sections
+    sections, _ = scan_sections(text)
+    return {bucket: "\n\n".join("\n".join(b) for b in blocks) for bucket, blocks in sections.items()}
+
+def _experience(lines: List[str]) -> dict:
+    start, end, current = _parse_date_range("\n".join(lines))
+    # Location: the last line if it looks like "City, Region"
+    location = lines[-1] if LOCATION.search(lines[-1]) else None
+    return {
+        'title': lines[0],
+        'company': lines[1] if len(lines) > 1 else None,
+        'startDate': start.isoformat() if start else None,
+        'endDate': end.isoformat() if end else None,
+        'current': current,
+        'location': location,
+        'description': "\n".join(lines[2:]) if len(lines) > 2 else None,
+        'skills': None
+    }
+
+def _education(lines: List[str]) -> dict:
+    degree = lines[1] if len(lines) > 1 else None
+    field = None
+    if degree:
+        parts = DEGREE_FIELD.split(degree, 1)
+        if len(parts) == 2:
+            degree, field = parts
+    start, end, _ = _parse_date_range("\n".join(lines))
+    return {
+        'school': lines[0],
+        'degree': degree,
+        'fieldOfStudy': field,
+        'startDate': start.isoformat() if start else None,
+        'endDate': end.isoformat() if end else None,
+        'grade': None,
+        'activities': None,
+        'description': "\n".join(lines[2:]) if len(lines) > 2 else None
+    }
+
+def _project(lines: List[str]) -> dict:
+    desc = "\n".join(lines[1:]) if len(lines) > 1 else None
+    return {'name': lines[0], 'description': desc, 'role': None, 'startDate': None, 'endDate': None, 'url': None, 'skills': None}
+
+def _certificate(lines: List[str]) -> dict:
+    return {'name': lines[0], 'authority': None, 'licenseNumber': None, 'issueDate': None, 'expirationDate': None, 'url': None, 'description': None}
+
+def _achievement(lines: List[str]) -> dict:
+    return {'title': lines[0], 'issuer': None, 'issueDate': None, 'url': None, 'description': None}
+
+BLOCK_PARSERS = {
+    'career': _experience,
+    'education': _education,
+    'projects': _project,
+    'certificates': _certificate,
+    'achievements': _achievement,
+}
 
 def parse_experience(section_text: str) -> List[dict]:
-    items = []
-    blocks = [b.strip() for b in re.split(r"\n\s*\n", section_text) if b.strip()]
-    for b in blocks:
-        lines = [l.strip() for l in b.splitlines() if l.strip()]
-        if not lines:
-            continue
-        title = lines[0]
-        company = None
-        if len(lines) > 1:
-            company = lines[1]
-        start, end, current = _parse_date_range(b)
-        # Location: try last line if looks like a city
-        location = None
-        if lines:
-            last = lines[-1]
-            if re.search(r"[A-Za-z]+,\s*[A-Za-z]+", last):
-                location = last
-        description = "\n".join(lines[2:]) if len(lines) > 2 else None
-        items.append({
-            'title': title,
-            'company': company,
-            'startDate': start.isoformat() if start else None,
-            'endDate': end.isoformat() if end else None,
-            'current': current,
-            'location': location,
-            'description': description,
-            'skills': None
-        })
-    return items
+    return parse_text("Experience\n" + section_text)['career']
 
 def parse_education(section_text: str) -> List[dict]:
-    items = []
-    blocks = [b.strip() for b in re.split(r"\n\s*\n", section_text) if b.strip()]
-    for b in blocks:
-        lines = [l.strip() for l in b.splitlines() if l.strip()]
-        if not lines:
-            continue
-        school = lines[0]
-        degree = lines[1] if len(lines) > 1 else None
-        field = None
-        if degree and (" in " in degree.lower()):
-            parts = degree.split(" in ", 1)
-            degree, field = parts[0], parts[1]
-        start, end, _ = _parse_date_range(b)
-        desc = "\n".join(lines[2:]) if len(lines) > 2 else None
-        items.append({
-            'school': school,
-            'degree': degree,
-            'fieldOfStudy': field,
-            'startDate': start.isoformat() if start else None,
-            'endDate': end.isoformat() if end else None,
-            'grade': None,
-            'activities': None,
-            'description': desc
-        })
-    return items
+    return parse_text("Education\n" + section_text)['education']
 
 def parse_text(text: str) -> Dict[str, List[dict]]:
-    sections = extract_sections(text)
-    out = {
-        'career': [],
-        'education': [],
-        'achievements': [],
-        'certificates': [],
-        'projects': []
-    }
-    for key, content in sections.items():
-        lk = key.lower()
-        if 'experience' in lk or 'employment' in lk:
-            out['career'].extend(parse_experience(content))
-        elif 'education' in lk:
-            out['education'].extend(parse_education(content))
-        elif 'project' in lk:
-            # Simple project parse: name line then description
-            blocks = [b.strip() for b in re.split(r"\n\s*\n", content) if b.strip()]
-            for b in blocks:
-                lines = b.splitlines()
-                name = lines[0].strip()
-                desc = "\n".join([l.strip() for l in lines[1:]]) if len(lines) > 1 else None
-                out['projects'].append({'name': name, 'description': desc, 'role': None, 'startDate': None, 'endDate': None, 'url': None, 'skills': None})
-        elif 'cert' in lk:
-            blocks = [b.strip() for b in re.split(r"\n\s*\n", content) if b.strip()]
-            for b in blocks:
-                lines = b.splitlines()
-                name = lines[0].strip()
-                out['certificates'].append({'name': name, 'authority': None, 'licenseNumber': None, 'issueDate': None, 'expirationDate': None, 'url': None, 'description': None})
-        elif 'achiev' in lk or 'award' in lk:
-            blocks = [b.strip() for b in re.split(r"\n\s*\n", content) if b.strip()]
-            for b in blocks:
-                lines = b.splitlines()
-                title = lines[0].strip()
-                out['achievements'].append({'title': title, 'issuer': None, 'issueDate': None, 'url': None, 'description': None})
-    return out
-    
-    # Fallback heuristics if nothing parsed
-    if not out['career']:
-        m = re.search(r"(?im)^(Experience|Work Experience|Employment)\s*(.*?)^(Education|$)", text, re.DOTALL)
-        if m:
-            block = m.group(2).strip()
-            lines = [l.strip() for l in block.splitlines() if l.strip()]
-            start, end, current = _parse_date_range(block)
-            if lines:
-                out['career'].append({
-                    'title': lines[0],
-                    'company': lines[1] if len(lines) > 1 else None,
-                    'startDate': start.isoformat() if start else None,
-                    'endDate': end.isoformat() if end else None,
-                    'current': current,
-                    'location': None,
-                    'description': "\n".join(lines[2:]) if len(lines) > 2 else None,
-                    'skills': None,
-                })
-    if not out['education']:
-        m = re.search(r"(?im)^(Education)\s*(.*)$", text, re.DOTALL)
-        if m:
-            block = m.group(2).strip()
-            lines = [l.strip() for l in block.splitlines() if l.strip()]
-            start, end, _ = _parse_date_range(block)
-            if lines:
-                out['education'].append({
-                    'school': lines[0],
-                    'degree': lines[1] if len(lines) > 1 else None,
-                    'fieldOfStudy': None,
-                    'startDate': start.isoformat() if start else None,
-                    'endDate': end.isoformat() if end else None,
-                    'grade': None,
-                    'activities': None,
-                    'description': "\n".join(lines[2:]) if len(lines) > 2 else None,
-                })
+    sections, inline = scan_sections(text)
+    out = {}
+    for bucket, parse_block in BLOCK_PARSERS.items():
+        # Fallback heuristics: inline "Heading: ..." sections count only when no proper section parsed
+        blocks = sections.get(bucket) or inline.get(bucket) or []
+        out[bucket] = [parse_block(b) for b in blocks]
     return out
 
-def parse_pdf_bytes(pdf_bytes: bytes) -> Dict[str, List[dict]]:
-    from pypdf import PdfReader
-    import io
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    text = "\n".join(page.extract_text() or "" for page in reader.pages)
-    return parse_text(text)
+def parse_document(path: str, kind: str) -> Dict[str, List[dict]]:
+    # Extraction runs in the bounded process pool, not the request thread
+    return parse_text(extract_text(path, kind))
 
-def parse_docx_bytes(docx_bytes: bytes) -> Dict[str, List[dict]]:
-    from docx import Document
-    import io
-    doc = Document(io.BytesIO(docx_bytes))
-    text = "\n".join(p.text for p in doc.paragraphs)
-    return parse_text(text)
+def cache_key(kind: str, content_digest: str) -> str:
+    return f"{kind}:{PARSER_VERSION}:{content_digest}"
 
-def parse_linkedin_url(url: str) -> Dict[str, List[dict]]:
+def url_cache_key(url: str) -> str:
+    return cache_key('linkedin_url', hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest())
+
+def parse_upload(stream, kind: str) -> Dict[str, List[dict]]:
+    # The file is hashed while it is copied to disk; a repeat upload skips extraction
+    digest = hashlib.sha256()
+    with upload_to_disk(stream, f'.{kind}', digest=digest) as path:
+        return parse_cache.get_or_parse(cache_key(kind, digest.hexdigest()), lambda: parse_document(path, kind))
+
+def fetch_linkedin_text(url: str) -> str:
     # Basic fetch and text extract; for ToS compliance, prefer user-exported resume PDF.
     import requests
     from bs4 import BeautifulSoup
     resp = requests.get(url, timeout=10)
     resp.raise_for_status()
     soup = BeautifulSoup(resp.text, 'html.parser')
-    text = soup.get_text(separator='\n')
-    return parse_text(text)
+    return soup.get_text(separator='\n')
+
+def parse_linkedin_url(url: str) -> Dict[str, List[dict]]:
+    return parse_cache.get_or_parse(url_cache_key(url), lambda: parse_text(fetch_linkedin_text(url)))
 
@@ -0,0 +1,179 @@
+import io
+import os
+import re
+import wave
+import base64
+import asyncio
+import weakref
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Sentence boundary used to cut replies into TTS-sized chunks
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+TTS_MAX_WORKERS = int(os.getenv('TTS_MAX_WORKERS', '4'))
+# Async TTS calls cost no thread, so the async path allows far more in flight
+TTS_MAX_CONCURRENT = int(os.getenv('TTS_MAX_CONCURRENT', '64'))
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()
+
+def get_tts_executor():
+    """Process-wide bounded pool shared by every in-flight turn."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix='tts')
+    return _executor
+
+def get_tts_semaphore():
+    """Per-event-loop bound on concurrent async TTS calls."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(TTS_MAX_CONCURRENT)
+    return semaphore
+
+def split_sentences(text):
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text or '') if s.strip()]
+
+# Gemini TTS returns headerless 16-bit mono PCM, e.g. 'audio/L16;codec=pcm;rate=24000'
+PCM_RATE = re.compile(r'rate=(\d+)')
+
+def pcm_to_wav(pcm, mime_type=None, channels=1, sample_width=2):
+    """Wrap raw PCM in a WAV header so browsers (and the audio store's sniffing) recognise it."""
+    match = PCM_RATE.search(mime_type or '')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(int(match.group(1)) if match else 24000)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+def _join_wav(raw_clips):
+    frames, params = [], None
+    for raw in raw_clips:
+        with wave.open(io.BytesIO(raw), 'rb') as wav:
+            params = params or wav.getparams()
+            frames.append(wav.readframes(wav.getnframes()))
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setparams(params)
+        wav.writeframes(b''.join(frames))
+    return buffer.getvalue()
+
+def join_clips(clips):
+    """
+    Concatenate base64 clips into one base64 clip. MP3 frames concatenate
+    as is; WAV clips are merged under a single header.
+    """
+    clips = [c for c in clips if c]
+    if not clips:
+        return None
+    if len(clips) == 1:
+        return clips[0]
+    raw_clips = [base64.b64decode(c) for c in clips]
+    if all(raw.startswith(b'RIFF') for raw in raw_clips):
+        joined = _join_wav(raw_clips)
+    else:
+        joined = b''.join(raw_clips)
+    return base64.b64encode(joined).decode('utf-8')
+
+class SpeechPipeline:
+    """
+    Synthesizes a reply sentence by sentence on the shared TTS pool.
+
+    Text is fed in as it arrives; every completed sentence is submitted
+    immediately, so synthesis overlaps with the rest of text generation.
+    Clips are always handed back in sentence order.
+    """
+
+    def __init__(self, synthesize, executor=None):
+        self._synthesize = synthesize
+        self._executor = executor
+        self._pending = ''
+        self._jobs = []  # (sentence, future) in submission order
+        self._next = 0
+
+    def _start(self, sentence):
+        return (self._executor or get_tts_executor()).submit(self._synthesize, sentence)
+
+    def _submit(self, sentence):
+        sentence = sentence.strip()
+        if sentence:
+            self._jobs.append((sentence, self._start(sentence)))
+
+    def feed(self, delta):
+        self._pending += delta or ''
+        pieces = SENTENCE_BOUNDARY.split(self._pending)
+        # The last piece may still be growing; everything before it is a full sentence
+        for sentence in pieces[:-1]:
+            self._submit(sentence)
+        self._pending = pieces[-1]
+
+    def close(self):
+        self._submit(self._pending)
+        self._pending = ''
+
+    def ready(self):
+        """Yield (index, sentence, audio) for finished clips at the head of the queue without blocking."""
+        while self._next < len(self._jobs) and self._jobs[self._next][1].done():
+            yield self._take()
+
+    def drain(self):
+        """Yield the remaining (index, sentence, audio) in order, waiting on each."""
+        self.close()
+        while self._next < len(self._jobs):
+            yield self._take()
+
+    def _take(self):
+        index = self._next
+        sentence, future = self._jobs[index]
+        self._next += 1
+        return index, sentence, future.result()
+
+    def clips(self):
+        """Remaining clips in sentence order."""
+        return [audio for _, _, audio in self.drain()]
+
+    def joined(self):
+        return join_clips(self.clips())
+
+class AsyncSpeechPipeline(SpeechPipeline):
+    """
+    SpeechPipeline for the async serving path. synthesize is a coroutine
+    function and each sentence becomes a task on the running loop, so
+    pending clips hold no threads. Must be used from within the loop.
+    """
+
+    def __init__(self, synthesize):
+        super().__init__(synthesize)
+        self._semaphore = get_tts_semaphore()
+
+    async def _run(self, sentence):
+        async with self._semaphore:
+            return await self._synthesize(sentence)
+
+    def _start(self, sentence):
+        return asyncio.ensure_future(self._run(sentence))
+
+    async def drain(self):
+        """Yield the remaining (index, sentence, audio) in order, awaiting each."""
+        self.close()
+        while self._next < len(self._jobs):
+            await asyncio.wait([self._jobs[self._next][1]])
+            yield self._take()
+
+    async def clips(self):
+        return [audio async for _, _, audio in self.drain()]
+
+    async def joined(self):
+        return join_clips(await self.clips())
+
+    def cancel(self):
+        """Drop clips nobody will read (e.g. the client disconnected mid-stream)."""
+        for _, task in self._jobs[self._next:]:
+            task.cancel()
@@ -0,0 +1,23 @@
+import os
+import tempfile
+import pytest
+
+# The app reads its configuration at import time, so point it at a throwaway
+# SQLite database and audio store before anything imports backend.app
+_workdir = tempfile.mkdtemp(prefix='prepmaster-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_workdir, 'test.db')
+os.environ['AUDIO_STORE_DIR'] = os.path.join(_workdir, 'audio')
+
+@pytest.fixture
+def app():
+    from ..app import app
+    from ..models import db
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,176 @@
+import time
+import asyncio
+import itertools
+import pytest
+from ..services import call_policy
+from ..services.call_policy import CircuitBreaker, CircuitOpen, DeadlineExceeded, ProviderHealth, is_transient
+
+_names = itertools.count()
+
+class Unavailable(Exception):
+    code = 503
+
+class BadRequest(Exception):
+    code = 400
+
+@pytest.fixture
+def provider(monkeypatch):
+    monkeypatch.setattr(call_policy, 'AI_RETRY_BASE', 0.001)
+    monkeypatch.setattr(call_policy, 'AI_MAX_RETRIES', 2)
+    # Breakers and health are per provider name and live for the process
+    return f'test-provider-{next(_names)}'
+
+def flaky(failures, error=Unavailable, result='ok'):
+    calls = []
+
+    def fn(*args):
+        calls.append(args)
+        if len(calls) <= failures:
+            raise error('failed')
+        return result
+    return fn, calls
+
+def test_transient_errors():
+    assert is_transient(Unavailable())
+    assert is_transient(TimeoutError())
+    assert is_transient(ConnectionError())
+    assert not is_transient(BadRequest())
+    assert not is_transient(ValueError())
+    assert not is_transient(CircuitOpen('x'))
+
+def test_call_retries_transient_failures(provider):
+    fn, calls = flaky(2)
+    assert call_policy.call(provider, 'tts', fn, 'Hello.') == 'ok'
+    assert calls == [('Hello.',)] * 3
+
+def test_call_gives_up_after_max_retries(provider):
+    fn, calls = flaky(5)
+    with pytest.raises(Unavailable):
+        call_policy.call(provider, 'tts', fn)
+    assert len(calls) == 3
+
+def test_call_does_not_retry_bad_requests(provider):
+    fn, calls = flaky(1, error=BadRequest)
+    with pytest.raises(BadRequest):
+        call_policy.call(provider, 'tts', fn)
+    assert len(calls) == 1
+    assert call_policy.available(provider)
+
+def test_remaining_reports_the_phase_deadline(provider, monkeypatch):
+    monkeypatch.setitem(call_policy.AI_DEADLINES, 'tts', 5)
+    assert call_policy.remaining() is None
+    left = call_policy.call(provider, 'tts', call_policy.remaining)
+    assert 4 < left <= 5
+
+def test_hedge_returns_the_faster_duplicate(provider, monkeypatch):
+    monkeypatch.setitem(call_policy.AI_HEDGE_AFTER, 'tts', 0.05)
+    delays = iter([1.0, 0.0])
+
+    def slow_then_fast():
+        delay = next(delays)
+        time.sleep(delay)
+        return delay
+
+    started = time.monotonic()
+    assert call_policy.call(provider, 'tts', slow_then_fast) == 0.0
+    assert time.monotonic() - started < 0.5
+
+def test_hedged_call_times_out_at_the_deadline(provider, monkeypatch):
+    monkeypatch.setitem(call_policy.AI_HEDGE_AFTER, 'tts', 0.02)
+    monkeypatch.setitem(call_policy.AI_DEADLINES, 'tts', 0.1)
+    monkeypatch.setattr(call_policy, 'AI_MAX_RETRIES', 0)
+    with pytest.raises(DeadlineExceeded):
+        call_policy.call(provider, 'tts', time.sleep, 0.5)
+
+def test_breaker_opens_then_lets_one_trial_through():
+    breaker = CircuitBreaker(failures=2, reset_after=0.05)
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == breaker.OPEN and not breaker.allow() and not breaker.available()
+    time.sleep(0.06)
+    assert breaker.available()
+    assert breaker.allow() and breaker.state == breaker.HALF_OPEN
+    breaker.failure()
+    assert breaker.state == breaker.OPEN
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.success()
+    assert breaker.state == breaker.CLOSED
+
+def test_open_circuit_rejects_without_calling(provider):
+    breaker = call_policy.get_breaker(provider)
+    for _ in range(breaker.failures):
+        breaker.failure()
+    fn, calls = flaky(0)
+    with pytest.raises(CircuitOpen):
+        call_policy.call(provider, 'tts', fn)
+    assert calls == []
+    assert not call_policy.available(provider)
+
+def test_health_inflates_latency_by_the_error_rate():
+    health = ProviderHealth(decay=0.5)
+    assert health.expected_latency() is None
+    health.observe(1.0)
+    health.observe(3.0)
+    assert health.expected_latency() == pytest.approx(2.0)
+    health.observe(ok=False)
+    assert health.error_rate == pytest.approx(0.5)
+    assert health.expected_latency() == pytest.approx(4.0)
+
+def test_stream_retries_until_the_first_delta(provider):
+    attempts = []
+
+    def make_stream():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise Unavailable('down')
+        return iter(['Hello', ' there'])
+
+    assert list(call_policy.stream(provider, make_stream)) == ['Hello', ' there']
+    assert len(attempts) == 2
+    assert call_policy.expected_latency(provider, 'ttft') is not None
+
+def test_stream_does_not_retry_after_the_first_delta(provider):
+    attempts = []
+
+    def make_stream():
+        attempts.append(1)
+        yield 'Hello'
+        raise Unavailable('dropped')
+
+    stream = call_policy.stream(provider, make_stream)
+    assert next(stream) == 'Hello'
+    with pytest.raises(Unavailable):
+        next(stream)
+    assert len(attempts) == 1
+
+def test_acall_retries_and_cancels_at_the_deadline(provider, monkeypatch):
+    fn, calls = flaky(1)
+
+    async def afn(*args):
+        return fn(*args)
+
+    assert asyncio.run(call_policy.acall(provider, 'feedback', afn)) == 'ok'
+    assert len(calls) == 2
+
+    monkeypatch.setitem(call_policy.AI_DEADLINES, 'feedback', 0.05)
+    monkeypatch.setattr(call_policy, 'AI_MAX_RETRIES', 0)
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(call_policy.acall(provider, 'feedback', asyncio.sleep, 1))
+
+def test_astream_retries_until_the_first_delta(provider):
+    attempts = []
+
+    async def make_stream():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise Unavailable('down')
+        yield 'Hi'
+        yield '!'
+
+    async def collect():
+        return [delta async for delta in call_policy.astream(provider, make_stream)]
+
+    assert asyncio.run(collect()) == ['Hi', '!']
+    assert len(attempts) == 2
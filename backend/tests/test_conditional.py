@@ -0,0 +1,85 @@
+from sqlalchemy import update
+from ..models import db, UserProfile, InterviewSession
+
+def _revalidate(client, path, etag):
+    return client.get(path, headers={'If-None-Match': etag})
+
+def _pin_profile_timestamp(value):
+    # What DATETIME2(0) did to two edits within one second
+    db.session.execute(update(UserProfile).values(LastUpdated=value))
+    db.session.commit()
+
+def test_unchanged_resource_answers_304(client):
+    client.get('/api/profile')
+    first = client.get('/api/profile')
+    assert first.headers['Cache-Control'] == 'no-cache'
+    again = _revalidate(client, '/api/profile', first.headers['ETag'])
+    assert again.status_code == 304
+    assert again.headers['ETag'] == first.headers['ETag']
+
+def test_etag_differs_per_path(client):
+    client.get('/api/profile')
+    assert client.get('/api/profile').headers['ETag'] != client.get('/api/profile/career').headers['ETag']
+
+def test_profile_etag_changes_when_a_record_is_added_within_the_same_tick(client):
+    client.get('/api/profile')
+    first = client.get('/api/profile/career')
+    stamp = UserProfile.query.one().LastUpdated
+    client.post('/api/profile/career', json={'title': 'Engineer', 'company': 'Acme'})
+    _pin_profile_timestamp(stamp)
+    response = _revalidate(client, '/api/profile/career', first.headers['ETag'])
+    assert response.status_code == 200
+    assert [r['title'] for r in response.get_json()] == ['Engineer']
+
+def test_profile_etag_changes_when_a_record_is_replaced_within_the_same_tick(client):
+    client.get('/api/profile')
+    created = client.post('/api/profile/project', json={'name': 'Old'}).get_json()
+    client.post('/api/profile/project', json={'name': 'Kept'})
+    first = client.get('/api/profile/full')
+    stamp = UserProfile.query.one().LastUpdated
+    # Same row count afterwards; only the max Id moves
+    client.delete(f"/api/profile/project/{created['id']}")
+    client.post('/api/profile/project', json={'name': 'New'})
+    _pin_profile_timestamp(stamp)
+    response = _revalidate(client, '/api/profile/full', first.headers['ETag'])
+    assert response.status_code == 200
+    assert sorted(p['name'] for p in response.get_json()['projects']) == ['Kept', 'New']
+
+def test_session_etag_changes_when_a_message_is_added_within_the_same_tick(client):
+    client.post('/api/applications', json={
+        'id': 'app-1', 'jobTitle': 'Engineer', 'companyName': 'Acme',
+        'positionDescription': 'Build things', 'cvContent': 'Built things',
+    })
+    client.post('/api/sessions', json={'id': 'session-1', 'applicationId': 'app-1', 'status': 'CREATED'})
+    first = client.get('/api/sessions/session-1/messages')
+    stamp = db.session.get(InterviewSession, 'session-1').UpdatedAt
+    client.post('/api/sessions/session-1/messages', json={'id': 'm1', 'sender': 'USER', 'text': 'Hello', 'timestamp': 1})
+    db.session.execute(update(InterviewSession).values(UpdatedAt=stamp))
+    db.session.commit()
+    response = _revalidate(client, '/api/sessions/session-1/messages', first.headers['ETag'])
+    assert response.status_code == 200
+    assert [m['text'] for m in response.get_json()] == ['Hello']
+
+def test_missing_row_has_no_validator(client):
+    response = client.get('/api/sessions/nope')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+
+def test_session_list_etag_changes_when_messages_are_added_within_the_same_tick(client):
+    client.post('/api/applications', json={
+        'id': 'app-1', 'jobTitle': 'Engineer', 'companyName': 'Acme',
+        'positionDescription': 'Build things', 'cvContent': 'Built things',
+    })
+    client.post('/api/sessions', json={'id': 'session-1', 'applicationId': 'app-1', 'status': 'CREATED'})
+    client.post('/api/sessions/session-1/messages', json={'id': 'm1', 'sender': 'USER', 'text': 'Hello', 'timestamp': 1})
+    stamp = db.session.get(InterviewSession, 'session-1').UpdatedAt
+    for path in ('/api/sessions', '/api/applications/app-1/sessions'):
+        first = client.get(path)
+        count = first.get_json()[0]['messageCount']
+        etag = first.headers['ETag']
+        client.post('/api/sessions/session-1/messages', json={'id': path, 'sender': 'AI', 'text': 'Hi', 'timestamp': 2})
+        db.session.execute(update(InterviewSession).values(UpdatedAt=stamp))
+        db.session.commit()
+        response = _revalidate(client, path, etag)
+        assert response.status_code == 200
+        assert response.get_json()[0]['messageCount'] == count + 1
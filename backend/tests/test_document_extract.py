@@ -0,0 +1,32 @@
+import io
+import hashlib
+import pytest
+from ..services.document_extract import ExtractionError, save_upload, discard_upload
+
+def test_save_upload_copies_and_hashes(tmp_path, monkeypatch):
+    monkeypatch.setattr('tempfile.tempdir', str(tmp_path))
+    data = b'%PDF' + b'x' * 200_000
+    digest = hashlib.sha256()
+    path = save_upload(io.BytesIO(data), '.pdf', max_bytes=len(data), digest=digest)
+    try:
+        with open(path, 'rb') as f:
+            assert f.read() == data
+        assert digest.hexdigest() == hashlib.sha256(data).hexdigest()
+    finally:
+        discard_upload(path)
+    assert list(tmp_path.iterdir()) == []
+
+def test_save_upload_over_the_cap_is_refused_and_removed(tmp_path, monkeypatch):
+    monkeypatch.setattr('tempfile.tempdir', str(tmp_path))
+    with pytest.raises(ExtractionError) as raised:
+        save_upload(io.BytesIO(b'x' * 200_000), '.pdf', max_bytes=100_000)
+    assert raised.value.status == 413
+    assert list(tmp_path.iterdir()) == []
+
+def test_oversized_request_body_gets_a_json_413(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+    response = client.post('/api/profile/import', data={
+        'source': 'pdf', 'file': (io.BytesIO(b'x' * 4096), 'resume.pdf'),
+    }, content_type='multipart/form-data')
+    assert response.status_code == 413
+    assert 'limit' in response.get_json()['error']
@@ -0,0 +1,38 @@
+from ..services.parse_cache import ParseCache, normalize_url
+from ..services.resume_import import PARSER_VERSION, cache_key, url_cache_key
+
+PARSED = {'career': [{'title': 'Engineer'}]}
+
+def test_get_or_parse_parses_once_and_hands_out_copies():
+    cache = ParseCache(directory='')
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return {'career': [{'title': 'Engineer'}]}
+
+    first = cache.get_or_parse('k', parse)
+    first['career'].append({'title': 'edited by the caller'})
+    assert cache.get_or_parse('k', parse) == PARSED
+    assert len(calls) == 1
+
+def test_entries_expire_after_the_ttl():
+    cache = ParseCache(ttl=-1, directory='')
+    cache.put('k', PARSED)
+    assert cache.get('k') is None
+
+def test_lru_evicts_the_oldest_entry():
+    cache = ParseCache(max_entries=2, directory='')
+    for key in ('a', 'b', 'c'):
+        cache.put(key, PARSED)
+    assert cache.get('a') is None
+    assert cache.get('c') == PARSED
+
+def test_directory_is_shared_between_instances(tmp_path):
+    ParseCache(directory=str(tmp_path)).put('k', PARSED)
+    assert ParseCache(directory=str(tmp_path)).get('k') == PARSED
+
+def test_keys_carry_the_parser_version_and_a_normalized_url():
+    assert cache_key('pdf', 'abc') == f'pdf:{PARSER_VERSION}:abc'
+    assert normalize_url('HTTPS://LinkedIn.com/in/jane/?b=2&a=1#top') == 'https://linkedin.com/in/jane?a=1&b=2'
+    assert url_cache_key('https://linkedin.com/in/jane/') == url_cache_key('https://LINKEDIN.com/in/jane')
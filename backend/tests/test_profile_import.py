@@ -0,0 +1,51 @@
+import pytest
+from ..models import CareerRecord, Certificate, UserProfile
+from ..services.profile_import import apply_import
+
+PARSED = {
+    'career': [
+        {'title': 'Backend Engineer', 'company': 'Acme Inc', 'startDate': '2020-01-01'},
+        {'title': 'Intern', 'company': 'Globex', 'startDate': '2018-06-01'},
+    ],
+    'certificates': [{'name': 'AWS Solutions Architect', 'authority': 'Amazon', 'issueDate': '2021-03-01'}],
+}
+
+def test_apply_creates_profile_and_inserts_records(app):
+    result = apply_import(PARSED)
+    assert result['summary']['career'] == {'inserted': 2, 'skipped': 0}
+    assert result['summary']['certificates'] == {'inserted': 1, 'skipped': 0}
+    assert UserProfile.query.count() == 1
+    assert CareerRecord.query.count() == 2
+
+def test_reapplying_skips_existing_records(app):
+    apply_import(PARSED)
+    result = apply_import(PARSED)
+    assert result['summary']['career'] == {'inserted': 0, 'skipped': 2}
+    assert result['summary']['certificates'] == {'inserted': 0, 'skipped': 1}
+    assert CareerRecord.query.count() == 2
+
+def test_natural_key_ignores_case_and_whitespace(app):
+    apply_import(PARSED)
+    result = apply_import({'career': [
+        {'title': 'backend  engineer', 'company': 'ACME INC ', 'startDate': '2020-01-01'},
+        {'title': 'Backend Engineer', 'company': 'Acme Inc', 'startDate': '2022-01-01'},
+    ]})
+    assert result['summary']['career'] == {'inserted': 1, 'skipped': 1}
+
+def test_duplicates_within_one_import_are_inserted_once(app):
+    entry = {'title': 'Engineer', 'company': 'Initech', 'startDate': '2019-01-01'}
+    result = apply_import({'career': [entry, dict(entry)]})
+    assert result['summary']['career'] == {'inserted': 1, 'skipped': 1}
+
+def test_entries_missing_required_columns_are_skipped(app):
+    result = apply_import({'certificates': [{'authority': 'Nobody'}]})
+    assert result['summary']['certificates'] == {'inserted': 0, 'skipped': 1}
+    assert Certificate.query.count() == 0
+
+def test_bad_date_rolls_back_the_whole_import(app):
+    with pytest.raises(ValueError):
+        apply_import({
+            'career': [{'title': 'Engineer', 'company': 'Initech', 'startDate': '2019-01-01'}],
+            'projects': [{'name': 'Side project', 'startDate': 'sometime'}],
+        })
+    assert CareerRecord.query.count() == 0
@@ -0,0 +1,80 @@
+from datetime import date
+from ..services.resume_import import scan_sections, extract_sections, parse_text, _parse_date_range, _to_date
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 0100
+
+Experience
+Senior Engineer
+Acme Inc
+Jan 2020 - Present
+Berlin, Germany
+
+Engineer
+Globex
+2016 – 2019
+
+Education:
+State University
+BSc in Computer Science
+Sept. 2012 - Jun 2016
+
+Certifications
+AWS Solutions Architect
+"""
+
+def test_blocks_are_split_on_blank_lines_and_headings():
+    sections, inline = scan_sections(RESUME)
+    assert sections['career'] == [
+        ['Senior Engineer', 'Acme Inc', 'Jan 2020 - Present', 'Berlin, Germany'],
+        ['Engineer', 'Globex', '2016 – 2019'],
+    ]
+    assert sections['education'] == [['State University', 'BSc in Computer Science', 'Sept. 2012 - Jun 2016']]
+    assert sections['certificates'] == [['AWS Solutions Architect']]
+    assert inline == {}
+
+def test_preamble_before_the_first_heading_is_dropped():
+    sections, _ = scan_sections(RESUME)
+    assert not any('jane@example.com' in line for blocks in sections.values() for block in blocks for line in block)
+
+def test_heading_lookup_ignores_case_and_trailing_colon():
+    sections, _ = scan_sections("WORK EXPERIENCE :\nEngineer\nAcme")
+    assert sections == {'career': [['Engineer', 'Acme']]}
+
+def test_long_lines_are_never_headings():
+    sections, _ = scan_sections("Projects\nEducation outreach programme for local schools")
+    assert sections == {'projects': [['Education outreach programme for local schools']]}
+
+def test_inline_headings_are_a_fallback_before_the_first_heading():
+    sections, inline = scan_sections("Experience: Engineer at Acme\n2019 - 2021")
+    assert sections == {}
+    assert inline == {'career': [['Engineer at Acme', '2019 - 2021']]}
+    assert parse_text("Experience: Engineer at Acme\n2019 - 2021")['career'][0]['title'] == 'Engineer at Acme'
+
+def test_inline_headings_are_ignored_after_a_proper_heading():
+    sections, inline = scan_sections("Projects\nPortfolio\nAwards: none")
+    assert sections == {'projects': [['Portfolio', 'Awards: none']]}
+    assert inline == {}
+
+def test_extract_sections_joins_blocks():
+    assert extract_sections(RESUME)['career'] == (
+        "Senior Engineer\nAcme Inc\nJan 2020 - Present\nBerlin, Germany\n\nEngineer\nGlobex\n2016 – 2019"
+    )
+
+def test_parse_text_reads_dates_and_fields():
+    parsed = parse_text(RESUME)
+    first, second = parsed['career']
+    assert (first['startDate'], first['endDate'], first['current']) == ('2020-01-01', None, True)
+    assert first['location'] == 'Berlin, Germany'
+    assert (second['startDate'], second['endDate']) == ('2016-01-01', '2019-01-01')
+    education = parsed['education'][0]
+    assert (education['degree'], education['fieldOfStudy']) == ('BSc', 'Computer Science')
+    assert (education['startDate'], education['endDate']) == ('2012-09-01', '2016-06-01')
+
+def test_date_lexer():
+    assert _parse_date_range("2020-03 — 2022-11") == (date(2020, 3, 1), date(2022, 11, 1), False)
+    assert _parse_date_range("since 2018 - now") == (date(2018, 1, 1), None, True)
+    assert _parse_date_range("Employee #120201 - 2019") == (None, None, False)
+    assert _to_date("Aug 2021") == date(2021, 8, 1)
+    assert _to_date("2021-13") is None
+    assert _to_date("someday") is None
@@ -0,0 +1,134 @@
+import base64
+import asyncio
+import itertools
+import pytest
+from ..services import ai_service, call_policy
+from ..services.ai_service import AIProvider, RoutingProvider
+
+_names = itertools.count()
+
+class Unavailable(Exception):
+    code = 503
+
+class Unauthorized(Exception):
+    code = 401
+
+class FakeProvider(AIProvider):
+    """A backend with canned replies; a failing one raises a 503 from every call."""
+
+    def __init__(self, label, audio_format='mp3', tts=True, fail=False, fail_tts=False, accepts_audio=False, error=Unavailable):
+        # Unique names: health and breakers are kept per provider name for the process
+        self.name = f'{label}-{next(_names)}'
+        self.label = label
+        self.text_model = label + '-text'
+        self.tts_model = label + '-tts' if tts else None
+        self.audio_format = audio_format
+        self.accepts_audio = accepts_audio
+        self.fail = fail
+        self.fail_tts = fail_tts
+        self.error = error
+        self.calls = 0
+        self.spoken = []
+
+    def _stream_text(self, system_instruction, history, latest_user_message):
+        self.calls += 1
+        if self.fail:
+            raise self.error('down')
+        yield f'From {self.label}. '
+        yield 'Second sentence. Third one.'
+
+    def _synthesize_speech(self, text):
+        if self.fail or self.fail_tts:
+            raise Unavailable('down')
+        self.spoken.append(text)
+        return base64.b64encode(self.label.encode('utf-8')).decode('utf-8')
+
+    def _generate_feedback(self, job_description, cv_content, history):
+        if self.fail:
+            raise Unavailable('down')
+        return {'by': self.label}
+
+@pytest.fixture(autouse=True)
+def no_exploring_or_retries(monkeypatch):
+    monkeypatch.setattr(ai_service, 'AI_ROUTING_EXPLORE', 0)
+    monkeypatch.setattr(call_policy, 'AI_MAX_RETRIES', 0)
+
+def measured(backend, phase, seconds):
+    call_policy.get_health(backend.name, phase).observe(seconds)
+    return backend
+
+def turn(router, message='Tell me about yourself.'):
+    return router.generate_turn('Engineer', 'Acme', 'Build things', 'Built things', [], message)
+
+def test_text_goes_to_the_fastest_backend():
+    slow = measured(FakeProvider('slow'), 'ttft', 2.0)
+    fast = measured(FakeProvider('fast'), 'ttft', 0.1)
+    assert turn(RoutingProvider([slow, fast]))['text'].startswith('From fast.')
+
+def test_unmeasured_backends_are_tried_first():
+    known = measured(FakeProvider('known'), 'ttft', 0.1)
+    new = FakeProvider('new')
+    assert turn(RoutingProvider([known, new]))['text'].startswith('From new.')
+
+def test_text_fails_over_to_the_next_backend():
+    down = measured(FakeProvider('down', fail=True), 'ttft', 0.1)
+    up = measured(FakeProvider('up'), 'ttft', 1.0)
+    assert turn(RoutingProvider([down, up]))['text'].startswith('From up.')
+
+def test_backend_rejecting_every_call_stops_being_tried_first():
+    # A revoked key: non-transient, so the circuit stays closed, but routing must still learn
+    revoked = FakeProvider('revoked', fail=True, error=Unauthorized)
+    working = measured(FakeProvider('working'), 'ttft', 0.5)
+    router = RoutingProvider([revoked, working])
+    for _ in range(5):
+        assert turn(router)['text'].startswith('From working.')
+    assert revoked.calls == 1
+    assert call_policy.available(revoked.name)
+    assert router._ranked('ttft', router.backends) == [working, revoked]
+
+def test_open_circuit_goes_last():
+    tripped = measured(FakeProvider('tripped'), 'ttft', 0.1)
+    breaker = call_policy.get_breaker(tripped.name)
+    for _ in range(breaker.failures):
+        breaker.failure()
+    other = measured(FakeProvider('other'), 'ttft', 5.0)
+    assert turn(RoutingProvider([tripped, other]))['text'].startswith('From other.')
+
+def test_recorded_answers_go_to_a_backend_that_accepts_audio():
+    deaf = measured(FakeProvider('deaf'), 'ttft', 0.1)
+    listening = measured(FakeProvider('listening', accepts_audio=True), 'ttft', 5.0)
+    answer = {'audioData': 'AAAA', 'mimeType': 'audio/webm'}
+    assert turn(RoutingProvider([deaf, listening]), answer)['text'].startswith('From listening.')
+
+def test_one_reply_is_spoken_in_one_audio_format():
+    text = measured(FakeProvider('text', tts=False), 'ttft', 0.1)
+    wav_down = measured(FakeProvider('wavdown', audio_format='wav', fail_tts=True), 'tts', 0.1)
+    mp3 = measured(FakeProvider('mp3', audio_format='mp3'), 'tts', 0.2)
+    wav = measured(FakeProvider('wav', audio_format='wav'), 'tts', 0.3)
+    result = turn(RoutingProvider([text, wav_down, mp3, wav]))
+    # wavdown ranked first, so only WAV backends may fill in for it
+    assert base64.b64decode(result['audioData']) == b'wav' * 3
+    assert mp3.spoken == []
+    assert len(wav.spoken) == 3
+
+def test_no_audio_when_every_backend_of_the_format_fails():
+    wav_down = measured(FakeProvider('wavdown', audio_format='wav', fail_tts=True), 'tts', 0.1)
+    mp3 = measured(FakeProvider('mp3', audio_format='mp3'), 'tts', 0.2)
+    result = turn(RoutingProvider([wav_down, mp3]))
+    assert result['text'].startswith('From wavdown.')
+    assert result['audioData'] is None
+    assert mp3.spoken == []
+
+def test_feedback_fails_over():
+    down = measured(FakeProvider('down', fail=True), 'feedback', 0.1)
+    up = measured(FakeProvider('up'), 'feedback', 1.0)
+    assert RoutingProvider([down, up]).generate_feedback('Build things', 'Built things', []) == {'by': 'up'}
+
+def test_async_paths_route_the_same_way():
+    down = measured(FakeProvider('down', fail=True), 'ttft', 0.1)
+    up = measured(FakeProvider('up', audio_format='mp3'), 'ttft', 1.0)
+    router = RoutingProvider([down, up])
+    result = asyncio.run(router.agenerate_turn('Engineer', 'Acme', 'Build things', 'Built things', [], 'Hi'))
+    assert result['text'].startswith('From up.')
+    assert base64.b64decode(result['audioData']) == b'up' * 3
+    assert asyncio.run(router.agenerate_feedback('Build things', 'Built things', [])) == {'by': 'up'}
@@ -12,7 +12,7 @@ const Dashboard: React.FC = () => {
     const fetchData = async () => {
       try {
         const apps = await getApplications();
-        setApplications(apps.reverse());
+        setApplications(apps); // newest first
 
         const map: Record<string, InterviewSession[]> = {};
         await Promise.all(apps.map(async (app) => {
@@ -125,7 +125,7 @@ const Dashboard: React.FC = () => {
                             >
                               {new Date(session.createdAt).toLocaleDateString()} - {
                                 session.status === 'COMPLETED'
-                                  ? `✓ Score: ${session.feedback?.overallScore ?? 'N/A'}`
+                                  ? `✓ Score: ${session.overallScore ?? session.feedback?.overallScore ?? 'N/A'}`
                                   : '⏸ In Progress'
                               }
                             </Link>
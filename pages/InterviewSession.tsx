@@ -1,7 +1,7 @@
 import React, { useEffect, useRef, useState, useCallback } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { getApplicationById, createSession, getSessionById, updateSession, generateId } from '../services/apiService';
-import { startInterview, generateTurn, generateFeedback } from '../services/interviewService';
+import { startInterview, streamTurn, generateFeedback } from '../services/interviewService';
 import { Application, ChatMessage, InterviewSession as SessionType, SessionStatus, Sender, FeedbackReport, MAX_FEEDBACK_SCORE } from '../types';
 import AudioVisualizer from '../components/AudioVisualizer';
 
@@ -22,6 +22,8 @@ const InterviewSession: React.FC = () => {
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const audioChunksRef = useRef<Blob[]>([]);
+  // Sentence clips from a streamed turn are chained so they play back-to-back
+  const audioQueueRef = useRef<Promise<void>>(Promise.resolve());
 
   // Scroll to bottom of chat
   useEffect(() => {
@@ -57,7 +59,7 @@ const InterviewSession: React.FC = () => {
         const existingSession = await getSessionById(sessionId);
         if (existingSession) {
           setSession(existingSession);
-          setMessages(existingSession.messages);
+          setMessages(existingSession.messages ?? []);
           const foundApp = await getApplicationById(existingSession.applicationId);
           if (foundApp) setApp(foundApp);
         } else {
@@ -98,14 +100,16 @@ const InterviewSession: React.FC = () => {
     if (!app || !session) return;
     setIsProcessing(true);
     try {
-      const response = await startInterview(app.id, provider);
+      const response = await startInterview(app.id, provider, session.id);
 
+      // The server has already stored the opening message
       const aiMsg: ChatMessage = {
-        id: generateId(),
+        id: response.messageId || generateId(),
         sender: Sender.AI,
         text: response.text,
         audioData: response.audioData,
-        timestamp: Date.now()
+        audioUrl: response.audioUrl || undefined,
+        timestamp: response.timestamp || Date.now()
       };
 
       setMessages([aiMsg]);
@@ -113,14 +117,13 @@ const InterviewSession: React.FC = () => {
       // Update DB
       const s = await getSessionById(session.id);
       if (s) {
-        s.messages = [aiMsg];
         s.status = SessionStatus.IN_PROGRESS;
         await updateSession(s);
         setSession(s);
       }
 
       // Play intro audio
-      playAudio(response.audioData);
+      playAudio(response.audioData, response.audioUrl || undefined);
 
     } catch (err) {
       console.error(err);
@@ -130,12 +133,25 @@ const InterviewSession: React.FC = () => {
     }
   };
 
-  const playAudio = (base64Audio?: string) => {
-    if (!base64Audio) return;
-    const audio = new Audio(`data:audio/mp3;base64,${base64Audio}`);
+  const playAudio = (base64Audio?: string, audioUrl?: string) => {
+    const src = audioUrl || (base64Audio ? `data:audio/mp3;base64,${base64Audio}` : null);
+    if (!src) return;
+    const audio = new Audio(src);
     audio.play().catch(e => console.error("Audio playback failed", e));
   };
 
+  const enqueueAudio = (base64Audio: string) => {
+    audioQueueRef.current = audioQueueRef.current.then(() => new Promise<void>((resolve) => {
+      const audio = new Audio(`data:audio/mp3;base64,${base64Audio}`);
+      audio.onended = () => resolve();
+      audio.onerror = () => resolve();
+      audio.play().catch(e => {
+        console.error("Audio playback failed", e);
+        resolve();
+      });
+    }));
+  };
+
   const handleSendMessage = async (textInput?: string, audioBlob?: Blob) => {
     if ((!input.trim() && !audioBlob) || !app || !session) return;
 
@@ -161,32 +177,42 @@ const InterviewSession: React.FC = () => {
       payload = { audioData: base64Audio, mimeType: audioBlob.type };
     }
 
-    // 3. Call AI Service
+    // 3. Call AI Service (streamed: text appears as it is generated, audio follows per sentence)
+    const aiMsg: ChatMessage = {
+      id: generateId(),
+      sender: Sender.AI,
+      text: '',
+      timestamp: Date.now()
+    };
+
     try {
-      const response = await generateTurn(
+      let streamedText = '';
+      const result = await streamTurn(
         app.id,
-        updatedMessages,
+        session.id,
         payload,
-        provider
+        provider,
+        {
+          onText: (delta) => {
+            streamedText += delta;
+            setMessages([...updatedMessages, { ...aiMsg, text: streamedText }]);
+          },
+          onAudio: (clip) => enqueueAudio(clip.audioData)
+        }
       );
 
-      const aiMsg: ChatMessage = {
-        id: generateId(),
-        sender: Sender.AI,
-        text: response.text,
-        audioData: response.audioData,
-        timestamp: Date.now()
+      // The server stored both messages; adopt its ids so the transcript matches the DB
+      const finalUserMsg = { ...userMsg, id: result.userMessageId || userMsg.id, timestamp: result.userTimestamp || userMsg.timestamp };
+      const finalAiMsg = {
+        ...aiMsg,
+        id: result.messageId || aiMsg.id,
+        text: result.text || streamedText,
+        audioUrl: result.audioUrl || undefined,
+        timestamp: result.timestamp || aiMsg.timestamp
       };
-
-      const finalMessages = [...updatedMessages, aiMsg];
+      const finalMessages = [...messages, finalUserMsg, finalAiMsg];
       setMessages(finalMessages);
-
-      // Update DB
-      const updatedSession = { ...session, messages: finalMessages };
-      await updateSession(updatedSession);
-      setSession(updatedSession);
-
-      playAudio(response.audioData);
+      setSession({ ...session, messages: finalMessages });
 
     } catch (err) {
       console.error(err);
@@ -251,7 +277,7 @@ const InterviewSession: React.FC = () => {
 
     setIsProcessing(true);
     try {
-      const feedback = await generateFeedback(app.id, messages, provider);
+      const feedback = await generateFeedback(app.id, session.id, provider);
 
       const completedSession: SessionType = {
         ...session,
@@ -286,6 +312,7 @@ const InterviewSession: React.FC = () => {
             onChange={(e) => setProvider(e.target.value)}
             className="block w-full pl-3 pr-10 py-2 text-base border-gray-300 focus:outline-none focus:ring-blue-500 focus:border-blue-500 sm:text-sm rounded-md border"
           >
+            <option value="auto">Automatic (Fastest Available)</option>
             <option value="gemini">Google Gemini (Fast, Audio Support)</option>
             <option value="openai">OpenAI GPT-4o (High Quality)</option>
             <option value="deepseek">DeepSeek (Text Only)</option>
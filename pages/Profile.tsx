@@ -1,24 +1,19 @@
 import React, { useEffect, useState } from 'react';
 import {
-  getProfile,
+  getProfileFull,
   saveProfile,
-  listCareer,
   createCareer,
   updateCareer,
   deleteCareer,
-  listEducation,
   createEducation,
   updateEducation,
   deleteEducation,
-  listAchievements,
   createAchievement,
   updateAchievement,
   deleteAchievement,
-  listCertificates,
   createCertificate,
   updateCertificate,
   deleteCertificate,
-  listProjects,
   createProject,
   updateProject,
   deleteProject,
@@ -53,13 +48,13 @@ const ProfilePage: React.FC = () => {
   const [saving, setSaving] = useState(false);
 
   const loadAll = async () => {
-    const p = await getProfile();
-    setProfile(p);
-    setCareer(await listCareer());
-    setEducation(await listEducation());
-    setAchievements(await listAchievements());
-    setCertificates(await listCertificates());
-    setProjects(await listProjects());
+    const full = await getProfileFull();
+    setProfile(full.profile);
+    setCareer(full.career);
+    setEducation(full.education);
+    setAchievements(full.achievements);
+    setCertificates(full.certificates);
+    setProjects(full.projects);
   };
 
   useEffect(() => { loadAll(); }, []);
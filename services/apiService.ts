@@ -2,6 +2,19 @@ import { Application, InterviewSession, ChatMessage } from '../types';
 
 const API_BASE = '/api';
 
+// List endpoints are keyset-paginated: each page's next cursor comes back in X-Next-Cursor.
+const fetchAllPages = async <T>(url: string, errorMessage: string, startCursor: string | null = null): Promise<T[]> => {
+    const items: T[] = [];
+    let cursor = startCursor;
+    do {
+        const response = await fetch(cursor ? `${url}?cursor=${encodeURIComponent(cursor)}` : url);
+        if (!response.ok) throw new Error(errorMessage);
+        items.push(...(await response.json()));
+        cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return items;
+};
+
 // --- Applications ---
 
 export const saveApplication = async (app: Application): Promise<Application> => {
@@ -15,9 +28,7 @@ export const saveApplication = async (app: Application): Promise<Application> =>
 };
 
 export const getApplications = async (): Promise<Application[]> => {
-    const response = await fetch(`${API_BASE}/applications`);
-    if (!response.ok) throw new Error('Failed to fetch applications');
-    return response.json();
+    return fetchAllPages<Application>(`${API_BASE}/applications`, 'Failed to fetch applications');
 };
 
 export const getApplicationById = async (id: string): Promise<Application | undefined> => {
@@ -40,22 +51,28 @@ export const createSession = async (session: InterviewSession): Promise<Intervie
 };
 
 export const getSessions = async (): Promise<InterviewSession[]> => {
-    const response = await fetch(`${API_BASE}/sessions`);
-    if (!response.ok) throw new Error('Failed to fetch sessions');
-    return response.json();
+    return fetchAllPages<InterviewSession>(`${API_BASE}/sessions`, 'Failed to fetch sessions');
 };
 
 export const getSessionById = async (id: string): Promise<InterviewSession | undefined> => {
     const response = await fetch(`${API_BASE}/sessions/${id}`);
     if (response.status === 404) return undefined;
     if (!response.ok) throw new Error('Failed to fetch session');
-    return response.json();
+    const session = await response.json();
+    // The detail embeds the first page of messages; fetch the rest of the transcript
+    if (session.nextMessagesCursor) {
+        const rest = await fetchAllPages<ChatMessage>(
+            `${API_BASE}/sessions/${id}/messages`,
+            'Failed to fetch messages',
+            session.nextMessagesCursor
+        );
+        session.messages = [...session.messages, ...rest];
+    }
+    return session;
 };
 
 export const getSessionsByApplicationId = async (appId: string): Promise<InterviewSession[]> => {
-    const response = await fetch(`${API_BASE}/applications/${appId}/sessions`);
-    if (!response.ok) throw new Error('Failed to fetch sessions for application');
-    return response.json();
+    return fetchAllPages<InterviewSession>(`${API_BASE}/applications/${appId}/sessions`, 'Failed to fetch sessions for application');
 };
 
 export const updateSession = async (updatedSession: InterviewSession): Promise<void> => {
@@ -1,32 +1,47 @@
-import { ChatMessage, FeedbackReport } from '../types';
+import { FeedbackReport } from '../types';
 
 const API_BASE = '/api/interview';
 
+// With a sessionId the server stores the turn itself and returns the stored
+// message ids and an audio URL in place of the base64 audio.
+export interface TurnResult {
+    text: string;
+    audioData?: string; // Only when the turn was not persisted
+    audioUrl?: string | null;
+    messageId?: string;
+    timestamp?: number;
+    userMessageId?: string;
+    userTimestamp?: number;
+}
+
 export const startInterview = async (
     applicationId: string,
-    provider: string = 'gemini'
-): Promise<{ text: string; audioData?: string }> => {
+    provider: string = 'gemini',
+    sessionId?: string
+): Promise<TurnResult> => {
     const response = await fetch(`${API_BASE}/start`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ applicationId, provider }),
+        body: JSON.stringify({ applicationId, provider, sessionId }),
     });
     if (!response.ok) throw new Error('Failed to start interview');
     return response.json();
 };
 
+// The server rebuilds the conversation from the session's stored messages,
+// so only the new message is sent.
 export const generateTurn = async (
     applicationId: string,
-    history: ChatMessage[],
+    sessionId: string,
     message: string | { audioData: string, mimeType: string },
     provider: string = 'gemini'
-): Promise<{ text: string; audioData?: string }> => {
+): Promise<TurnResult> => {
     const response = await fetch(`${API_BASE}/turn`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
             applicationId,
-            history,
+            sessionId,
             message,
             provider
         }),
@@ -35,15 +50,74 @@ export const generateTurn = async (
     return response.json();
 };
 
+export interface TurnStreamHandlers {
+    onText?: (delta: string) => void;
+    onAudio?: (clip: { index: number; text: string; audioData: string }) => void;
+}
+
+// Streams a turn over SSE: text deltas first, then one audio clip per sentence.
+// Resolves with the `done` payload: the full reply text plus the stored message ids.
+export const streamTurn = async (
+    applicationId: string,
+    sessionId: string,
+    message: string | { audioData: string, mimeType: string },
+    provider: string = 'gemini',
+    handlers: TurnStreamHandlers = {}
+): Promise<TurnResult> => {
+    const response = await fetch(`${API_BASE}/turn/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+        body: JSON.stringify({
+            applicationId,
+            sessionId,
+            message,
+            provider
+        }),
+    });
+    if (!response.ok || !response.body) throw new Error('Failed to generate turn');
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result: TurnResult = { text: '' };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            for (const line of frame.split('\n')) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            }
+            if (!data) continue;
+            const payload = JSON.parse(data);
+
+            if (event === 'text') handlers.onText?.(payload.delta);
+            else if (event === 'audio') handlers.onAudio?.(payload);
+            else if (event === 'done') result = payload;
+            else if (event === 'error') throw new Error(payload.error);
+        }
+    }
+    return result;
+};
+
 export const generateFeedback = async (
     applicationId: string,
-    history: ChatMessage[],
+    sessionId: string,
     provider: string = 'gemini'
 ): Promise<FeedbackReport> => {
     const response = await fetch(`${API_BASE}/feedback`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ applicationId, history, provider }),
+        body: JSON.stringify({ applicationId, sessionId, provider }),
     });
     if (!response.ok) throw new Error('Failed to generate feedback');
     return response.json();
@@ -5,6 +5,7 @@ import {
   AchievementRecord,
   CertificateRecord,
   ProjectRecord,
+  ProfileBundle,
   ImportPreview,
 } from '../types';
 
@@ -16,6 +17,13 @@ export const getProfile = async (): Promise<UserProfile> => {
   return res.json();
 };
 
+// Profile and every record list in one request; the browser revalidates it with its ETag
+export const getProfileFull = async (): Promise<ProfileBundle> => {
+  const res = await fetch(`${API_BASE}/full`);
+  if (!res.ok) throw new Error('Failed to fetch profile');
+  return res.json();
+};
+
 export const saveProfile = async (profile: Partial<UserProfile>): Promise<UserProfile> => {
   const res = await fetch(`${API_BASE}`, {
     method: 'POST',
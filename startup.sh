@@ -1,4 +1,9 @@
 #!/bin/bash
 # Production startup script for Azure Web App (serves built frontend from /dist)
 # python -m pip install -r backend/requirements.txt
-gunicorn --bind=0.0.0.0:8000 --timeout 600 --chdir backend app:app
+# SERVER_MODE=asgi serves the interview endpoints with async workers (see backend/asgi.py)
+if [ "$SERVER_MODE" = "asgi" ]; then
+    gunicorn --bind=0.0.0.0:8000 --timeout 600 -k uvicorn.workers.UvicornWorker backend.asgi:app
+else
+    gunicorn --bind=0.0.0.0:8000 --timeout 600 --chdir backend app:app
+fi
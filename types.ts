@@ -25,7 +25,8 @@ export interface ChatMessage {
   id: string;
   sender: Sender;
   text: string;
-  audioData?: string; // Base64 encoded audio
+  audioData?: string; // Base64 encoded audio (legacy messages and unsaved replies)
+  audioUrl?: string; // Stored clip, served as raw bytes by /api/audio/<id>
   timestamp: number;
 }
 
@@ -33,9 +34,11 @@ export interface InterviewSession {
   id: string;
   applicationId: string;
   status: SessionStatus;
-  messages: ChatMessage[];
+  messages?: ChatMessage[]; // Detail only (GET /sessions/<id> or ?include=messages)
   createdAt: string;
-  feedback?: FeedbackReport;
+  feedback?: FeedbackReport; // Detail only (GET /sessions/<id> or ?include=feedback)
+  messageCount?: number; // Summary only
+  overallScore?: number | null; // Summary only
 }
 
 export interface FeedbackReport {
@@ -125,6 +128,15 @@ export interface ProjectRecord {
   createdAt?: string;
 }
 
+export interface ProfileBundle {
+  profile: UserProfile;
+  career: CareerRecord[];
+  education: EducationRecord[];
+  achievements: AchievementRecord[];
+  certificates: CertificateRecord[];
+  projects: ProjectRecord[];
+}
+
 export interface ImportPreview {
   preview: {
     career: Partial<CareerRecord>[];